@@ -0,0 +1,94 @@
+"""
+Calculator Microbenchmark for Lexi
+Times calculate_expression's fast path against the SymPy-only path on
+common expressions, checks both produce identical answers, and
+reports what a repeated SymPy-tier expression costs with the memo.
+
+Run with: python -m benchmarks.bench_calculate
+"""
+
+import contextlib
+import io
+import json
+import time
+
+from core import functions
+from core.cache import TTLCache
+from core.calculator import SympySandbox, fast_evaluate
+
+COMMON_EXPRESSIONS = [
+    "25*4",
+    "2^10",
+    "(17 + 3) * 4 / 2",
+    "10/4",
+    "1/3",
+    "12.5 * 8",
+    "0.1 + 0.2",
+    "sqrt(144)",
+    "sqrt(2)",
+    "2**-1",
+    "3.14159 * 5^2",
+    "sin(1) + cos(1)",
+    "1000 * 1.05^3",
+    "-7 + 3*(2 - 5)",
+]
+ROUNDS = 200
+
+
+@contextlib.contextmanager
+def patched(**attrs):
+    """Temporarily replace attributes of core.functions."""
+    originals = {name: getattr(functions, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(functions, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(functions, name, value)
+
+
+NO_MEMO = TTLCache(max_entries=0, name="bench_calculate")
+IN_PROCESS = SympySandbox(workers=0)
+
+# SymPy in-process without the fast path, with and without the memo
+SYMPY_ONLY = {"CALC_MEMO": NO_MEMO, "fast_evaluate": lambda _: None, "CALC_SANDBOX": IN_PROCESS}
+SYMPY_MEMO = {"fast_evaluate": lambda _: None, "CALC_SANDBOX": IN_PROCESS}
+
+
+def time_calls(expression: str, **attrs) -> tuple:
+    """(answer, seconds per call) for calculate_expression under patched attributes."""
+    with patched(**attrs):
+        answer = functions.calculate_expression(expression)  # warm up
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            functions.calculate_expression(expression)
+        return answer, (time.perf_counter() - start) / ROUNDS
+
+
+def bench_expression(expression: str) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        fast_answer, fast = time_calls(expression)
+        slow_answer, slow = time_calls(expression, **SYMPY_ONLY)
+        _, memo = time_calls(expression, **SYMPY_MEMO)
+    assert fast_answer == slow_answer, (fast_answer, slow_answer)
+
+    return {
+        "expression": expression,
+        "answer": fast_answer,
+        "fast_path": fast_evaluate(expression) is not None,
+        "fast_us": round(fast * 1e6, 2),
+        "sympy_us": round(slow * 1e6, 2),
+        "sympy_memo_hit_us": round(memo * 1e6, 2),
+        "speedup": round(slow / fast, 1),
+    }
+
+
+if __name__ == "__main__":
+    results = [bench_expression(expression) for expression in COMMON_EXPRESSIONS]
+    speedups = sorted(result["speedup"] for result in results)
+    print(json.dumps({
+        "expressions": results,
+        "median_speedup": speedups[len(speedups) // 2],
+        "min_speedup": speedups[0],
+    }, indent=2))
@@ -0,0 +1,166 @@
+"""
+Context Prompt Microbenchmark for Lexi
+Measures the per-turn cost of building the model input (as LexiAgent
+sends it: history messages plus the new turn) at different
+history lengths, with and without a token budget, against the original
+full-rebuild implementation, checks that recall of older turns keeps an
+early fact in the budgeted prompt, and measures how much of each model
+input repeats the previous one (reusable by a provider prefix cache).
+
+Run with: python -m benchmarks.bench_context
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+
+from benchmarks.fake_model import make_fake_agent
+
+HISTORY_SIZES = [10, 1_000, 10_000]
+SAMPLE_TURNS = 50
+
+
+def legacy_build_context_prompt(history: list) -> str:
+    """The original O(n) per-call builder, kept for comparison."""
+    if not history:
+        return ""
+    
+    context = "\n\n📜 CONVERSATION HISTORY (Read this before responding):\n"
+    context += "="*60 + "\n"
+    for i, turn in enumerate(history, 1):
+        context += f"\n[Message {i}]\n"
+        context += f"User: {turn['user']}\n"
+        context += f"You: {turn['assistant']}\n"
+    context += "="*60 + "\n"
+    context += "END OF HISTORY - Now respond to the new message below.\n\n"
+    return context
+
+
+def make_turn(i: int) -> dict:
+    return {
+        "timestamp": "2025-10-21T00:42:37.362637",
+        "message_number": i + 1,
+        "user": f"Question number {i}: what is {i} * 4?",
+        "assistant": f"{i} * 4 equals {i * 4}. Anything else I can calculate for you?",
+    }
+
+
+def input_chars(messages: list) -> int:
+    """Characters of message content in a model input."""
+    return sum(len(message["content"]) for message in messages)
+
+
+def time_agent(size: int, **agent_kwargs):
+    """
+    Time SAMPLE_TURNS append+build cycles of the model input LexiAgent
+    actually sends; returns (seconds/turn, agent).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = make_fake_agent(latency=0, **agent_kwargs)
+    agent.conversation_history = [make_turn(i) for i in range(size)]
+    agent._build_input("warm up")  # warm the window as a live session would
+    
+    start = time.perf_counter()
+    for i in range(size, size + SAMPLE_TURNS):
+        agent.conversation_history.append(make_turn(i))
+        agent._build_input(f"Question number {i}")
+    return (time.perf_counter() - start) / SAMPLE_TURNS, agent
+
+
+def bench_size(size: int) -> dict:
+    """Compare unbudgeted, budgeted and legacy builders at one history size."""
+    incremental, agent = time_agent(size, context_token_budget=None)
+    budgeted, budget_agent = time_agent(size)
+    
+    history = [make_turn(i) for i in range(size)]
+    start = time.perf_counter()
+    for i in range(size, size + SAMPLE_TURNS):
+        history.append(make_turn(i))
+        legacy_build_context_prompt(history)
+    legacy = (time.perf_counter() - start) / SAMPLE_TURNS
+    
+    # The string rendering must still match the original format
+    assert agent._build_context_prompt() == legacy_build_context_prompt(history)
+    
+    return {
+        "history_turns": size,
+        "input_chars": input_chars(agent._build_input("next")),
+        "budgeted_input_chars": input_chars(budget_agent._build_input("next")),
+        "incremental_us_per_turn": round(incremental * 1e6, 2),
+        "budgeted_us_per_turn": round(budgeted * 1e6, 2),
+        "legacy_us_per_turn": round(legacy * 1e6, 2),
+    }
+
+
+NAME_TURN = {
+    "timestamp": "2025-10-21T00:40:00.000000",
+    "message_number": 1,
+    "user": "Hi! My name is Ada and I live in Lisbon.",
+    "assistant": "Nice to meet you, Ada! How can I help you today?",
+}
+
+
+def bench_recall(size: int) -> dict:
+    """Budgeted prompt with recall: does turn 1 (the user's name) come back?"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = make_fake_agent(latency=0)
+    agent.conversation_history = [NAME_TURN] + [make_turn(i) for i in range(1, size)]
+    agent._build_input("warm up")
+    
+    start = time.perf_counter()
+    for i in range(size, size + SAMPLE_TURNS):
+        agent.conversation_history.append(make_turn(i))
+        messages = agent._build_input("By the way, what's my name?")
+    elapsed = (time.perf_counter() - start) / SAMPLE_TURNS
+    
+    return {
+        "history_turns": size,
+        "input_chars": input_chars(messages),
+        "recalled_name": any("My name is Ada" in message["content"] for message in messages),
+        "us_per_turn": round(elapsed * 1e6, 2),
+    }
+
+
+def _shared_prefix(a: str, b: str) -> int:
+    return len(os.path.commonprefix([a, b]))
+
+
+def bench_prefix(size: int) -> dict:
+    """
+    Share of each model input that repeats the previous turn's input
+    byte for byte (what a provider prefix cache can reuse), for the
+    message-list input against the old single-string prompt.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = make_fake_agent(latency=0)
+    agent.conversation_history = [NAME_TURN] + [make_turn(i) for i in range(1, size)]
+    
+    messages_shared = string_shared = messages_total = string_total = 0
+    previous_messages = previous_string = ""
+    for i in range(size, size + SAMPLE_TURNS):
+        query = f"What did I say about {i - 3}? And what's my name?"
+        messages = json.dumps(agent._build_input(query), ensure_ascii=False)
+        string = f"{agent._build_context_prompt(query)}Current User Message: {query}"
+        if previous_messages:
+            messages_shared += _shared_prefix(previous_messages, messages)
+            string_shared += _shared_prefix(previous_string, string)
+            messages_total += len(messages)
+            string_total += len(string)
+        previous_messages, previous_string = messages, string
+        agent.conversation_history.append(make_turn(i))
+    
+    return {
+        "history_turns": size,
+        "message_list_reused_pct": round(100 * messages_shared / messages_total, 1),
+        "single_prompt_reused_pct": round(100 * string_shared / string_total, 1),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps({
+        "context": [bench_size(size) for size in HISTORY_SIZES],
+        "recall": [bench_recall(size) for size in HISTORY_SIZES],
+        "prefix_reuse": [bench_prefix(size) for size in HISTORY_SIZES],
+    }, indent=2))
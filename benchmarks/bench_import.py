@@ -0,0 +1,102 @@
+"""
+Import-Time Benchmark for Lexi
+Measures cold start in fresh interpreters: `python -X importtime` for
+core.agent_state, time until an agent has answered its first message,
+and what the deferred tool backends cost when first used. Exits with
+status 1 if a heavy backend is imported at startup again, so it can be
+used as a regression check.
+
+Run with: python -m benchmarks.bench_import --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Tool backends that must not be imported until a tool needs them
+DEFERRED_MODULES = ["sympy", "mpmath", "wikipedia", "bs4"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READY_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from benchmarks.fake_model import make_fake_agent
+    agent = make_fake_agent(latency=0, history_path="/dev/null", context_token_budget=None)
+    agent.process_message("hello")
+ready = time.perf_counter()
+loaded = [name for name in %r if name in sys.modules]
+with contextlib.redirect_stdout(io.StringIO()):
+    import wikipedia, sympy
+print(json.dumps({
+    "ready_s": ready - start,
+    "deferred_import_s": time.perf_counter() - ready,
+    "loaded_at_startup": loaded,
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def import_profile(module: str, top: int = 8) -> dict:
+    """Parse `-X importtime` output into the module's total and its slowest direct imports."""
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    children, total_us = [], 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        # Imports are listed after their own imports, indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                total_us = int(cumulative)
+                break
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+
+    slowest = sorted(children, reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "slowest_imports_ms": {name: round(cumulative / 1000, 1) for cumulative, name in slowest},
+    }
+
+
+def cold_start(runs: int) -> dict:
+    """Median time for a fresh process to import, build an agent and answer once."""
+    samples = [json.loads(run_python("-c", READY_SCRIPT).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return {
+        "first_message_ready_ms": round(statistics.median(s["ready_s"] for s in samples) * 1000, 1),
+        "deferred_backends_ms": round(statistics.median(s["deferred_import_s"] for s in samples) * 1000, 1),
+        "loaded_at_startup": samples[0]["loaded_at_startup"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lexi startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = {
+        "import_core_agent_state": import_profile("core.agent_state"),
+        **cold_start(args.runs),
+    }
+    result["benchmark_s"] = round(time.perf_counter() - start, 1)
+    print(json.dumps(result, indent=2))
+
+    if result["loaded_at_startup"]:
+        print(f"❌ Imported at startup: {', '.join(result['loaded_at_startup'])}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,86 @@
+"""
+Turn Memory Benchmark for Lexi
+Compares resident bytes per history turn for the original dict turns
+against core.turns.Turn records at 100k turns. The user/assistant texts
+are allocated up front and shared, so the numbers are the per-turn
+overhead the representation adds on top of the message text.
+
+Run with: python -m benchmarks.bench_turns
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from core import turns
+from core.turns import Turn
+
+TURNS = 100_000
+PROMPTS = ["hi", "what's my name?", "what time is it?", "thanks!"]
+
+
+def make_texts(count: int) -> list:
+    """(user, assistant) pairs; a quarter of the prompts repeat."""
+    texts = []
+    for i in range(count):
+        user = PROMPTS[i % len(PROMPTS)] if i % 4 == 0 else f"Question number {i}: what is {i} * 4?"
+        # Built at runtime like real messages, so repeats are distinct objects
+        user = "".join(list(user))
+        texts.append((user, f"{i} * 4 equals {i * 4}. Anything else I can calculate for you?"))
+    return texts
+
+
+def dict_turn(i: int, created: datetime, user: str, assistant: str) -> dict:
+    return {
+        "timestamp": created.isoformat(),
+        "message_number": i + 1,
+        "user": user,
+        "assistant": assistant,
+    }
+
+
+def record_turn(i: int, created: datetime, user: str, assistant: str) -> Turn:
+    return Turn(created.timestamp(), i + 1, user, assistant)
+
+
+def measure(factory, texts: list) -> dict:
+    """Bytes per turn and build time for a history of len(texts) turns."""
+    start_time = datetime(2025, 10, 21, 0, 42, 37, 362637)
+    times = [start_time + timedelta(seconds=7 * i, microseconds=i) for i in range(len(texts))]
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    history = [factory(i, times[i], user, assistant) for i, (user, assistant) in enumerate(texts)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    assert len(history) == len(texts)
+    return {
+        "bytes_per_turn": round(used / len(texts), 1),
+        "build_ms": round(elapsed * 1000, 1),
+    }
+
+
+def run(count: int = TURNS) -> dict:
+    texts = make_texts(count)
+    before = measure(dict_turn, texts)
+    after = measure(record_turn, texts)
+    return {
+        "turns": count,
+        "dict": before,
+        "turn_record": after,
+        "saved_bytes_per_turn": round(before["bytes_per_turn"] - after["bytes_per_turn"], 1),
+        "ratio": round(after["bytes_per_turn"] / before["bytes_per_turn"], 3),
+        # Bounded, unlike sys.intern: distinct short messages are not kept forever
+        "shared_texts": len(turns._shared),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,53 @@
+"""
+Fact Extraction Check for Lexi
+Runs core.facts.FactStore over messages that state facts and messages
+that only look like they do, and checks nothing false is stored. Prints
+a JSON report and exits with status 1 if any case fails.
+
+Run with: python -m benchmarks.facts_check
+"""
+
+import json
+import sys
+
+from core.facts import FactStore
+
+# (message, facts expected from it alone)
+CASES = [
+    ("Hi, my name is ada and I live in Lisbon.", {"name": "Ada", "location": "Lisbon"}),
+    ("call me Robert Smith.", {"name": "Robert Smith"}),
+    ("I'm 34 years old and I work as a data engineer.", {"age": "34", "job": "data engineer"}),
+    ("I love chess and I hate cilantro.", {"likes": ["chess"], "dislikes": ["cilantro"]}),
+    ("remember that my flight is at 9", {"notes": ["my flight is at 9"]}),
+    ("I'm from Brazil originally", {"from": "Brazil"}),
+    # Look like facts, are not
+    ("call me maybe", {}),
+    ("I'm Going.", {}),
+    ("I'm Fine.", {}),
+    ("i prefer not to say", {}),
+    ("I like to know more about Tesla", {}),
+    ("I'd like to book a table", {}),
+    ("Remember to check the weather", {}),
+    ("My name is not important", {}),
+    ("I don't like that", {}),
+]
+
+
+def run_checks() -> dict:
+    results = {}
+    for message, expected in CASES:
+        facts = FactStore()
+        facts.observe(message)
+        got = facts.to_dict()
+        results[message] = {"passed": got == expected, "facts": got}
+    return results
+
+
+if __name__ == "__main__":
+    results = run_checks()
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    failed = [message for message, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
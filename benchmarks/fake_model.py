@@ -0,0 +1,174 @@
+"""
+Fake Model Provider for Lexi Benchmarks
+Local stand-in for the Gemini model so benchmarks never touch the network.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from typing import List, Optional, Tuple
+
+from agents import ModelResponse, Usage
+from agents.models.interface import Model
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+_ids = itertools.count(1)
+
+# One model step's tool calls: [(tool name, arguments), ...]
+ToolStep = List[Tuple[str, dict]]
+
+
+class FakeModel(Model):
+    """
+    Model that answers every request with a canned reply after a delay.
+    
+    With a tool-call script, each run first requests the scripted tool
+    calls (one list per model step, all calls in a step issued together)
+    and only then replies. Streaming requests get the reply word by word
+    as text deltas.
+    
+    Args:
+        latency: Seconds to wait before answering (simulates the provider)
+        reply: Text returned as the assistant message
+        token_delay: Seconds between streamed words
+        script: Tool calls to make before replying, per model step
+    """
+    
+    def __init__(self, latency: float = 0.05, reply: str = "This is a fake reply.",
+                 token_delay: float = 0.0, script: Optional[List[ToolStep]] = None):
+        self.latency = latency
+        self.reply = reply
+        self.token_delay = token_delay
+        self.script = script or []
+        self.calls = 0
+    
+    def _message(self, text: str) -> ResponseOutputMessage:
+        """Wrap text in an assistant output message."""
+        return ResponseOutputMessage(
+            id=f"msg_{next(_ids)}",
+            content=[ResponseOutputText(text=text, type="output_text", annotations=[])],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+    
+    def _next_step(self, input) -> Optional[ToolStep]:
+        """
+        Scripted tool calls for this request, or None once the script is done.
+        
+        The model is stateless, so the step is derived from how many tool
+        outputs the run has already fed back.
+        """
+        answered = 0 if isinstance(input, str) else sum(
+            1 for item in input
+            if isinstance(item, dict) and item.get("type") == "function_call_output"
+        )
+        for step in self.script:
+            if answered == 0:
+                return step
+            answered -= len(step)
+        return None
+    
+    def _output(self, input) -> list:
+        """Output items for one request: the next tool step, else the reply."""
+        step = self._next_step(input)
+        if step is None:
+            return [self._message(self.reply)]
+        return [
+            ResponseFunctionToolCall(
+                arguments=json.dumps(arguments),
+                call_id=f"call_{next(_ids)}",
+                name=name,
+                type="function_call",
+                id=f"fc_{next(_ids)}",
+                status="completed",
+            )
+            for name, arguments in step
+        ]
+    
+    async def get_response(self, system_instructions, input, model_settings, tools,
+                           output_schema, handoffs, tracing, *, previous_response_id=None,
+                           conversation_id=None, prompt=None) -> ModelResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return ModelResponse(
+            output=self._output(input),
+            usage=Usage(requests=1),
+            response_id=None,
+        )
+    
+    async def stream_response(self, system_instructions, input, model_settings, tools,
+                              output_schema, handoffs, tracing, *, previous_response_id=None,
+                              conversation_id=None, prompt=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        
+        output = self._output(input)
+        sequence = 0
+        message = output[0]
+        if isinstance(message, ResponseOutputMessage):
+            words = self.reply.split(" ")
+            for i, word in enumerate(words):
+                if i and self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                yield ResponseTextDeltaEvent(
+                    content_index=0,
+                    delta=word if i == len(words) - 1 else word + " ",
+                    item_id=message.id,
+                    output_index=0,
+                    type="response.output_text.delta",
+                    sequence_number=sequence,
+                    logprobs=[],
+                )
+                sequence += 1
+        
+        response = Response(
+            id=f"resp_{next(_ids)}",
+            created_at=time.time(),
+            model="fake",
+            object="response",
+            output=output,
+            tool_choice="auto",
+            top_p=None,
+            temperature=None,
+            tools=[],
+            parallel_tool_calls=False,
+        )
+        yield ResponseCompletedEvent(
+            response=response, type="response.completed", sequence_number=sequence
+        )
+
+
+def make_fake_agent(latency: float = 0.05, reply: Optional[str] = None,
+                    token_delay: float = 0.0, script: Optional[List[ToolStep]] = None,
+                    **agent_kwargs):
+    """
+    Create a LexiAgent wired to a FakeModel.
+    
+    Args:
+        latency: Simulated model latency in seconds
+        reply: Optional canned reply text
+        token_delay: Simulated delay between streamed words
+        script: Optional tool calls to make before each reply
+        **agent_kwargs: Extra LexiAgent options (history_path, budgets, ...)
+    
+    Returns:
+        LexiAgent: Agent that never leaves the process
+    """
+    from core.agent_state import LexiAgent
+    
+    model = FakeModel(
+        latency=latency,
+        reply=reply or "This is a fake reply.",
+        token_delay=token_delay,
+        script=script,
+    )
+    return LexiAgent(model=model, model_provider=None, **agent_kwargs)
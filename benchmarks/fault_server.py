@@ -0,0 +1,197 @@
+"""
+Fault-Injecting Chat Completions Stub for Lexi
+Local OpenAI-compatible /v1/chat/completions server that can answer with
+scripted errors (429 with Retry-After, 5xx), slow responses or random
+faults, so the model resilience layer can be exercised without Gemini.
+
+Run standalone with: python -m benchmarks.fault_server --port 8099 --error-rate 0.3
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+REPLY = "Hello from the fault stub."
+
+
+class Fault:
+    """How to answer one request."""
+
+    def __init__(self, status: int = 200, delay: float = 0.0, headers: Optional[dict] = None):
+        self.status = status
+        self.delay = delay
+        self.headers = headers or {}
+
+    @classmethod
+    def ok(cls, delay: float = 0.0) -> "Fault":
+        return cls(200, delay)
+
+    @classmethod
+    def rate_limited(cls, retry_after: Optional[float] = None) -> "Fault":
+        headers = {"Retry-After": f"{retry_after:g}"} if retry_after is not None else {}
+        return cls(429, headers=headers)
+
+    @classmethod
+    def error(cls, status: int = 503) -> "Fault":
+        return cls(status)
+
+
+class FaultServer:
+    """
+    Threaded stub server; scripted faults are served first, in order.
+
+    Once the script is used up, requests fail with error_status at
+    error_rate and otherwise succeed after latency seconds.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.script: "deque[Fault]" = deque()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def push(self, *faults: Fault):
+        """Queue faults for the next requests."""
+        with self._lock:
+            self.script.extend(faults)
+
+    def reset(self, **settings):
+        """Clear the script and counters, optionally changing the defaults."""
+        with self._lock:
+            self.script.clear()
+            self.requests = 0
+            for name, value in settings.items():
+                setattr(self, name, value)
+
+    def _next_fault(self) -> Fault:
+        with self._lock:
+            self.requests += 1
+            if self.script:
+                return self.script.popleft()
+        if random.random() < self.error_rate:
+            return Fault.error(self.error_status)
+        return Fault.ok(self.latency)
+
+    def start(self) -> "FaultServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FaultServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: dict):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                fault = server._next_fault()
+                if fault.delay:
+                    time.sleep(fault.delay)
+
+                if fault.status != 200:
+                    error = {"error": {"message": f"injected {fault.status}", "code": fault.status}}
+                    self._send(fault.status, json.dumps(error).encode(), "application/json", fault.headers)
+                    return
+
+                model = request.get("model", "stub")
+                if request.get("stream"):
+                    self._send(200, _stream_body(model), "text/event-stream", {})
+                else:
+                    self._send(200, json.dumps(_completion(model)).encode(), "application/json", {})
+
+        return Handler
+
+
+def _completion(model: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": REPLY},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def _stream_body(model: str) -> bytes:
+    """SSE body streaming REPLY word by word."""
+    words = REPLY.split(" ")
+    chunks = []
+    for i, word in enumerate(words):
+        delta = {"content": word if i == len(words) - 1 else word + " "}
+        if i == 0:
+            delta["role"] = "assistant"
+        chunks.append({"index": 0, "delta": delta, "finish_reason": None})
+    chunks.append({"index": 0, "delta": {}, "finish_reason": "stop"})
+
+    lines = []
+    for choice in chunks:
+        event = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [choice],
+        }
+        lines.append(f"data: {json.dumps(event)}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injecting chat completions stub")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    stub = FaultServer(args.port, args.latency, args.error_rate, args.error_status)
+    print(f"🧪 Fault stub listening on {stub.base_url}")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
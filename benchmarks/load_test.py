@@ -0,0 +1,112 @@
+"""
+Concurrent Chat Load Test for Lexi
+Drives many LexiAgent sessions at once against a local fake model and
+reports per-message latency percentiles. With --max-runs, the sessions
+share a RunScheduler and the report includes queueing and shed messages.
+
+Run with: python -m benchmarks.load_test --sessions 50 [--max-runs 8]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import time
+from typing import List, Optional
+
+from benchmarks.fake_model import make_fake_agent
+from core.agent_state import BUSY_REPLY
+from core.concurrency import RunScheduler
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def simulate_chat(agent, turns: int, latencies: List[float], errors: List[str], busy: List[str]):
+    """Send a fixed number of messages through one session."""
+    for turn in range(turns):
+        start = time.perf_counter()
+        response = await agent.aprocess_message(f"Message {turn} - what is 25*4?")
+        latencies.append(time.perf_counter() - start)
+        if response.startswith("Sorry, Error"):
+            errors.append(response)
+        elif response == BUSY_REPLY:
+            busy.append(response)
+
+
+async def run_load_test(
+    sessions: int,
+    turns: int,
+    latency: float,
+    max_runs: Optional[int] = None,
+    busy_after: Optional[float] = None,
+) -> dict:
+    """
+    Run concurrent simulated chats and collect latency stats.
+    
+    Args:
+        sessions: Number of concurrent chats
+        turns: Messages sent per chat
+        latency: Fake model latency in seconds
+        max_runs: Share a RunScheduler with this many concurrent runs
+        busy_after: Scheduler wait before a message is shed
+    
+    Returns:
+        dict: Throughput and latency percentiles (milliseconds)
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    busy: List[str] = []
+    scheduler = RunScheduler(max_concurrent=max_runs, busy_after=busy_after) if max_runs else None
+    
+    # The agent prints a banner per message; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        agents = [
+            make_fake_agent(latency=latency, scheduler=scheduler, session_id=f"load-{i}")
+            for i in range(sessions)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(simulate_chat(a, turns, latencies, errors, busy) for a in agents))
+        elapsed = time.perf_counter() - start
+    
+    stats = {
+        "sessions": sessions,
+        "turns_per_session": turns,
+        "model_latency_ms": latency * 1000,
+        "messages": len(latencies),
+        "errors": len(errors),
+        "wall_time_s": round(elapsed, 3),
+        "throughput_msg_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    if scheduler is not None:
+        stats["busy_replies"] = len(busy)
+        stats["run_queue_p95_ms"] = round(scheduler.stats()["wait_p95_s"] * 1000, 2)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lexi concurrent chat load test")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-runs", type=int, default=0, help="RunScheduler cap (0: no scheduler)")
+    parser.add_argument("--busy-after", type=float, default=None, help="Shed after this many seconds queued")
+    args = parser.parse_args()
+    
+    # Per-message agent logs (and shed warnings) would drown the report
+    logging.getLogger("lexi").setLevel(logging.ERROR)
+    
+    stats = asyncio.run(
+        run_load_test(args.sessions, args.turns, args.latency, args.max_runs, args.busy_after)
+    )
+    print(json.dumps(stats, indent=2))
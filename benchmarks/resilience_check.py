@@ -0,0 +1,231 @@
+"""
+Model Resilience Check for Lexi
+Runs the real OpenAIChatCompletionsModel, wrapped in ResilientModel,
+against the local fault-injecting stub and checks retries, Retry-After,
+giving up, hedging, the circuit breaker and streaming retries. Prints a
+JSON report and exits with status 1 if any scenario fails.
+
+Run with: python -m benchmarks.resilience_check
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import sys
+import time
+
+from agents import AsyncOpenAI, ModelSettings, OpenAIChatCompletionsModel
+from agents.models.interface import ModelTracing
+
+from benchmarks.fault_server import REPLY, Fault, FaultServer
+from core.concurrency import ModelOverloadedError
+from core.resilience import CircuitBreaker, CircuitOpenError, ResilientModel
+
+
+def make_model(stub: FaultServer, name: str, **options) -> ResilientModel:
+    client = AsyncOpenAI(api_key="stub", base_url=stub.base_url, max_retries=0)
+    options.setdefault("base_delay", 0.05)
+    return ResilientModel(OpenAIChatCompletionsModel(model="stub", openai_client=client), name=name, **options)
+
+
+def model_args() -> dict:
+    return dict(
+        system_instructions=None, input="hi", model_settings=ModelSettings(), tools=[],
+        output_schema=None, handoffs=[], tracing=ModelTracing.DISABLED,
+        previous_response_id=None, conversation_id=None, prompt=None,
+    )
+
+
+async def ask(model: ResilientModel) -> str:
+    response = await model.get_response(**model_args())
+    return response.output[0].content[0].text
+
+
+async def failure(coro) -> str:
+    """Name of the exception coro raised (or 'none')."""
+    try:
+        await coro
+    except Exception as e:
+        return type(e).__name__
+    return "none"
+
+
+# ============================================================
+# 🧪 SCENARIOS
+# ============================================================
+
+
+async def retries_server_errors(stub: FaultServer) -> dict:
+    stub.push(Fault.error(500), Fault.error(503))
+    reply = await ask(make_model(stub, "check-retry"))
+    return {"passed": reply == REPLY and stub.requests == 3, "requests": stub.requests}
+
+
+async def honors_retry_after(stub: FaultServer) -> dict:
+    stub.push(Fault.rate_limited(retry_after=1))
+    start = time.perf_counter()
+    reply = await ask(make_model(stub, "check-retry-after"))
+    waited = time.perf_counter() - start
+    return {"passed": reply == REPLY and waited >= 1.0 and stub.requests == 2,
+            "waited_s": round(waited, 3), "requests": stub.requests}
+
+
+async def gives_up(stub: FaultServer) -> dict:
+    stub.reset(error_rate=1.0)
+    error = await failure(ask(make_model(stub, "check-give-up", max_attempts=3)))
+    return {"passed": error == "InternalServerError" and stub.requests == 3,
+            "error": error, "requests": stub.requests}
+
+
+async def client_errors_not_retried(stub: FaultServer) -> dict:
+    stub.push(Fault.error(400))
+    error = await failure(ask(make_model(stub, "check-400")))
+    return {"passed": error == "BadRequestError" and stub.requests == 1, "error": error,
+            "requests": stub.requests}
+
+
+async def circuit_breaker(stub: FaultServer) -> dict:
+    stub.reset(error_rate=1.0)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.5, name="check-breaker")
+    model = make_model(stub, "check-breaker", max_attempts=1, breaker=breaker)
+
+    for _ in range(3):
+        await failure(ask(model))
+    reached_provider = stub.requests
+
+    start = time.perf_counter()
+    shed = [await failure(ask(model)) for _ in range(20)]
+    shed_ms = (time.perf_counter() - start) / len(shed) * 1000
+    opened = breaker.state == CircuitBreaker.OPEN and stub.requests == reached_provider
+
+    stub.reset(error_rate=0.0)
+    await asyncio.sleep(0.5)
+    recovered = await ask(model) == REPLY and breaker.state == CircuitBreaker.CLOSED
+    return {
+        "passed": opened and set(shed) == {CircuitOpenError.__name__} and recovered,
+        "opened_after_failures": reached_provider,
+        "shed_call_ms": round(shed_ms, 3),
+        "recovered": recovered,
+    }
+
+
+class OverloadedModel:
+    """Fails every call locally, as FairLimiter does when it sheds one."""
+
+    async def get_response(self, *args, **kwargs):
+        raise ModelOverloadedError("check: limiter queue full")
+
+
+async def local_errors_leave_breaker_alone(stub: FaultServer) -> dict:
+    """Only provider answers move the breaker: 5xx count, 4xx reset, local errors neither."""
+    stub.reset(error_rate=1.0)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60, name="check-local")
+    provider = make_model(stub, "check-local", max_attempts=1, breaker=breaker)
+    local = ResilientModel(OverloadedModel(), name="check-local-limiter", max_attempts=1, breaker=breaker)
+
+    for _ in range(2):
+        await failure(ask(provider))
+    error = await failure(ask(local))
+    kept_failures = breaker._failures
+
+    stub.reset(error_rate=0.0)
+    stub.push(Fault.error(400))
+    await failure(ask(provider))
+    return {
+        "passed": error == "ModelOverloadedError" and kept_failures == 2 and breaker._failures == 0,
+        "failures_after_local_error": kept_failures,
+        "failures_after_400": breaker._failures,
+    }
+
+
+async def open_circuit_busy_reply(stub: FaultServer) -> dict:
+    """A LexiAgent turn shed by the open circuit gets BUSY_REPLY, not an error."""
+    from core.agent_state import BUSY_REPLY, LexiAgent
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, name="check-busy")
+    breaker.record_failure()
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = LexiAgent(model=make_model(stub, "check-busy", breaker=breaker), model_provider=None,
+                          history_path="/dev/null", context_token_budget=None)
+    reply = await agent.aprocess_message("hello")
+    streamed = [event async for event in agent.astream_message("hello")]
+    return {
+        "passed": reply == BUSY_REPLY and streamed == [("error", BUSY_REPLY)] and stub.requests == 0,
+        "reply": reply,
+        "recorded_turns": len(agent.conversation_history),
+    }
+
+
+async def hedges_slow_requests(stub: FaultServer) -> dict:
+    stub.reset(latency=0.02)
+    model = make_model(stub, "check-hedge", hedge=True, hedge_min_samples=20)
+    for _ in range(30):
+        await ask(model)
+
+    stub.push(Fault.ok(delay=1.0))
+    start = time.perf_counter()
+    reply = await ask(model)
+    elapsed = time.perf_counter() - start
+    stub.reset(latency=0.0)
+    return {
+        "passed": reply == REPLY and elapsed < 0.5 and model._hedge_wins.value >= 1,
+        "slow_call_s": round(elapsed, 3),
+        "hedge_delay_s": round(model.hedge_delay(), 4),
+        "hedges": int(model._hedges.value),
+    }
+
+
+async def retries_stream_before_first_event(stub: FaultServer) -> dict:
+    stub.push(Fault.error(503))
+    model = make_model(stub, "check-stream")
+    events = [event async for event in model.stream_response(**model_args())]
+    deltas = "".join(getattr(e, "delta", "") for e in events if e.type == "response.output_text.delta")
+    return {"passed": deltas == REPLY and stub.requests == 2, "requests": stub.requests}
+
+
+async def agent_survives_faults(stub: FaultServer) -> dict:
+    """A LexiAgent turn through a 429 and a 500 still gets the real reply."""
+    from core.agent_state import LexiAgent
+
+    stub.push(Fault.rate_limited(retry_after=0.2), Fault.error(500))
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = LexiAgent(model=make_model(stub, "check-agent"), model_provider=None,
+                          history_path="/dev/null", context_token_budget=None)
+    reply = await agent.aprocess_message("hello")
+    return {"passed": reply == REPLY, "reply": reply, "requests": stub.requests}
+
+
+SCENARIOS = [
+    retries_server_errors,
+    honors_retry_after,
+    gives_up,
+    client_errors_not_retried,
+    circuit_breaker,
+    local_errors_leave_breaker_alone,
+    open_circuit_busy_reply,
+    hedges_slow_requests,
+    retries_stream_before_first_event,
+    agent_survives_faults,
+]
+
+
+async def run_checks() -> dict:
+    results = {}
+    with FaultServer() as stub:
+        for scenario in SCENARIOS:
+            stub.reset(error_rate=0.0, latency=0.0)
+            results[scenario.__name__] = await scenario(stub)
+    return results
+
+
+if __name__ == "__main__":
+    logging.getLogger("lexi").setLevel(logging.ERROR)
+    results = asyncio.run(run_checks())
+    print(json.dumps(results, indent=2))
+
+    failed = [name for name, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
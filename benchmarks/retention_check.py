@@ -0,0 +1,117 @@
+"""
+History Retention Check for Lexi
+Writes session histories through both stores, backdates some of them and
+checks that the retention sweeps in core.history_store delete exactly
+the stale sessions (every file or row they own) while keeping fresh
+ones and the ones passed in keep. Prints a JSON report and exits with
+status 1 if any case fails.
+
+Run with: python -m benchmarks.retention_check
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from core.history_store import (
+    JournalHistoryStore,
+    SQLiteHistoryStore,
+    prune_journal_histories,
+    prune_sqlite_histories,
+)
+from core.session_registry import session_history_path
+
+DAY = 86400.0
+
+
+def make_turn(number: int, age: float = 0.0) -> dict:
+    return {
+        "timestamp": datetime.fromtimestamp(time.time() - age).isoformat(),
+        "message_number": number,
+        "user": f"Question {number}",
+        "assistant": f"Answer {number}",
+    }
+
+
+# ============================================================
+# 🧪 CASES
+# ============================================================
+
+
+def journal_sessions() -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {}
+        for session_id in ("fresh", "stale", "stale-kept"):
+            store = JournalHistoryStore(session_history_path(session_id, directory))
+            store.replace("2025-01-01T00:00:00", 1, [make_turn(1)])
+            store.append([make_turn(2)])
+            store.save_facts({"name": "Ada"})
+            stores[session_id] = store
+
+        old = time.time() - 40 * DAY
+        for session_id in ("stale", "stale-kept"):
+            store = stores[session_id]
+            for path in (store.path, store.journal_path, store.facts_path):
+                os.utime(path, (old, old))
+
+        keep = {session_history_path("stale-kept", directory)}
+        removed = prune_journal_histories(directory, 30 * DAY, keep=keep)
+        left = sorted(os.listdir(directory))
+
+    expected = sorted(
+        f"{session_id}{suffix}"
+        for session_id in ("fresh", "stale-kept")
+        for suffix in (".json", ".jsonl", ".facts.json")
+    )
+    return {"passed": removed == 1 and left == expected, "removed": removed, "left": left}
+
+
+def sqlite_sessions() -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "lexi.sqlite3")
+        ages = {"fresh": 0.0, "stale": 40 * DAY, "stale-kept": 40 * DAY, "old-start-new-turn": 1.0}
+        for session_id, age in ages.items():
+            store = SQLiteHistoryStore(db_path, session_id)
+            start = datetime.fromtimestamp(time.time() - 60 * DAY).isoformat()
+            store.replace(start, 1, [make_turn(1, 50 * DAY), make_turn(2, age)])
+            store.save_facts({"name": "Ada"})
+        # Reset long ago, never used since
+        SQLiteHistoryStore(db_path, "empty").reset(datetime.fromtimestamp(time.time() - 40 * DAY).isoformat())
+
+        removed = prune_sqlite_histories(db_path, 30 * DAY, keep={"stale-kept"})
+        left = {
+            session_id: SQLiteHistoryStore(db_path, session_id).load()[0] is not None
+            for session_id in (*ages, "empty")
+        }
+        facts_left = bool(SQLiteHistoryStore(db_path, "stale").load_facts())
+
+    return {
+        "passed": (
+            removed == 2
+            and left == {"fresh": True, "stale": False, "stale-kept": True,
+                         "old-start-new-turn": True, "empty": False}
+            and not facts_left
+        ),
+        "removed": removed,
+        "left": left,
+    }
+
+
+CASES = [journal_sessions, sqlite_sessions]
+
+
+def run_checks() -> dict:
+    return {case.__name__: case() for case in CASES}
+
+
+if __name__ == "__main__":
+    results = run_checks()
+    print(json.dumps(results, indent=2))
+
+    failed = [name for name, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
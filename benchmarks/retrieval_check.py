@@ -0,0 +1,75 @@
+"""
+Recall Check for Lexi
+Runs core.retrieval.TurnIndex over small and large histories and checks
+that the right turns are recalled: a single indexed turn, a short
+history where the user repeats a question, and a long history where
+near-universal terms are skipped. Prints a JSON report and exits with
+status 1 if any case fails.
+
+Run with: python -m benchmarks.retrieval_check
+"""
+
+import json
+import sys
+
+from core.retrieval import TurnIndex
+
+
+def turn(user: str, assistant: str = "Okay.") -> dict:
+    return {"user": user, "assistant": assistant}
+
+
+def search(turns: list, query: str, k: int = 3) -> list:
+    index = TurnIndex()
+    for item in turns:
+        index.add(item)
+    return [doc for doc, _ in index.search(query, k)]
+
+
+# ============================================================
+# 🧪 CASES
+# ============================================================
+
+
+def single_turn() -> dict:
+    hits = search([turn("My name is Ada.", "Nice to meet you, Ada!")], "what is my name")
+    return {"passed": hits == [0], "hits": hits}
+
+
+def repeated_question() -> dict:
+    """"name" is in 2 of 3 turns; both must still be recalled."""
+    history = [
+        turn("My name is Ada."),
+        turn("Tell me about Lisbon."),
+        turn("Do you remember my name?", "Your name is Ada."),
+    ]
+    hits = search(history, "name", k=2)
+    return {"passed": sorted(hits) == [0, 2], "hits": hits}
+
+
+def skips_common_terms_in_long_history() -> dict:
+    """With 1000 turns, "question" is everywhere and only "lisbon" counts."""
+    history = [turn(f"Question number {i}", f"Answer {i}") for i in range(1000)]
+    history[500] = turn("Question about Lisbon", "Lisbon is the capital of Portugal.")
+    index = TurnIndex()
+    for item in history:
+        index.add(item)
+    hits = index.search("question lisbon", k=3)
+    return {"passed": [doc for doc, _ in hits] == [500], "hits": hits}
+
+
+CASES = [single_turn, repeated_question, skips_common_terms_in_long_history]
+
+
+def run_checks() -> dict:
+    return {case.__name__: case() for case in CASES}
+
+
+if __name__ == "__main__":
+    results = run_checks()
+    print(json.dumps(results, indent=2))
+
+    failed = [name for name, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,81 @@
+"""
+Run Scheduler Check for Lexi
+Drives core.concurrency.RunScheduler with simulated chat users, each
+sending one message at a time, and checks that weights still shape
+their share, that a message queued behind the same user's previous one
+is not shed while capacity is free, and that real overload still is.
+Prints a JSON report and exits with status 1 if any scenario fails.
+
+Run with: python -m benchmarks.scheduler_check
+"""
+
+import asyncio
+import json
+import random
+import sys
+
+from core.concurrency import RunScheduler, SchedulerBusyError
+
+
+async def run(scheduler: RunScheduler, key: str, seconds: float, weight: float = 1.0) -> str:
+    try:
+        async with scheduler.slot(key, weight):
+            await asyncio.sleep(seconds)
+    except SchedulerBusyError:
+        return "busy"
+    return "ok"
+
+
+# ============================================================
+# 🧪 SCENARIOS
+# ============================================================
+
+
+async def weights_with_one_message_in_flight() -> dict:
+    """Five weight-1 users and one weight-4 user on 2 slots, closed loop."""
+    rng = random.Random(1)
+    scheduler = RunScheduler(max_concurrent=2, busy_after=None)
+    weights = {"light-1": 1, "light-2": 1, "light-3": 1, "light-4": 1, "light-5": 1, "heavy": 4}
+    runs = dict.fromkeys(weights, 0)
+    stop = asyncio.get_running_loop().time() + 1.0
+
+    async def user(key: str):
+        while asyncio.get_running_loop().time() < stop:
+            await run(scheduler, key, rng.uniform(0.001, 0.003), weights[key])
+            runs[key] += 1
+
+    await asyncio.gather(*(user(key) for key in weights))
+    light = sum(count for key, count in runs.items() if key != "heavy") / 5
+    ratio = runs["heavy"] / light
+    # One user holds at most one slot, so 4x is out of reach in a closed loop
+    return {"passed": ratio > 2.0, "heavy_to_light_ratio": round(ratio, 2), "runs": runs}
+
+
+async def same_session_wait_not_shed() -> dict:
+    """A second message sent during a long run waits for it, with slots free."""
+    scheduler = RunScheduler(max_concurrent=4, busy_after=0.05)
+    results = await asyncio.gather(run(scheduler, "user", 0.2), run(scheduler, "user", 0.01))
+    return {"passed": results == ["ok", "ok"], "results": results}
+
+
+async def overload_still_shed() -> dict:
+    scheduler = RunScheduler(max_concurrent=1, busy_after=0.05)
+    results = await asyncio.gather(run(scheduler, "first", 0.2), run(scheduler, "second", 0.01))
+    return {"passed": results == ["ok", "busy"], "results": results}
+
+
+SCENARIOS = [weights_with_one_message_in_flight, same_session_wait_not_shed, overload_still_shed]
+
+
+async def run_checks() -> dict:
+    return {scenario.__name__: await scenario() for scenario in SCENARIOS}
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_checks())
+    print(json.dumps(results, indent=2))
+
+    failed = [name for name, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,361 @@
+"""
+Benchmark Suite for Lexi
+Drives LexiAgent and the Chainlit message handler against the local fake
+model (plain replies and scripted tool calls), and measures memory per
+session and persistence cost as history grows. Writes one JSON report;
+with --baseline it compares against an earlier report and exits with
+status 1 on regressions, so it can run as a CI check.
+
+Run with: python -m benchmarks.suite --out results.json [--baseline old.json] [--quick]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import List, Optional
+
+from benchmarks.bench_context import make_turn
+from benchmarks.fake_model import make_fake_agent
+from benchmarks.load_test import percentile
+from core import functions
+from core.history_store import JournalHistoryStore, SQLiteHistoryStore
+
+# One model step asking for every tool at once, then the reply
+TOOL_SCRIPT = [[
+    ("get_current_time", {}),
+    ("calculate", {"expression": "2**64"}),
+    ("search_wiki", {"query": "Nikola Tesla"}),
+]]
+WIKI_SUMMARY = "Nikola Tesla was a Serbian-American inventor and electrical engineer."
+
+FULL = {"sessions": 50, "turns": 5, "history_sizes": [0, 100, 1_000, 10_000], "memory_sessions": 20}
+QUICK = {"sessions": 10, "turns": 3, "history_sizes": [0, 100, 1_000], "memory_sessions": 5}
+
+# Metrics compared against a baseline, and whether higher is better
+TRACKED = {"throughput_msg_per_s": True, "p50_ms": False, "p95_ms": False, "p99_ms": False,
+           "bytes_per_session": False, "append_ms": False, "snapshot_ms": False, "load_ms": False}
+# Timing changes smaller than this are noise, whatever the relative change
+MIN_MS_DELTA = 1.0
+
+
+def seed_wikipedia():
+    """Pre-cache the scripted Wikipedia lookup so tool runs stay offline."""
+    functions.WIKI_DISK_CACHE_PATH = ""
+    functions.WIKI_CACHE.set(functions._normalize_query("Nikola Tesla"), ("summary", WIKI_SUMMARY))
+
+
+def latency_stats(latencies: List[float], elapsed: float, errors: int) -> dict:
+    return {
+        "messages": len(latencies),
+        "errors": errors,
+        "wall_time_s": round(elapsed, 3),
+        "throughput_msg_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+# ============================================================
+# 🤖 AGENT THROUGHPUT
+# ============================================================
+
+
+async def bench_agent(sessions: int, turns: int, latency: float,
+                      script: Optional[list] = None, stream: bool = False) -> dict:
+    """Concurrent sessions calling aprocess_message (or astream_message)."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def chat(agent):
+        nonlocal errors
+        for turn in range(turns):
+            start = time.perf_counter()
+            if stream:
+                async for kind, _ in agent.astream_message(f"Message {turn}"):
+                    errors += kind == "error"
+            else:
+                response = await agent.aprocess_message(f"Message {turn}")
+                errors += response.startswith("Sorry, Error")
+            latencies.append(time.perf_counter() - start)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        agents = [make_fake_agent(latency=latency, script=script) for _ in range(sessions)]
+        start = time.perf_counter()
+        await asyncio.gather(*(chat(agent) for agent in agents))
+        elapsed = time.perf_counter() - start
+    return latency_stats(latencies, elapsed, errors)
+
+
+# ============================================================
+# 💬 CHAINLIT HANDLER
+# ============================================================
+
+
+class _UIMessage:
+    """Records what the handler sends to the browser."""
+
+    def __init__(self, content: str = ""):
+        self.content = content
+        self.tokens = 0
+
+    async def send(self):
+        return self
+
+    async def stream_token(self, token: str):
+        self.tokens += 1
+
+    async def update(self):
+        return self
+
+
+class _UIStep(_UIMessage):
+    def __init__(self, name: str = "", type: str = ""):
+        super().__init__()
+        self.name = name
+        self.input = self.output = ""
+
+
+async def bench_chainlit(sessions: int, turns: int, latency: float, script: Optional[list]) -> dict:
+    """
+    Run config.chainlit_app.main for concurrent sessions.
+
+    Only the browser-facing message objects are replaced; sessions,
+    streaming and write-behind persistence are the real ones. Needs
+    chainlit installed (the Gemini client is created but never called).
+    """
+    os.environ.setdefault("GOOGLE_API_KEY", "unused-by-benchmark")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            from config import chainlit_app
+    except ImportError as e:
+        return {"skipped": f"chainlit handlers unavailable: {e}"}
+
+    from core.session_registry import SessionRegistry
+
+    current = contextvars.ContextVar("benchmark_session")
+    latencies: List[float] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def factory(session_id: str):
+            return make_fake_agent(
+                latency=latency, script=script,
+                history_path=os.path.join(tmp, f"{session_id}.json"),
+            )
+
+        patches = {
+            "cl": SimpleNamespace(Message=_UIMessage, Step=_UIStep),
+            "current_session_id": current.get,
+            "sessions": SessionRegistry(factory=factory, write_behind=chainlit_app.write_behind),
+        }
+        originals = {name: getattr(chainlit_app, name) for name in patches}
+
+        async def chat(session_id: str):
+            current.set(session_id)
+            for turn in range(turns):
+                start = time.perf_counter()
+                await chainlit_app.main(_UIMessage(f"Message {turn}"))
+                latencies.append(time.perf_counter() - start)
+
+        try:
+            for name, value in patches.items():
+                setattr(chainlit_app, name, value)
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                await asyncio.gather(*(chat(f"bench-{i}") for i in range(sessions)))
+                elapsed = time.perf_counter() - start
+                flush_start = time.perf_counter()
+                await chainlit_app.write_behind.aflush()
+                flush = time.perf_counter() - flush_start
+        finally:
+            for name, value in originals.items():
+                setattr(chainlit_app, name, value)
+
+    return {**latency_stats(latencies, elapsed, 0), "write_behind_drain_ms": round(flush * 1000, 2)}
+
+
+# ============================================================
+# 🧠 MEMORY PER SESSION
+# ============================================================
+
+
+def bench_memory(history_sizes: List[int], sessions: int) -> list:
+    """Traced bytes per resident session at each history length."""
+    results = []
+    for size in history_sizes:
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            agents = [make_fake_agent(latency=0) for _ in range(sessions)]
+        for agent in agents:
+            agent.conversation_history = [make_turn(i) for i in range(size)]
+            agent._build_input("next")
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results.append({"history_turns": size, "bytes_per_session": used // sessions})
+        del agents
+    return results
+
+
+# ============================================================
+# 💾 PERSISTENCE COST
+# ============================================================
+
+
+def time_ms(fn, repeat: int = 1) -> float:
+    """Mean milliseconds per call over repeat calls."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) / repeat * 1000, 3)
+
+
+def best_ms(fn, repeat: int = 5) -> float:
+    """Fastest of repeat calls, in milliseconds (steadier than one sample)."""
+    return min(time_ms(fn) for _ in range(repeat))
+
+
+def bench_persistence(history_sizes: List[int], appends: int = 20) -> list:
+    """Append-one-turn, full snapshot and load cost per store and history length."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "journal": lambda size: JournalHistoryStore(os.path.join(tmp, f"journal-{size}.json")),
+            "sqlite": lambda size: SQLiteHistoryStore(os.path.join(tmp, "lexi.sqlite3"), f"s{size}"),
+        }
+        for backend, make_store in stores.items():
+            for size in history_sizes:
+                store = make_store(size)
+                history = [make_turn(i) for i in range(size)]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    agent = make_fake_agent(latency=0, history_store=store)
+                agent.conversation_history = list(history)
+                agent.message_count = size
+                snapshot = best_ms(lambda: store.replace(agent.session_start, size, history))
+                agent._persisted_turns = size
+
+                def append_one():
+                    agent.conversation_history.append(make_turn(len(agent.conversation_history)))
+                    agent.save_history()
+
+                results.append({
+                    "backend": backend,
+                    "history_turns": size,
+                    "append_ms": time_ms(append_one, appends),
+                    "snapshot_ms": snapshot,
+                    "load_ms": best_ms(lambda: store.load()),
+                })
+    return results
+
+
+# ============================================================
+# 📊 REPORT
+# ============================================================
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Tracked numbers keyed by path, e.g. agent_tools.p99_ms or persistence[sqlite/1000].append_ms."""
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, list):
+            for entry in value:
+                label = "/".join(str(v) for k, v in entry.items() if k in ("backend", "history_turns"))
+                flat.update(flatten({f"{name}[{label}]": entry}, prefix))
+        elif isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{name}."))
+        elif name in TRACKED and isinstance(value, (int, float)):
+            flat[f"{prefix}{name}"] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Tracked metrics that got worse than the baseline by more than tolerance."""
+    regressions = []
+    old = flatten(baseline["results"])
+    for path, value in flatten(current["results"]).items():
+        if path not in old or not old[path]:
+            continue
+        if path.endswith("_ms") and abs(value - old[path]) < MIN_MS_DELTA:
+            continue
+        higher_is_better = TRACKED[path.rsplit(".", 1)[-1]]
+        change = (value - old[path]) / old[path]
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append({"metric": path, "baseline": old[path], "current": value,
+                                "change_pct": round(change * 100, 1)})
+    return regressions
+
+
+async def run_suite(config: dict, latency: float) -> dict:
+    seed_wikipedia()
+    sessions, turns = config["sessions"], config["turns"]
+    return {
+        "agent_plain": await bench_agent(sessions, turns, latency),
+        "agent_tools": await bench_agent(sessions, turns, latency, script=TOOL_SCRIPT),
+        "agent_streaming": await bench_agent(sessions, turns, latency, stream=True),
+        "chainlit_handler": await bench_chainlit(sessions, turns, latency, TOOL_SCRIPT),
+        "memory": bench_memory(config["history_sizes"], config["memory_sessions"]),
+        "persistence": bench_persistence(config["history_sizes"]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lexi benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast check")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency (s)")
+    parser.add_argument("--out", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown before a metric counts as regressed")
+    args = parser.parse_args()
+
+    # Per-message agent logs would drown the report
+    logging.getLogger("lexi").setLevel(logging.WARNING)
+    
+    config = QUICK if args.quick else FULL
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model_latency_ms": args.latency * 1000,
+            "config": config,
+        },
+        "results": asyncio.run(run_suite(config, args.latency)),
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if report.get("regressions"):
+        print(f"❌ {len(report['regressions'])} metric(s) regressed", file=sys.stderr)
+        sys.exit(1)
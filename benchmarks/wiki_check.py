@@ -0,0 +1,180 @@
+"""
+Async Wikipedia Client Check for Lexi
+Runs core.wiki_client.AsyncWikipediaClient and the cached lookup in
+core.functions against the local MediaWiki stub and checks the outcome
+shapes, the concurrency cap, connection reuse, closing the client left
+behind by an earlier event loop, and that the disk cache tier stays off
+the event loop. Prints a JSON report and exits with status 1 if any
+scenario fails.
+
+Run with: python -m benchmarks.wiki_check
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import threading
+
+from benchmarks.wiki_server import ERROR_QUERY, PAGES, WikiServer
+from core import functions
+from core.wiki_client import AsyncWikipediaClient, WikipediaAPIError
+
+
+def make_client(stub: WikiServer, **options) -> AsyncWikipediaClient:
+    options.setdefault("rate", 1000.0)
+    options.setdefault("burst", 1000.0)
+    return AsyncWikipediaClient(api_url=stub.api_url, **options)
+
+
+# ============================================================
+# 🧪 SCENARIOS
+# ============================================================
+
+
+async def outcome_shapes(stub: WikiServer) -> dict:
+    client = make_client(stub)
+    try:
+        summary = await client.lookup("Python")
+        suggested = await client.lookup("pythn")
+        options = await client.lookup("Mercury")
+        missing = await client.lookup("qwxzv nothing here")
+        try:
+            await client.lookup(ERROR_QUERY)
+            error = "none"
+        except WikipediaAPIError as e:
+            error = type(e).__name__
+    finally:
+        await client.aclose()
+
+    return {
+        "passed": (
+            summary == ("summary", PAGES["Python (programming language)"])
+            and suggested == summary
+            and options == ("disambiguation", ["Mercury (planet)", "Mercury (element)", "Mercury (mythology)"])
+            and missing == ("not_found", None)
+            and error == "WikipediaAPIError"
+        ),
+        "summary": summary[0],
+        "suggested": suggested[0],
+        "disambiguation": options[1],
+        "missing": missing[0],
+        "error": error,
+    }
+
+
+async def caps_concurrency(stub: WikiServer) -> dict:
+    stub.reset(latency=0.05)
+    client = make_client(stub, max_concurrency=2)
+    try:
+        await asyncio.gather(*(client.lookup("Python") for _ in range(8)))
+    finally:
+        await client.aclose()
+    return {"passed": stub.peak_in_flight <= 2, "peak_in_flight": stub.peak_in_flight}
+
+
+async def reuses_connections(stub: WikiServer) -> dict:
+    client = make_client(stub)
+    try:
+        for _ in range(5):
+            await client.lookup("Python")
+    finally:
+        await client.aclose()
+    return {
+        "passed": stub.requests == 15 and stub.connections == 1,
+        "requests": stub.requests,
+        "connections": stub.connections,
+    }
+
+
+async def closes_client_from_old_loop(stub: WikiServer) -> dict:
+    client = make_client(stub)
+    # First lookup on an idle loop in another thread, as Runner.run_sync leaves it
+    old_loop = asyncio.new_event_loop()
+    try:
+        await asyncio.to_thread(old_loop.run_until_complete, client.lookup("Python"))
+        old_http = client._http
+        await client.lookup("Python")
+        await asyncio.to_thread(old_loop.run_until_complete, asyncio.sleep(0.01))
+    finally:
+        old_loop.close()
+    await asyncio.sleep(0.05)  # let the stub notice the closed socket
+    open_before_close = stub.open_connections
+    await client.aclose()
+
+    return {
+        "passed": old_http.is_closed and client._http is None and open_before_close == 1,
+        "old_client_closed": old_http.is_closed,
+        "open_connections": open_before_close,
+    }
+
+
+async def disk_tier_off_loop(stub: WikiServer) -> dict:
+    loop_thread = threading.get_ident()
+    disk_threads = set()
+    open_disk = functions._disk_cache
+
+    def tracked_disk_cache():
+        disk_threads.add(threading.get_ident())
+        return open_disk()
+
+    saved = (functions.WIKI_CLIENT, functions.WIKI_DISK_CACHE_PATH, functions._wiki_disk_cache)
+    with tempfile.TemporaryDirectory() as directory:
+        functions.WIKI_CLIENT = make_client(stub)
+        functions.WIKI_DISK_CACHE_PATH = f"{directory}/wikipedia.sqlite3"
+        functions._wiki_disk_cache = None
+        functions._disk_cache = tracked_disk_cache
+        functions.WIKI_CACHE.clear()
+        try:
+            fetched = await functions._alookup_wikipedia("Python")
+            functions.WIKI_CACHE.clear()
+            requests = stub.requests
+            from_disk = await functions._alookup_wikipedia("Python")
+            served_from_disk = stub.requests == requests
+        finally:
+            await functions.WIKI_CLIENT.aclose()
+            functions._wiki_disk_cache.close()
+            functions._disk_cache = open_disk
+            functions.WIKI_CLIENT, functions.WIKI_DISK_CACHE_PATH, functions._wiki_disk_cache = saved
+            functions.WIKI_CACHE.clear()
+
+    return {
+        "passed": (
+            fetched == from_disk == ("summary", PAGES["Python (programming language)"])
+            and served_from_disk
+            and bool(disk_threads)
+            and loop_thread not in disk_threads
+        ),
+        "served_from_disk": served_from_disk,
+        "disk_calls_on_loop": loop_thread in disk_threads,
+    }
+
+
+SCENARIOS = [
+    outcome_shapes,
+    caps_concurrency,
+    reuses_connections,
+    closes_client_from_old_loop,
+    disk_tier_off_loop,
+]
+
+
+async def run_checks() -> dict:
+    results = {}
+    with WikiServer() as stub:
+        for scenario in SCENARIOS:
+            stub.reset(latency=0.0)
+            results[scenario.__name__] = await scenario(stub)
+    return results
+
+
+if __name__ == "__main__":
+    logging.getLogger("lexi").setLevel(logging.ERROR)
+    results = asyncio.run(run_checks())
+    print(json.dumps(results, indent=2))
+
+    failed = [name for name, result in results.items() if not result["passed"]]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
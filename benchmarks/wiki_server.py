@@ -0,0 +1,174 @@
+"""
+MediaWiki API Stub for Lexi
+Local api.php server with a few canned pages (a summary, a redirect, a
+disambiguation page, a search suggestion) and an injectable error, so
+AsyncWikipediaClient can be exercised without reaching Wikipedia. It
+counts requests, connections and peak in-flight requests.
+
+Run standalone with: python -m benchmarks.wiki_server --port 8098
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# title -> extract ("" marks a disambiguation page)
+PAGES = {
+    "Python (programming language)": (
+        "Python is a high-level, general-purpose programming language. "
+        "Its design philosophy emphasizes code readability."
+    ),
+    "Mercury": "",
+}
+REDIRECTS = {"Python": "Python (programming language)"}
+SUGGESTIONS = {"pythn": "Python"}
+DISAMBIGUATION_HTML = (
+    '<ul><li class="toclevel-1 tocsection-1"><a href="#Science">Science</a></li></ul>'
+    '<ul><li><a href="/wiki/Mercury_(planet)">Mercury (planet)</a>, the planet</li>'
+    '<li><a href="/wiki/Mercury_(element)">Mercury (element)</a>, a chemical element</li>'
+    '<li><a href="/wiki/Mercury_(mythology)">Mercury (mythology)</a>, a Roman god</li></ul>'
+)
+# Searching for this answers with an API error payload
+ERROR_QUERY = "trigger api error"
+
+
+class WikiServer:
+    """Threaded MediaWiki api.php stub."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.open_connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/w/api.php"
+
+    def reset(self, **settings):
+        """Clear the counters, optionally changing the settings."""
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+            self.peak_in_flight = 0
+            for name, value in settings.items():
+                setattr(self, name, value)
+
+    def start(self) -> "WikiServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "WikiServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name: str, delta: int):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+            if name == "in_flight":
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                server._count("connections", 1)
+                server._count("open_connections", 1)
+
+            def finish(self):
+                server._count("open_connections", -1)
+                super().finish()
+
+            def do_GET(self):
+                server._count("requests", 1)
+                server._count("in_flight", 1)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    params = {name: values[0] for name, values in parse_qs(
+                        urlparse(self.path).query, keep_blank_values=True
+                    ).items()}
+                    body = json.dumps(_answer(params)).encode()
+                finally:
+                    server._count("in_flight", -1)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def _resolve(title: str) -> Optional[str]:
+    title = REDIRECTS.get(title, title)
+    return title if title in PAGES else None
+
+
+def _answer(params: dict) -> dict:
+    """api.php response for the handful of queries the client sends."""
+    if params.get("action") == "parse":
+        return {"parse": {"title": params["page"], "text": {"*": DISAMBIGUATION_HTML}}}
+
+    if params.get("list") == "search":
+        query = params["srsearch"]
+        if query == ERROR_QUERY:
+            return {"error": {"code": "internal", "info": "injected API error"}}
+        info = {}
+        if query.lower() in SUGGESTIONS:
+            info["suggestion"] = SUGGESTIONS[query.lower()]
+        title = _resolve(query) or next((name for name in PAGES if query.lower() in name.lower()), None)
+        results = [{"ns": 0, "title": title}] if title else []
+        return {"query": {"searchinfo": info, "search": results}}
+
+    title = _resolve(params["titles"])
+    if title is None:
+        return {"query": {"pages": {"-1": {"ns": 0, "title": params["titles"], "missing": ""}}}}
+
+    page = {"pageid": 1, "ns": 0, "title": title}
+    if "pageprops" in params.get("prop", ""):
+        if PAGES[title] == "":
+            page["pageprops"] = {"disambiguation": ""}
+    elif params.get("prop") == "extracts":
+        sentences = int(params.get("exsentences", 2))
+        page["extract"] = ". ".join(PAGES[title].split(". ")[:sentences])
+    return {"query": {"pages": {"1": page}}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MediaWiki api.php stub")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    stub = WikiServer(args.port, args.latency)
+    print(f"🧪 Wikipedia stub listening on {stub.api_url}")
+    try:
+        stub._httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -3,12 +3,190 @@ Chainlit Application Handler
 Manages STATEFUL chat interface and user interactions
 """
 
+import asyncio
+import hashlib
+import logging
+import os
+import time
 import chainlit as cl
-from core.agent_state import LexiAgent
+from chainlit.server import app
+from fastapi.responses import PlainTextResponse
+from core.agent_state import BUSY_REPLY, LexiAgent
+from core.concurrency import RunScheduler, SchedulerBusyError
+from core.history_store import (
+    HistoryStore,
+    JournalHistoryStore,
+    SQLiteHistoryStore,
+    prune_journal_histories,
+    prune_sqlite_histories,
+)
+from core.metrics import REGISTRY
+from core.persistence import WriteBehindQueue
+from core.response_cache import ResponseCache
+from core.session_registry import SESSIONS_DIR, SessionRegistry, session_history_path
+from core.telemetry import get_logger
 from config.openai_sdk import llm_model, external_client
 
-# Global agent instance (maintains state per session)
-lexi_agent = None
+# Persistence backend: "journal" (per-session files) or "sqlite" (shared DB)
+HISTORY_BACKEND = os.getenv("LEXI_HISTORY_BACKEND", "journal")
+HISTORY_DB = os.getenv("LEXI_HISTORY_DB", "data/lexi.sqlite3")
+HISTORY_LOAD_LIMIT = int(os.getenv("LEXI_HISTORY_LOAD_LIMIT", "200"))
+
+# Stored histories idle this long are deleted (0 keeps them forever); the
+# sweep runs off the event loop, at most once per prune interval
+HISTORY_RETENTION_DAYS = float(os.getenv("LEXI_HISTORY_RETENTION_DAYS", "30"))
+HISTORY_PRUNE_INTERVAL = float(os.getenv("LEXI_HISTORY_PRUNE_INTERVAL", "3600"))
+
+# Shared reply cache for byte-identical model inputs, i.e. mostly identical
+# first messages across sessions (0 disables it)
+RESPONSE_CACHE_TTL = float(os.getenv("LEXI_RESPONSE_CACHE_TTL", "0"))
+response_cache = ResponseCache(ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_TTL > 0 else None
+
+# Admission for agent runs: global cap, one run per session at a time,
+# "busy" reply once a message has waited LEXI_RUN_BUSY_AFTER seconds
+run_scheduler = RunScheduler(
+    max_concurrent=int(os.getenv("LEXI_RUN_CONCURRENCY", "32")),
+    max_queue=int(os.getenv("LEXI_RUN_QUEUE", "500")),
+    busy_after=float(os.getenv("LEXI_RUN_BUSY_AFTER", "20")),
+)
+
+
+logger = get_logger("chainlit")
+
+
+def parse_run_weights(spec: str) -> dict:
+    """"pro=4,free=1" -> {"pro": 4.0, "free": 1.0}; malformed entries are skipped"""
+    weights = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        tier, _, weight = entry.partition("=")
+        try:
+            weights[tier.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            logger.warning("⚠️ Ignoring malformed LEXI_RUN_WEIGHTS entry: %r", entry)
+    return weights
+
+
+# Scheduler share per user tier (the "tier" key of the Chainlit user's
+# metadata, "default" for anonymous users); unlisted tiers get 1.0
+RUN_WEIGHTS = parse_run_weights(os.getenv("LEXI_RUN_WEIGHTS", ""))
+
+
+def create_history_store(session_id: str) -> HistoryStore:
+    """History store for one session, per LEXI_HISTORY_BACKEND"""
+    if HISTORY_BACKEND == "sqlite":
+        return SQLiteHistoryStore(HISTORY_DB, session_id)
+    return JournalHistoryStore(session_history_path(session_id))
+
+
+def create_agent(session_id: str) -> LexiAgent:
+    """Create a STATEFUL agent bound to one session's stored history"""
+    return LexiAgent(
+        model=llm_model,
+        model_provider=external_client,
+        history_path=session_history_path(session_id),
+        history_store=create_history_store(session_id),
+        history_load_limit=HISTORY_LOAD_LIMIT,
+        response_cache=response_cache,
+        session_id=session_id,
+        scheduler=run_scheduler,
+    )
+
+
+# Background writer: history saves never run on the request path
+write_behind = WriteBehindQueue()
+
+# One isolated agent per chat session, with LRU/TTL eviction
+sessions = SessionRegistry(
+    factory=create_agent,
+    max_sessions=int(os.getenv("LEXI_MAX_SESSIONS", "500")),
+    idle_ttl=float(os.getenv("LEXI_SESSION_TTL", "1800")),
+    max_resident_turns=int(os.getenv("LEXI_MAX_RESIDENT_TURNS", "100000")),
+    write_behind=write_behind,
+)
+
+
+def current_session_id() -> str:
+    """
+    History key for the current chat: the signed-in user, so reloads and
+    new tabs continue their conversation, else the Chainlit session id
+    """
+    user = cl.user_session.get("user")
+    identifier = getattr(user, "identifier", None)
+    if identifier:
+        # Hashed so identifiers never collide once made filename-safe
+        return "user-" + hashlib.sha256(identifier.encode("utf-8")).hexdigest()[:32]
+    return cl.user_session.get("id")
+
+
+def current_run_weight() -> float:
+    """Scheduler weight for the current user, per LEXI_RUN_WEIGHTS"""
+    user = cl.user_session.get("user")
+    tier = (getattr(user, "metadata", None) or {}).get("tier", "default")
+    return RUN_WEIGHTS.get(tier, 1.0)
+
+
+async def current_agent() -> LexiAgent:
+    """Agent for the current session (rehydrated from disk, off the loop, if evicted)"""
+    lexi_agent = await sessions.aget(current_session_id())
+    lexi_agent.run_weight = current_run_weight()
+    return lexi_agent
+
+
+def prune_stale_histories() -> int:
+    """Delete stored histories idle longer than LEXI_HISTORY_RETENTION_DAYS"""
+    max_age = HISTORY_RETENTION_DAYS * 86400
+    resident = sessions.session_ids()
+    if HISTORY_BACKEND == "sqlite":
+        removed = prune_sqlite_histories(HISTORY_DB, max_age, keep=set(resident))
+    else:
+        keep = {session_history_path(session_id) for session_id in resident}
+        removed = prune_journal_histories(SESSIONS_DIR, max_age, keep=keep)
+    if removed:
+        logger.info("🧹 Removed %d stale session histories", removed)
+    return removed
+
+
+_last_prune = float("-inf")
+_prune_task = None
+
+
+def schedule_history_prune():
+    """Start a background sweep of stale histories if one is due"""
+    global _last_prune, _prune_task
+    now = time.monotonic()
+    if HISTORY_RETENTION_DAYS <= 0 or now - _last_prune < HISTORY_PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    _prune_task = asyncio.create_task(asyncio.to_thread(prune_stale_histories))
+    _prune_task.add_done_callback(_log_prune_failure)
+
+
+def _log_prune_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("⚠️ Pruning stale histories failed: %s", task.exception())
+
+
+async def clear_agent_history(lexi_agent: LexiAgent) -> bool:
+    """Clear history inside the session's run slot, so it never races a run in flight"""
+    try:
+        async with lexi_agent._run_slot():
+            lexi_agent.clear_history()
+    except SchedulerBusyError:
+        return False
+    return True
+
+
+# ============================================================
+# 📈 METRICS ENDPOINT
+# ============================================================
+
+if REGISTRY.enabled:
+    @app.get("/metrics")
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(
+            REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
 
 
 # ============================================================
@@ -18,20 +196,13 @@ lexi_agent = None
 @cl.on_chat_start
 async def start():
     """Initialize Lexi when chat starts"""
-    global lexi_agent
-    
-    print("\n" + "="*60)
-    print("🎬 NEW STATEFUL CHAT SESSION STARTED")
-    print("="*60)
+    logger.info("🎬 NEW STATEFUL CHAT SESSION STARTED")
     
-    # Create STATEFUL agent instance
-    lexi_agent = LexiAgent(
-        model=llm_model,
-        model_provider=external_client
-    )
+    # Create (or rehydrate) this session's STATEFUL agent instance
+    lexi_agent = await current_agent()
     
-    # Load previous history if exists
-    lexi_agent.load_history()
+    # Loaded first, so the sweep keeps this session's history
+    schedule_history_prune()
     
     # Build welcome message
     welcome_msg = """👋 **Hi! I'm Lexi, your STATEFUL AI assistant.**
@@ -70,7 +241,7 @@ What would you like to know?"""
 I remember our last {lexi_agent.message_count} messages. Feel free to continue where we left off!"""
         await cl.Message(content=context_msg).send()
     
-    print("✅ Welcome message sent")
+    logger.debug("✅ Welcome message sent")
 
 
 # ============================================================
@@ -80,13 +251,7 @@ I remember our last {lexi_agent.message_count} messages. Feel free to continue w
 @cl.on_message
 async def main(message: cl.Message):
     """Handle incoming messages with full conversation context"""
-    global lexi_agent
-    
-    if lexi_agent is None:
-        await cl.Message(
-            content="❌ Agent not initialized. Please refresh the page."
-        ).send()
-        return
+    lexi_agent = await current_agent()
     
     user_input = message.content
     
@@ -98,31 +263,48 @@ async def main(message: cl.Message):
         return
     
     if user_input.lower() == "/clear":
-        lexi_agent.clear_history()
-        await cl.Message(content="✅ Memory cleared! Starting fresh.").send()
+        if await clear_agent_history(lexi_agent):
+            await cl.Message(content="✅ Memory cleared! Starting fresh.").send()
+        else:
+            await cl.Message(content=BUSY_REPLY).send()
         return
     
-    # Show thinking indicator with context info
-    history_length = len(lexi_agent.get_history())
-    
+    # Show thinking indicator
     msg = cl.Message(content="")
     await msg.send()
     
     # Process message through STATEFUL agent
-    # The agent receives full conversation history injected into the prompt
-    response = lexi_agent.process_message(user_input)
+    # The agent receives full conversation history injected into the prompt.
+    # Tokens are streamed into the message as the model produces them.
+    response = ""
+    tool_steps = []
+    async for kind, payload in lexi_agent.astream_message(user_input):
+        if kind == "text":
+            await msg.stream_token(payload)
+        elif kind == "tool_call":
+            step = cl.Step(name=payload["name"], type="tool")
+            step.input = payload["arguments"]
+            await step.send()
+            tool_steps.append(step)
+        elif kind == "tool_output" and tool_steps:
+            step = tool_steps.pop(0)
+            step.output = str(payload)
+            await step.update()
+        elif kind in ("done", "error"):
+            response = payload
     
-    # Update message with response
+    # Final answer replaces any text streamed before tool calls
     msg.content = response
     await msg.update()
     
-    # Save history after each message
-    lexi_agent.save_history()
+    # Save history after each message (coalesced, off the event loop)
+    write_behind.submit(current_session_id(), lexi_agent.save_history)
     
     # Show session info in console
-    session_info = lexi_agent.get_session_info()
-    print(f"📊 Session: {session_info['message_count']} messages, "
-          f"{session_info['history_length']} in history")
+    logger.debug(
+        "📊 Session: %d messages, %d in history",
+        lexi_agent.message_count, len(lexi_agent.conversation_history),
+    )
 
 
 # ============================================================
@@ -132,7 +314,7 @@ async def main(message: cl.Message):
 @cl.action_callback("show_context")
 async def show_context():
     """Show current conversation context"""
-    global lexi_agent
+    lexi_agent = await current_agent()
     
     if lexi_agent:
         summary = lexi_agent.summarize_conversation()
@@ -142,13 +324,15 @@ async def show_context():
 @cl.action_callback("clear_history")
 async def clear_history():
     """Clear conversation history"""
-    global lexi_agent
+    lexi_agent = await current_agent()
     
     if lexi_agent:
-        lexi_agent.clear_history()
-        await cl.Message(
-            content="✅ Conversation history cleared. Starting fresh!"
-        ).send()
+        if await clear_agent_history(lexi_agent):
+            await cl.Message(
+                content="✅ Conversation history cleared. Starting fresh!"
+            ).send()
+        else:
+            await cl.Message(content=BUSY_REPLY).send()
 
 
 # ============================================================
@@ -157,18 +341,22 @@ async def clear_history():
 
 @cl.on_chat_end
 async def end():
-    """Save history when chat ends"""
-    global lexi_agent
+    """Save history and release the session when chat ends"""
+    session_id = current_session_id()
+    lexi_agent = sessions.peek(session_id)
     
     if lexi_agent:
-        lexi_agent.save_history()
+        # Queue the final save, free the agent's memory, then wait for the write.
+        # A run still in flight keeps the agent resident; its save is queued here
+        # and the registry evicts it once idle.
+        if not sessions.evict(session_id):
+            write_behind.submit(session_id, lexi_agent.save_history)
+        await write_behind.aflush(session_id)
         
-        # Print final summary
-        print("\n" + "="*60)
-        print("💾 CONVERSATION SAVED")
-        print(lexi_agent.summarize_conversation())
-        print("👋 CHAT SESSION ENDED")
-        print("="*60 + "\n")
+        # Log final summary
+        logger.info("💾 CONVERSATION SAVED - 👋 CHAT SESSION ENDED")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s", lexi_agent.summarize_conversation())
 
 
 # ============================================================
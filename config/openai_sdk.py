@@ -388,9 +388,14 @@ OpenAI SDK Configuration for Google Gemini
 Sets up the Gemini model using OpenAI SDK wrapper
 """
 
+import importlib.util
 import os
+import httpx
 from dotenv import load_dotenv
 from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+from openai import DefaultAsyncHttpxClient
+from core.concurrency import FairLimiter, ThrottledModel
+from core.resilience import CircuitBreaker, ResilientModel
 
 # Load environment variables
 load_dotenv()
@@ -406,24 +411,70 @@ print("✅ API key loaded")
 # 🔧 CLIENT SETUP
 # ============================================================
 
+# Explicit HTTP pool: bounded sockets, reused connections, fixed timeouts
+MAX_CONNECTIONS = int(os.getenv("LEXI_MODEL_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("LEXI_MODEL_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("LEXI_MODEL_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT = float(os.getenv("LEXI_MODEL_CONNECT_TIMEOUT", "5"))
+REQUEST_TIMEOUT = float(os.getenv("LEXI_MODEL_TIMEOUT", "60"))
+
+# HTTP/2 needs the optional h2 package (the "http2" extra: pip install "lexi[http2]")
+HTTP2 = os.getenv("LEXI_HTTP2", "0") == "1"
+if HTTP2 and importlib.util.find_spec("h2") is None:
+    print("⚠️  LEXI_HTTP2=1 but the h2 package is not installed - using HTTP/1.1")
+    HTTP2 = False
+
+http_client = DefaultAsyncHttpxClient(
+    http2=HTTP2,
+    limits=httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    ),
+    timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+)
+
 # Initialize Gemini client via OpenAI SDK wrapper
 external_client = AsyncOpenAI(
     api_key=GOOGLE_API_KEY,
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    http_client=http_client,
+    max_retries=0,  # retries are handled by ResilientModel below
 )
 
-print("✅ Gemini client initialized")
+print(f"✅ Gemini client initialized (pool: {MAX_CONNECTIONS} connections, HTTP/{'2' if HTTP2 else '1.1'})")
 
 # ============================================================
 # 🧠 MODEL SETUP
 # ============================================================
 
 # Configure the language model
-llm_model = OpenAIChatCompletionsModel(
+gemini_model = OpenAIChatCompletionsModel(
     model="gemini-2.5-flash",
     openai_client=external_client,
 )
 
+# Every model call waits for a slot: bursts queue (fairly across sessions)
+# instead of opening unbounded requests and running into provider 429s
+model_limiter = FairLimiter(
+    max_concurrent=int(os.getenv("LEXI_MODEL_CONCURRENCY", str(MAX_CONNECTIONS))),
+    max_queue=int(os.getenv("LEXI_MODEL_QUEUE", "200")),
+    queue_timeout=float(os.getenv("LEXI_MODEL_QUEUE_TIMEOUT", "30")),
+)
+
+# Retries with backoff (outside the limiter, so waiting doesn't hold a
+# slot), optional hedging, and a circuit breaker that sheds load while
+# Gemini keeps failing
+llm_model = ResilientModel(
+    ThrottledModel(gemini_model, model_limiter),
+    max_attempts=int(os.getenv("LEXI_MODEL_MAX_ATTEMPTS", "4")),
+    hedge=os.getenv("LEXI_MODEL_HEDGE", "0") == "1",
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("LEXI_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("LEXI_BREAKER_RESET", "30")),
+    ),
+)
+
 print("✅ Gemini model configured (gemini-2.5-flash)")
 
 # ============================================================
@@ -434,7 +485,7 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("🧪 TESTING MODEL CONFIGURATION")
     print("="*60)
-    print(f"Model: {llm_model.model}")
+    print(f"Model: {gemini_model.model}")
     print(f"Client: {type(external_client).__name__}")
     print("="*60)
     print("✅ Configuration test passed!")
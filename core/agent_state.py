@@ -3,25 +3,100 @@ Agent State Module for Lexi
 Implements TRUE STATEFULNESS with explicit conversation history management.
 """
 
-from agents import Agent, RunConfig, Runner, function_tool
-from typing import Optional, Dict, Any, List
-import json
-import os
+from agents import Agent, ModelSettings, RunConfig, RunHooks, Runner, function_tool
+from openai.types.responses import ResponseTextDeltaEvent
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import asyncio
+import contextlib
+import os
+import threading
+import time
+
+from core.concurrency import CURRENT_SESSION, ModelOverloadedError, RunScheduler, SchedulerBusyError
+from core.context_window import ContextWindow, estimate_tokens
+from core.facts import FactStore
+from core.history_store import HistoryStore, JournalHistoryStore
+from core.metrics import REGISTRY
+from core.resilience import CircuitOpenError
+from core.response_cache import ResponseCache
+from core.telemetry import get_logger, observe_stage, stage, timed
+from core.turns import HistoryView, Turn, to_turns
 
 # Import tool functions
 from core.functions import (
     get_current_time as core_get_current_time,
     calculate_expression as core_calculate_expression,
-    search_wikipedia as core_search_wikipedia
+    asearch_wikipedia as core_asearch_wikipedia
 )
 
+logger = get_logger("agent")
+
+# ============================================================
+# 🧵 TOOL EXECUTION
+# ============================================================
+
+# Tools are async so the runner can execute several calls from one model
+# step concurrently; blocking backends run on this bounded pool instead of
+# stalling the event loop.
+TOOL_WORKERS = int(os.getenv("LEXI_TOOL_WORKERS", "8"))
+TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="lexi-tool")
+
+
+async def _run_blocking(fn: Callable, *args) -> Any:
+    """Run a blocking tool backend on the tool pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(TOOL_EXECUTOR, fn, *args)
+
+
+def _timed(tool: str):
+    """Record a tool call's wall time in lexi_tool_seconds."""
+    return timed("lexi_tool_seconds", "Wall time of each tool call", tool=tool)
+
+
+INPUT_TOKENS_CACHED = REGISTRY.counter(
+    "lexi_model_input_tokens_total", "Input tokens sent to the model", cache="hit"
+)
+INPUT_TOKENS_UNCACHED = REGISTRY.counter(
+    "lexi_model_input_tokens_total", "Input tokens sent to the model", cache="miss"
+)
+
+
+class _ModelCallHooks(RunHooks):
+    """
+    Run hooks recording each model round trip as the model_call stage,
+    and its input tokens split by whether the provider's prefix cache
+    served them.
+    """
+    
+    def __init__(self):
+        self._started = 0.0
+    
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._started = time.perf_counter()
+    
+    async def on_llm_end(self, context, agent, response):
+        observe_stage("model_call", time.perf_counter() - self._started)
+        
+        usage = response.usage
+        if usage is None or not usage.input_tokens:
+            return
+        details = usage.input_tokens_details
+        cached = (details.cached_tokens or 0) if details is not None else 0
+        INPUT_TOKENS_CACHED.inc(cached)
+        INPUT_TOKENS_UNCACHED.inc(usage.input_tokens - cached)
+        logger.debug(
+            "🪙 Model call input: %d tokens (%d from prefix cache)", usage.input_tokens, cached
+        )
+
+
 # ============================================================
 # 🧰 TOOL WRAPPERS
 # ============================================================
 
 @function_tool
-def get_current_time() -> str:
+async def get_current_time() -> str:
     """
     Returns current date and time. MUST use for ANY time/date question.
     
@@ -35,18 +110,19 @@ def get_current_time() -> str:
         str: Current time like "It's currently 3:42 PM on October 20, 2025."
     """
     try:
-        print("🕐 Tool called: get_current_time")
-        result = core_get_current_time()
-        print(f"✅ Result: {result}")
+        logger.info("🕐 Tool called: get_current_time")
+        with _timed("get_current_time"):
+            result = core_get_current_time()
+        logger.debug("✅ Result: %s", result)
         return result
     except Exception as e:
         error_msg = f"Error getting time: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return error_msg
 
 
 @function_tool
-def calculate(expression: str) -> str:
+async def calculate(expression: str) -> str:
     """
     Calculates math expressions. MUST use for ANY calculation.
     
@@ -69,18 +145,19 @@ def calculate(expression: str) -> str:
         str: Result like "25*4 equals 100"
     """
     try:
-        print(f"🧮 Tool called: calculate('{expression}')")
-        result = core_calculate_expression(expression)
-        print(f"✅ Result: {result}")
+        logger.info("🧮 Tool called: calculate('%s')", expression)
+        with _timed("calculate"):
+            result = await _run_blocking(core_calculate_expression, expression)
+        logger.debug("✅ Result: %s", result)
         return result
     except Exception as e:
         error_msg = f"Error calculating: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return error_msg
 
 
 @function_tool
-def search_wiki(query: str) -> str:
+async def search_wiki(query: str) -> str:
     """
     Searches Wikipedia for information. Use for factual lookups.
     
@@ -97,18 +174,30 @@ def search_wiki(query: str) -> str:
         str: Wikipedia summary
     """
     try:
-        print(f"🔍 Tool called: search_wiki('{query}')")
-        result = core_search_wikipedia(query)
-        print(f"✅ Result: {result[:100]}...")
+        logger.info("🔍 Tool called: search_wiki('%s')", query)
+        with _timed("search_wiki"):
+            result = await core_asearch_wikipedia(query)
+        logger.debug("✅ Result: %.100s...", result)
         return result
     except Exception as e:
         error_msg = f"Error searching Wikipedia: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return error_msg
 
 
 # List of all available tools
 TOOLS = [get_current_time, calculate, search_wiki]
+TOOL_NAMES = [tool.name for tool in TOOLS]
+
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "lexi_time_to_first_token_seconds", "Time from receiving a message to its first streamed text"
+)
+
+# Reply for a message shed because Lexi or the model provider is overloaded
+BUSY_REPLY = (
+    "I'm helping a lot of people right now and couldn't get to your message in time. "
+    "Please send it again in a moment! 🙏"
+)
 
 # ============================================================
 # 🧠 AGENT INSTRUCTIONS (WITH EXPLICIT MEMORY INSTRUCTIONS)
@@ -117,7 +206,7 @@ TOOLS = [get_current_time, calculate, search_wiki]
 AGENT_INSTRUCTIONS = """You are Lexi, a STATEFUL AI assistant created by Uzair Waseem.
 
 🧠 CRITICAL MEMORY INSTRUCTION:
-You will receive conversation history at the start of each message. This history contains ALL previous exchanges in this conversation. You MUST read and use this context.
+You will receive the conversation history as the earlier messages of this conversation. Recent exchanges are shown in full; older ones may appear as a short summary. Known facts about the user (name, preferences) and relevant older exchanges may be listed before the current message. You MUST read and use this context.
 
 When responding:
 1. READ the conversation history carefully
@@ -172,16 +261,59 @@ class LexiAgent:
     TRUE STATEFUL agent that explicitly manages conversation history.
     """
     
-    def __init__(self, model, model_provider):
-        """Initialize Lexi agent with model configuration."""
+    def __init__(
+        self,
+        model,
+        model_provider,
+        history_path: str = "data/history.json",
+        context_token_budget: Optional[int] = 4000,
+        summary_token_budget: int = 400,
+        recall_top_k: int = 3,
+        history_store: Optional[HistoryStore] = None,
+        history_load_limit: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        session_id: Optional[str] = None,
+        scheduler: Optional[RunScheduler] = None,
+        run_weight: float = 1.0,
+    ):
+        """
+        Initialize Lexi agent with model configuration.
+        
+        Args:
+            model: Model used for every run
+            model_provider: Provider passed through to the run config
+            history_path: Default file for save_history/load_history
+            context_token_budget: Tokens of recent history sent verbatim
+                (None sends the whole history)
+            summary_token_budget: Tokens for the summary of older turns
+            recall_top_k: Older turns matching the current message that
+                are put back verbatim (0 disables recall)
+            history_store: Persistence backend (defaults to a journal at
+                history_path)
+            history_load_limit: Only load the most recent turns on startup
+            response_cache: Optional cache of replies for repeated inputs
+                (may be shared between agents)
+            session_id: Key this agent's runs and model calls are queued
+                under (see core.concurrency); defaults to a per-agent id
+            scheduler: Optional run scheduler (may be shared between
+                agents) admitting aprocess_message/astream_message runs
+            run_weight: This session's share of the scheduler when busy
+        """
         self.model = model
         self.model_provider = model_provider
+        self.history_path = history_path
+        self.session_id = session_id or f"agent-{id(self):x}"
+        self.scheduler = scheduler
+        self.run_weight = run_weight
+        self.active_runs = 0  # queued or running async runs (see busy)
         
         # Create the agent
         self.agent = Agent(
             name="Lexi",
             tools=TOOLS,
-            instructions=AGENT_INSTRUCTIONS
+            instructions=AGENT_INSTRUCTIONS,
+            # Streamed responses report usage (incl. cached tokens) too
+            model_settings=ModelSettings(include_usage=True),
         )
         
         # Create the runner
@@ -190,98 +322,361 @@ class LexiAgent:
         # CRITICAL: Store full conversation history
         self.conversation_history = []
         
+        # Token-budgeted view of the history sent with each message
+        self.context_window = ContextWindow(
+            token_budget=context_token_budget,
+            summary_token_budget=summary_token_budget,
+            recall_top_k=recall_top_k,
+        )
+        
+        # Facts about the user, extracted per turn and sent with every prompt
+        self.facts = FactStore()
+        
+        # Pluggable persistence: only unsaved turns are written per save
+        self.history_store = history_store or JournalHistoryStore(history_path)
+        self.history_load_limit = history_load_limit
+        self._persisted_turns = 0
+        self._persisted_facts = 0  # FactStore.version last saved
+        self._store_reset_pending = False
+        # Saves may run on a write-behind thread (see core.persistence)
+        self._persist_lock = threading.Lock()
+        
+        # Exact repeats of a model input can skip the model call
+        self.response_cache = response_cache
+        
         # Session metadata
         self.session_start = datetime.now().isoformat()
         self.message_count = 0
         
-        print("✅ Lexi agent initialized (TRUE STATEFUL)")
-        print(f"✅ Tools loaded: {[tool.name for tool in TOOLS]}")
+        logger.info("✅ Lexi agent initialized (TRUE STATEFUL)")
+        logger.debug("✅ Tools loaded: %s", TOOL_NAMES)
     
-    def _build_context_prompt(self) -> str:
+    def _build_context_prompt(self, query: Optional[str] = None) -> str:
         """
-        Build a context prompt with full conversation history.
+        Build a context prompt from the conversation history.
+        
+        Recent turns are included verbatim up to the token budget; older
+        turns appear as a rolling summary, plus those most relevant to
+        query (see core.context_window). Known facts about the user
+        (see core.facts) come first.
+        
+        Args:
+            query: Current user message
         
         Returns:
             str: Formatted conversation history
         """
-        if not self.conversation_history:
-            return ""
-        
-        context = "\n\n📜 CONVERSATION HISTORY (Read this before responding):\n"
-        context += "="*60 + "\n"
+        return self._facts_header() + self.context_window.build(self.conversation_history, query)
+    
+    def _facts_header(self) -> str:
+        """Known-facts header; its tokens come out of the verbatim history budget."""
+        header = self.facts.render()
+        self.context_window.reserved_tokens = estimate_tokens(header) if header else 0
+        return header
+    
+    def _run_config(self) -> RunConfig:
+        """Build the run configuration shared by the sync and async paths."""
+        return RunConfig(
+            model=self.model,
+            model_provider=self.model_provider,
+            tracing_disabled=True,
+        )
+    
+    def _run_hooks(self) -> Optional[RunHooks]:
+        """Per-run hooks timing model calls and counting tokens (None when metrics are off)."""
+        return _ModelCallHooks() if REGISTRY.enabled else None
+    
+    def _build_input(self, user_message: str) -> List[dict]:
+        """
+        Build the model input as a message list.
         
-        for i, turn in enumerate(self.conversation_history, 1):
-            context += f"\n[Message {i}]\n"
-            context += f"User: {turn['user']}\n"
-            context += f"You: {turn['assistant']}\n"
+        The static instructions go out as the system prompt, then the
+        history as discrete messages, then the new turn. Everything that
+        changes per message (known facts, recalled older turns) rides in
+        the last message, so the prefix stays byte-identical from turn to
+        turn and a provider-side prefix cache can serve it.
         
-        context += "="*60 + "\n"
-        context += "END OF HISTORY - Now respond to the new message below.\n\n"
+        Args:
+            user_message: The user's input message
         
-        return context
+        Returns:
+            list: Input items for the runner
+        """
+        facts = self._facts_header()
+        messages, recalled = self.context_window.build_messages(self.conversation_history, user_message)
+        preamble = facts + recalled
+        if preamble:
+            user_message = f"{preamble}\nCurrent User Message: {user_message}"
+        messages.append({"role": "user", "content": user_message})
+        return messages
     
-    def process_message(self, user_message: str) -> str:
+    def _prepare_input(self, user_message: str) -> List[dict]:
         """
-        Process message with EXPLICIT conversation history injection.
+        Count the message and build the full agent input with history.
         
         Args:
             user_message: The user's input message
         
         Returns:
-            str: Lexi's response
+            list: History messages followed by the new message
         """
         self.message_count += 1
         
-        print(f"\n{'='*60}")
-        print(f"📨 Message #{self.message_count}: {user_message}")
-        print(f"💭 Context: {len(self.conversation_history)} previous exchanges")
-        print(f"{'='*60}")
+        # Model calls made for this message queue under this session
+        CURRENT_SESSION.set(self.session_id)
+        
+        logger.info(
+            "📨 Message #%d (%d previous exchanges in context)",
+            self.message_count, len(self.conversation_history),
+        )
+        logger.debug("📨 Message #%d: %s", self.message_count, user_message)
+        
+        # CRITICAL: Send the conversation history with the message
+        with stage("context_build"):
+            full_input = self._build_input(user_message)
+        
+        return full_input
+    
+    def _cached_reply(self, full_input: List[dict], use_cache: bool) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look up a reply for this exact model input.
+        
+        Returns:
+            tuple: (cache key, cached reply); the key is None when the
+                cache is off or bypassed, the reply None on a miss
+        """
+        if self.response_cache is None:
+            return None, None
+        if not use_cache:
+            self.response_cache.note_bypass()
+            return None, None
+        
+        key = ResponseCache.key(AGENT_INSTRUCTIONS, full_input)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.info("⚡ Response cache hit, skipping model call")
+        return key, cached
+    
+    def _cache_reply(self, key: Optional[str], response: str, result):
+        """Store a fresh reply unless a time-sensitive tool produced it."""
+        if key is None:
+            return
+        tools_used = [
+            getattr(item.raw_item, "name", "")
+            for item in result.new_items
+            if item.type == "tool_call_item"
+        ]
+        self.response_cache.store(key, response, tools_used)
+    
+    def _record_turn(self, user_message: str, response: str):
+        """Store a completed exchange in conversation history."""
+        self.conversation_history.append(Turn(time.time(), self.message_count, user_message, response))
+        self.facts.observe(user_message)
+        
+        logger.debug("🤖 Lexi: %s", response)
+        logger.info("💾 Saved to history (Total: %d exchanges)", len(self.conversation_history))
+    
+    @property
+    def busy(self) -> bool:
+        """True while a run of this agent is queued or in progress."""
+        return self.active_runs > 0
+    
+    @contextlib.asynccontextmanager
+    async def _run_slot(self):
+        """
+        Scheduler slot for one run of this session (just counted without a
+        scheduler). The run counts as active while it waits for the slot
+        too, so the session registry never evicts it mid-flight.
+        """
+        self.active_runs += 1
+        try:
+            if self.scheduler is None:
+                yield
+            else:
+                async with self.scheduler.slot(self.session_id, self.run_weight):
+                    yield
+        finally:
+            self.active_runs -= 1
+    
+    def _busy_response(self, error: Exception) -> str:
+        """Friendly reply for a message shed under load (nothing is recorded)."""
+        logger.warning("⏳ Too busy, shedding message for %s: %s", self.session_id, error)
+        return BUSY_REPLY
+    
+    def _error_response(self, error: Exception) -> str:
+        """Format a processing error as a user-facing reply."""
+        error_msg = f"Error processing message: {str(error)}"
+        logger.error("❌ %s", error_msg)
+        return f"Sorry, {error_msg}"
+    
+    def process_message(self, user_message: str, use_cache: bool = True) -> str:
+        """
+        Process message with EXPLICIT conversation history injection.
+        
+        Blocks until the run completes; async callers (e.g. the Chainlit
+        handlers) should use aprocess_message instead. With a response
+        cache configured, an input identical to a cached one is answered
+        without calling the model.
         
+        Args:
+            user_message: The user's input message
+            use_cache: Set False to bypass the response cache
+        
+        Returns:
+            str: Lexi's response
+        """
         try:
-            # CRITICAL: Prepend conversation history to the message
-            context_prompt = self._build_context_prompt()
-            full_input = f"{context_prompt}Current User Message: {user_message}"
-            
-            # Show what we're sending (for debugging)
-            print(f"\n📝 Sending to agent with {len(self.conversation_history)} previous messages in context")
+            full_input = self._prepare_input(user_message)
+            cache_key, cached = self._cached_reply(full_input, use_cache)
+            if cached is not None:
+                self._record_turn(user_message, cached)
+                return cached
             
             # Run the agent with full context
             result = self.runner.run_sync(
                 self.agent,
                 input=full_input,
-                run_config=RunConfig(
-                    model=self.model,
-                    model_provider=self.model_provider,
-                    tracing_disabled=True,
-                ),
+                run_config=self._run_config(),
+                hooks=self._run_hooks(),
             )
             
-            # Get response
             response = result.final_output
-            
-            # Store in conversation history
-            self.conversation_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "message_number": self.message_count,
-                "user": user_message,
-                "assistant": response
-            })
-            
-            print(f"\n🤖 Lexi: {response}")
-            print(f"💾 Saved to history (Total: {len(self.conversation_history)} exchanges)")
-            print(f"{'='*60}\n")
-            
+            self._cache_reply(cache_key, response, result)
+            self._record_turn(user_message, response)
             return response
             
         except Exception as e:
-            error_msg = f"Error processing message: {str(e)}"
-            print(f"\n❌ {error_msg}")
-            print(f"{'='*60}\n")
-            return f"Sorry, {error_msg}"
+            return self._error_response(e)
+    
+    async def aprocess_message(self, user_message: str, use_cache: bool = True) -> str:
+        """
+        Async version of process_message built on Runner.run.
+        
+        Awaits the model round trip and tool calls instead of blocking the
+        event loop, so other sessions keep being served meanwhile. With a
+        scheduler, the run first waits for its slot; if it is shed under
+        load (or the model circuit is open) the reply is BUSY_REPLY and
+        nothing is recorded.
+        
+        Args:
+            user_message: The user's input message
+            use_cache: Set False to bypass the response cache
+        
+        Returns:
+            str: Lexi's response
+        """
+        try:
+            async with self._run_slot():
+                full_input = self._prepare_input(user_message)
+                cache_key, cached = self._cached_reply(full_input, use_cache)
+                if cached is not None:
+                    self._record_turn(user_message, cached)
+                    return cached
+                
+                # Run the agent with full context
+                result = await Runner.run(
+                    self.agent,
+                    input=full_input,
+                    run_config=self._run_config(),
+                    hooks=self._run_hooks(),
+                )
+                
+                response = result.final_output
+                self._cache_reply(cache_key, response, result)
+                self._record_turn(user_message, response)
+                return response
+        
+        except (SchedulerBusyError, ModelOverloadedError, CircuitOpenError) as e:
+            return self._busy_response(e)
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def astream_message(
+        self, user_message: str, use_cache: bool = True
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming version of aprocess_message built on Runner.run_streamed.
+        
+        Yields events as (kind, payload) tuples:
+        - ("text", delta): a piece of the reply as the model writes it
+        - ("tool_call", {"name": ..., "arguments": ...}): a tool was invoked
+        - ("tool_output", output): a tool returned
+        - ("done", response) or ("error", message): always the last event
+        
+        The turn is added to history only once the run completes; a failed
+        or abandoned stream (consumer stops iterating) leaves it untouched.
+        Time to the first text delta is recorded in
+        lexi_time_to_first_token_seconds. A response cache hit is yielded
+        as a single text event. A run shed by the scheduler or the open
+        model circuit yields ("error", BUSY_REPLY).
+        
+        Args:
+            user_message: The user's input message
+            use_cache: Set False to bypass the response cache
+        """
+        start = time.perf_counter()
+        waiting_for_first_token = True
+        result = None
+        
+        try:
+            async with self._run_slot():
+                full_input = self._prepare_input(user_message)
+                cache_key, response = self._cached_reply(full_input, use_cache)
+                if response is not None:
+                    TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start)
+                    yield ("text", response)
+                    self._record_turn(user_message, response)
+                    yield ("done", response)
+                    return
+                
+                result = Runner.run_streamed(
+                    self.agent,
+                    input=full_input,
+                    run_config=self._run_config(),
+                    hooks=self._run_hooks(),
+                )
+                
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event":
+                        if isinstance(event.data, ResponseTextDeltaEvent) and event.data.delta:
+                            if waiting_for_first_token:
+                                TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start)
+                                waiting_for_first_token = False
+                            yield ("text", event.data.delta)
+                    
+                    elif event.type == "run_item_stream_event":
+                        if event.name == "tool_called":
+                            raw_call = event.item.raw_item
+                            yield ("tool_call", {
+                                "name": getattr(raw_call, "name", "tool"),
+                                "arguments": getattr(raw_call, "arguments", ""),
+                            })
+                        elif event.name == "tool_output":
+                            yield ("tool_output", event.item.output)
+                
+                response = result.final_output
+                self._cache_reply(cache_key, response, result)
+                # Recorded before the slot is released, so this session's
+                # next message sees it
+                self._record_turn(user_message, response)
+        
+        except (SchedulerBusyError, ModelOverloadedError, CircuitOpenError) as e:
+            yield ("error", self._busy_response(e))
+            return
+        except Exception as e:
+            yield ("error", self._error_response(e))
+            return
+        
+        finally:
+            # Stop the run if the consumer went away mid-stream
+            if result is not None and not result.is_complete:
+                result.cancel()
+        
+        yield ("done", response)
     
-    def get_history(self) -> list:
-        """Get conversation history."""
-        return self.conversation_history
+    def get_history(self) -> HistoryView:
+        """Get conversation history as a read-only sequence of turn dicts."""
+        return HistoryView(self.conversation_history)
     
     def get_session_info(self) -> dict:
         """Get current session information."""
@@ -289,50 +684,103 @@ class LexiAgent:
             "session_start": self.session_start,
             "message_count": self.message_count,
             "history_length": len(self.conversation_history),
+            "summarized_turns": self.context_window.window_start,
+            "known_facts": self.facts.to_dict(),
             "tools_available": [tool.name for tool in TOOLS]
         }
     
-    def save_history(self, filepath: str = "data/history.json"):
-        """Save conversation history to JSON file."""
+    def _store_for(self, filepath: Optional[str]) -> HistoryStore:
+        """History store for a path (the agent's own store by default)."""
+        if filepath is None or filepath == getattr(self.history_store, "path", None):
+            return self.history_store
+        return JournalHistoryStore(filepath)
+    
+    def save_history(self, filepath: Optional[str] = None) -> bool:
+        """
+        Persist conversation history (defaults to history_path).
+        
+        Only turns added since the last save are appended to the history
+        store. Saving to any other path writes a full snapshot there.
+        Safe to call from a background thread (see core.persistence).
+        
+        Returns:
+            bool: True if the history was written
+        """
+        store = self._store_for(filepath)
         try:
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            save_data = {
-                "session_start": self.session_start,
-                "message_count": self.message_count,
-                "conversation": self.conversation_history
-            }
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2, ensure_ascii=False)
+            with stage("persistence"), self._persist_lock:
+                history = self.conversation_history
+                end = len(history)
+                # Read the published snapshot: the loop may be changing the facts
+                facts_version, facts = self.facts.snapshot()
+                
+                if store is not self.history_store:
+                    store.replace(self.session_start, self.message_count, history[:end])
+                    store.save_facts(facts)
+                else:
+                    if self._store_reset_pending:
+                        store.reset(self.session_start)
+                        self._store_reset_pending = False
+                    
+                    store.append(history[self._persisted_turns:end])
+                    self._persisted_turns = end
+                    store.maybe_compact()
+                    
+                    if facts_version != self._persisted_facts:
+                        store.save_facts(facts)
+                        self._persisted_facts = facts_version
             
-            print(f"✅ History saved to {filepath} ({self.message_count} messages)")
+            logger.debug("✅ History saved to %s (%d messages)", store.location, self.message_count)
+            return True
         except Exception as e:
-            print(f"❌ Error saving history: {e}")
+            logger.error("❌ Error saving history: %s", e)
+            return False
     
-    def load_history(self, filepath: str = "data/history.json"):
-        """Load conversation history from JSON file."""
+    def load_history(self, filepath: Optional[str] = None):
+        """Load conversation history from the history store (or a JSON file path)."""
+        store = self._store_for(filepath)
         try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            meta, turns = store.load(limit=self.history_load_limit)
+            if meta is not None:
+                facts = store.load_facts()
+                with self._persist_lock:
+                    self.conversation_history = to_turns(turns)
+                    self.context_window.reset()
+                    self.message_count = turns[-1].get("message_number", len(turns)) if turns else 0
+                    
+                    if facts:
+                        self.facts.load(facts)
+                    else:
+                        # History saved before facts were kept: extract them now
+                        self.facts.clear()
+                        self.facts.observe_all(self.conversation_history)
+                    
+                    if store is self.history_store:
+                        self._persisted_turns = len(turns)
+                        self._persisted_facts = self.facts.version if facts else -1
+                    else:
+                        # Imported from elsewhere: our own store must be rewritten
+                        self._persisted_turns = 0
+                        self._persisted_facts = -1
+                        self._store_reset_pending = True
                 
-                self.conversation_history = data.get("conversation", [])
-                self.message_count = len(self.conversation_history)
-                
-                print(f"✅ History loaded: {self.message_count} previous messages")
-                print(f"💭 Context will be injected into next message")
+                logger.info("✅ History loaded: %d previous messages", self.message_count)
             else:
-                print(f"ℹ️  No history file found - starting fresh")
+                logger.info("ℹ️  No history file found - starting fresh")
         except Exception as e:
-            print(f"❌ Error loading history: {e}")
+            logger.error("❌ Error loading history: %s", e)
     
     def clear_history(self):
-        """Clear conversation history."""
-        self.conversation_history = []
-        self.message_count = 0
-        self.session_start = datetime.now().isoformat()
-        print("✅ History cleared - starting fresh")
+        """Clear conversation history (stored history is reset on next save)."""
+        with self._persist_lock:
+            self.conversation_history = []
+            self.context_window.reset()
+            self.facts.clear()
+            self.message_count = 0
+            self.session_start = datetime.now().isoformat()
+            self._persisted_turns = 0
+            self._store_reset_pending = True
+        logger.info("✅ History cleared - starting fresh")
     
     def summarize_conversation(self) -> str:
         """Get a summary of the conversation."""
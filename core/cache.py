@@ -0,0 +1,159 @@
+"""
+Cache Module for Lexi
+In-process LRU+TTL cache and single-flight call coalescing for tool backends.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from core.metrics import REGISTRY
+
+_MISSING = object()
+
+# ============================================================
+# 🗄️ LRU + TTL CACHE
+# ============================================================
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a TTL.
+
+    Each entry can carry its own TTL, so callers can keep good results for
+    long and negative results (not found, ambiguous) for a shorter time.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, name: str = "default"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before least recently used ones are evicted
+            ttl: Default time-to-live in seconds
+            name: Label used for this cache's metrics
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = REGISTRY.counter("lexi_cache_hits_total", "Cache lookups that hit", cache=name)
+        self._misses = REGISTRY.counter("lexi_cache_misses_total", "Cache lookups that missed", cache=name)
+        self._evictions = REGISTRY.counter(
+            "lexi_cache_evictions_total", "Entries dropped for space or expiry", cache=name
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self._hits.inc()
+                    return value
+                del self._data[key]
+                self._evictions.inc()
+        self._misses.inc()
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions.inc()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        hits, misses = int(self._hits.value), int(self._misses.value)
+        return {
+            "size": len(self._data),
+            "hits": hits,
+            "misses": misses,
+            "evictions": int(self._evictions.value),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+
+# ============================================================
+# ✈️ SINGLE-FLIGHT
+# ============================================================
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines: concurrent awaits of one key share a task."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shield so one caller's cancellation doesn't cancel the shared lookup
+        return await asyncio.shield(task)
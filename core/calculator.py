@@ -0,0 +1,634 @@
+"""
+Calculator Module for Lexi
+Fast numeric evaluator tried before SymPy for plain arithmetic, and a
+sandbox that runs SymPy in worker processes with time and memory limits.
+
+Handles + - * / ** (and ^), unary signs, parentheses, the constants pi
+and E and a handful of functions. Integers and fractions are computed
+exactly (like SymPy's Integer/Rational); float literals, constants and
+functions use IEEE doubles. Whenever the answer could differ from
+SymPy's -- anything unsupported, a domain error, overflow, or a result
+whose error bound could change the formatted answer -- fast_evaluate()
+returns None and the caller falls back to SymPy.
+"""
+
+import atexit
+import math
+import multiprocessing
+import queue
+import re
+import threading
+import time
+from fractions import Fraction
+from typing import Optional
+
+from core.metrics import REGISTRY
+from core.telemetry import get_logger
+
+logger = get_logger("calculator")
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the time limit still applies
+    resource = None
+
+# Exact powers are refused past this exponent / result size (SymPy's turn)
+MAX_EXPONENT = 1024
+MAX_EXACT_BITS = 4096
+
+# Doubles outside this range may have under/overflowed where SymPy's
+# arbitrary-exponent Floats would not
+FLOAT_MIN = 1e-300
+FLOAT_MAX = 1e300
+
+
+class _Unsupported(Exception):
+    """Raised internally when the expression needs SymPy."""
+
+
+# ============================================================
+# 🔢 NUMERIC HELPERS
+# ============================================================
+#
+# Exact values are ints or Fractions. Inexact values are (value, err)
+# tuples where err bounds the distance to what SymPy computes. err == 0.0
+# means the double is bit-identical to SymPy's: Float literals combined
+# with + - * / round exactly like IEEE doubles do. Anything involving pi,
+# E, functions or powers is evaluated symbolically by SymPy and only
+# converted at the end, so those carry a bound.
+
+
+def _checked(value, err: float) -> tuple:
+    if isinstance(value, complex) or not math.isfinite(value) or not math.isfinite(err):
+        raise _Unsupported()
+    if value != 0 and not FLOAT_MIN < abs(value) < FLOAT_MAX:
+        raise _Unsupported()
+    return value, err
+
+
+def _as_float(value) -> tuple:
+    """(double, err) for an exact or inexact operand."""
+    if type(value) is tuple:
+        return value
+    approx = float(value)
+    return approx, (0.0 if approx == value else math.ulp(approx))
+
+
+def _float_literal(text: str) -> tuple:
+    value = float(text)
+    if len(text) <= 15 and value != 0 and "e" not in text and "E" not in text:
+        return _checked(value, 0.0)
+
+    mantissa, _, exponent = text.lower().partition("e")
+    digits = mantissa.replace(".", "").lstrip("0")
+    # "1e-400" reads as 0.0 in Python but not in SymPy
+    if value == 0 and digits.strip("0"):
+        raise _Unsupported()
+    value, _ = _checked(value, 0.0)
+    # SymPy keeps a literal above 15 digits (counting "1e20" as 21) at
+    # higher precision, so it is only within an ulp of the double
+    precise = len(digits) > 15 or ("." not in mantissa and exponent and abs(value) >= 1e15)
+    return value, (math.ulp(value) if precise else 0.0)
+
+
+def _exact_arith(op: str, a, b):
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if type(a) is int and type(b) is int and b and a % b == 0:
+        return a // b
+    return Fraction(a, b)
+
+
+def _arith(op: str, left, right):
+    """+ - * / on two operands, exact when both are exact."""
+    left_exact, right_exact = type(left) is not tuple, type(right) is not tuple
+    if left_exact and right_exact:
+        return _exact_arith(op, left, right)
+
+    # SymPy converts a Rational next to a Float exactly like float() does
+    identical = (left_exact or left[1] == 0.0) and (right_exact or right[1] == 0.0)
+    (a, ea), (b, eb) = _as_float(left), _as_float(right)
+    if identical:
+        ea = eb = 0.0
+
+    if op == "+":
+        result, err = a + b, ea + eb
+    elif op == "-":
+        result, err = a - b, ea + eb
+    elif op == "*":
+        result, err = a * b, abs(a) * eb + abs(b) * ea + ea * eb
+        if result == 0 and a != 0 and b != 0:
+            raise _Unsupported()  # underflow
+    else:
+        if abs(b) <= eb:
+            raise _Unsupported()
+        if identical and left_exact:
+            # Rational / Float is computed as Rational * (1 / Float)
+            result = a * (1.0 / b)
+        else:
+            result = a / b
+        err = (abs(a) * eb + abs(b) * ea) / (abs(b) * (abs(b) - eb))
+        if result == 0 and a != 0:
+            raise _Unsupported()  # underflow
+
+    if identical:
+        # A Float operation that lands on zero gives SymPy's exact 0
+        return 0 if result == 0 else _checked(result, 0.0)
+    return _checked(result, err + math.ulp(result))
+
+
+def _power(base, exponent):
+    if type(base) is not tuple and type(exponent) is not tuple and (
+        type(exponent) is int or exponent.denominator == 1
+    ):
+        exponent = int(exponent)
+        num, den = (base, 1) if type(base) is int else (base.numerator, base.denominator)
+        if abs(exponent) > MAX_EXPONENT:
+            raise _Unsupported()
+        if max(abs(num).bit_length(), den.bit_length()) * abs(exponent) > MAX_EXACT_BITS:
+            raise _Unsupported()
+        if exponent >= 0:
+            return base ** exponent
+        return _exact_arith("/", den ** -exponent, num ** -exponent)
+
+    (a, ea), (b, eb) = _as_float(base), _as_float(exponent)
+    if a == 0 or (a < 0 and (eb or not b.is_integer())):
+        raise _Unsupported()
+
+    result = a ** b
+    # d(a^b) = b*a^(b-1) da + a^b*ln|a| db; pow() itself may be off by an ulp
+    err = abs(result) * (abs(b) * ea / abs(a) + abs(math.log(abs(a))) * eb)
+    if err > 1e-3 * abs(result):
+        raise _Unsupported()
+    return _checked(result, 2 * err + 2 * math.ulp(result))
+
+
+def _negate(value):
+    if type(value) is tuple:
+        return -value[0], value[1]
+    return -value
+
+
+def _sqrt(value):
+    if type(value) is not tuple:
+        if value < 0:
+            raise _Unsupported()
+        exact = Fraction(value)
+        num_root = math.isqrt(exact.numerator)
+        den_root = math.isqrt(exact.denominator)
+        if num_root * num_root == exact.numerator and den_root * den_root == exact.denominator:
+            return _exact_arith("/", num_root, den_root)
+
+    x, ex = _as_float(value)
+    if x - ex <= 0:
+        raise _Unsupported()
+    result = math.sqrt(x)
+    return _checked(result, ex / (2 * math.sqrt(x - ex)) + math.ulp(result))
+
+
+def _log(value, base=None):
+    x, ex = _as_float(value)
+    if x - ex <= 0:
+        raise _Unsupported()
+    result = math.log(x)
+    logged = _checked(result, ex / (x - ex) + 2 * math.ulp(result))
+    if base is None:
+        return logged
+    return _arith("/", logged, _log(base))
+
+
+def _sin(value):
+    x, ex = _as_float(value)
+    result = math.sin(x)
+    return _checked(result, ex + 2 * math.ulp(result))
+
+
+def _cos(value):
+    x, ex = _as_float(value)
+    result = math.cos(x)
+    return _checked(result, ex + 2 * math.ulp(result))
+
+
+def _tan(value):
+    x, ex = _as_float(value)
+    result = math.tan(x)
+    slope = 1 + result * result
+    if ex * slope > 1e-3:
+        raise _Unsupported()  # too close to a pole to bound
+    return _checked(result, 2 * ex * slope + 2 * math.ulp(result))
+
+
+def _exp(value):
+    x, ex = _as_float(value)
+    if ex > 1e-3:
+        raise _Unsupported()
+    result = math.exp(x)
+    return _checked(result, 2 * abs(result) * ex + 2 * math.ulp(result))
+
+
+def _abs(value):
+    if type(value) is tuple:
+        return abs(value[0]), value[1]
+    return abs(value)
+
+
+FUNCTIONS = {
+    "sqrt": _sqrt,
+    "sin": _sin,
+    "cos": _cos,
+    "tan": _tan,
+    "exp": _exp,
+    "log": _log,
+    "ln": _log,
+    "abs": _abs,
+    "Abs": _abs,
+}
+
+CONSTANTS = {
+    "pi": (math.pi, math.ulp(math.pi)),
+    "E": (math.e, math.ulp(math.e)),
+}
+
+
+# ============================================================
+# 🌳 PARSER
+# ============================================================
+#
+# A recursive-descent parser for the subset of Python's expression
+# grammar SymPy sees (so precedence matches: -2**2 == -4 and
+# 2**-1 == 1/2). It evaluates while parsing; any token or construct it
+# does not know raises _Unsupported. Hex/underscore/complex literals
+# tokenize as a number followed by a name, which is rejected too.
+
+_TOKEN = re.compile(
+    r"\s*("
+    r"[0-9]+\.?[0-9]*(?:[eE][-+]?[0-9]+)?|\.[0-9]+(?:[eE][-+]?[0-9]+)?"  # number
+    r"|[A-Za-z_]\w*"                                                   # name
+    r"|\*\*|\S)"                                                       # operator / other
+)
+
+_DIGITS = frozenset("0123456789.")
+
+
+def _tokenize(source: str) -> list:
+    tokens = _TOKEN.findall(source)
+    tokens.append("")  # end marker
+    return tokens
+
+
+def _number(text: str):
+    if text.isdigit():
+        if len(text) > 1 and text[0] == "0":
+            raise _Unsupported()  # "007" is a syntax error in Python
+        return int(text)
+    return _float_literal(text)
+
+
+class _Parser:
+    __slots__ = ("tokens", "pos")
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse(self):
+        value = self.expr()
+        if self.tokens[self.pos]:
+            raise _Unsupported()
+        return value
+
+    def expr(self):
+        value = self.term()
+        while True:
+            op = self.tokens[self.pos]
+            if op != "+" and op != "-":
+                return value
+            self.pos += 1
+            value = _arith(op, value, self.term())
+
+    def term(self):
+        value = self.factor()
+        while True:
+            op = self.tokens[self.pos]
+            if op != "*" and op != "/":
+                return value
+            self.pos += 1
+            value = _arith(op, value, self.factor())
+
+    def factor(self):
+        token = self.tokens[self.pos]
+        if token == "-":
+            self.pos += 1
+            return _negate(self.factor())
+        if token == "+":
+            self.pos += 1
+            return self.factor()
+
+        base = self.atom()
+        if self.tokens[self.pos] == "**":
+            self.pos += 1
+            return _power(base, self.factor())
+        return base
+
+    def atom(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        if not token:
+            raise _Unsupported()
+        if token[0] in _DIGITS:
+            return _number(token)
+        if token == "(":
+            value = self.expr()
+            self._expect(")")
+            return value
+        if self.tokens[self.pos] == "(":
+            function = FUNCTIONS.get(token)
+            if function is None:
+                raise _Unsupported()
+            self.pos += 1
+            args = [self.expr()]
+            while self.tokens[self.pos] == ",":
+                self.pos += 1
+                args.append(self.expr())
+            self._expect(")")
+            return function(*args)
+        if token not in CONSTANTS:
+            raise _Unsupported()
+        return CONSTANTS[token]
+
+    def _expect(self, token: str):
+        if self.tokens[self.pos] != token:
+            raise _Unsupported()
+        self.pos += 1
+
+
+def _is_ambiguous(value: float, err: float) -> bool:
+    """
+    True if SymPy's value, within err of ours, could format differently.
+
+    calculate_expression prints integers as ints and everything else
+    rounded to 6 decimals, so the interval must contain neither an
+    integer nor a 6-decimal rounding boundary.
+    """
+    slack = 2 * err + 4 * math.ulp(value)
+    low, high = value - slack, value + slack
+    if math.floor(high) >= math.ceil(low):
+        return True
+    low_scaled, high_scaled = low * 1e6 - 0.5, high * 1e6 - 0.5
+    slack_scaled = 4 * math.ulp(high_scaled)
+    return math.floor(high_scaled + slack_scaled) >= math.ceil(low_scaled - slack_scaled)
+
+
+# ============================================================
+# 🚀 PUBLIC API
+# ============================================================
+
+
+def fast_evaluate(expression: str) -> Optional[float]:
+    """
+    Evaluate a plain numeric expression without SymPy.
+
+    Args:
+        expression: Math expression as the user typed it
+
+    Returns:
+        float: The value SymPy would produce, or None if SymPy is needed
+    """
+    try:
+        result = _Parser(_tokenize(expression.replace("^", "**"))).parse()
+        if type(result) is not tuple:
+            return float(result)
+        value, err = result
+        if err and _is_ambiguous(value, err):
+            return None
+        return value
+    except (_Unsupported, ArithmeticError, ValueError, TypeError, RecursionError):
+        return None
+
+
+# ============================================================
+# 🧱 SYMPY SANDBOX
+# ============================================================
+
+
+def sympy_evaluate(expression: str) -> float:
+    """Evaluate an expression with SymPy's full parser and symbolic engine."""
+    from sympy import sympify
+
+    result = sympify(expression, evaluate=True)
+
+    if not isinstance(result, (int, float)) and not result.is_number:
+        logger.warning("[CALC] Invalid result type for '%s': %s", expression, type(result))
+        raise ValueError("Expression must evaluate to a number")
+
+    return float(result)
+
+
+def evaluate_outcome(expression: str) -> tuple:
+    """
+    Run sympy_evaluate and describe the result instead of raising.
+
+    Returns:
+        tuple: ("ok", value), ("invalid", message) for unparsable or
+        non-numeric input, ("limit", message) or ("error", message)
+    """
+    from sympy import SympifyError
+
+    try:
+        return ("ok", sympy_evaluate(expression))
+    except (SympifyError, ValueError, TypeError) as e:
+        return ("invalid", str(e))
+    except MemoryError:
+        return ("limit", "evaluation ran out of memory")
+    except Exception as e:
+        return ("error", str(e))
+
+
+def _worker_main(conn, memory_mb: int):
+    """Worker process loop: cap memory, import SymPy, then serve requests."""
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    evaluate_outcome("1")  # import and warm SymPy before reporting ready
+    conn.send("ready")
+
+    while True:
+        try:
+            expression = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        conn.send(evaluate_outcome(expression))
+
+
+class _Worker:
+    """One sandbox process and the parent's end of its pipe."""
+
+    def __init__(self, context, memory_mb: int, startup_timeout: float):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, memory_mb), name="lexi-calc-worker", daemon=True
+        )
+        self.process.start()
+        child.close()
+        if not self.conn.poll(startup_timeout) or self.conn.recv() != "ready":
+            self.kill()
+            raise RuntimeError("calculator worker failed to start")
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1.0)
+        self.conn.close()
+
+
+class SympySandbox:
+    """
+    SymPy evaluation in worker processes with wall-clock and memory caps.
+
+    Each worker caps its own address space (RLIMIT_AS) so runaway
+    allocations fail with MemoryError instead of exhausting the host. A
+    request that outlives the timeout gets its worker killed and replaced,
+    so an input like 9**9**9 cannot stall the agent. Workers are started
+    on first use and reused; with workers=0 evaluation runs in-process
+    without limits.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 5.0,
+        memory_mb: int = 512,
+        startup_timeout: float = 60.0,
+    ):
+        """
+        Initialize the sandbox (no process is started yet).
+
+        Args:
+            workers: Maximum number of worker processes (0 = in-process)
+            timeout: Seconds an evaluation may run before its worker is killed
+            memory_mb: Address-space limit per worker in MB (0 = unlimited)
+            startup_timeout: Seconds to wait for a new worker to import SymPy
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.startup_timeout = startup_timeout
+
+        methods = multiprocessing.get_all_start_methods()
+        # forkserver/spawn children don't inherit the parent's threads and locks
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+        self._timeouts = REGISTRY.counter(
+            "lexi_calc_timeouts_total", "SymPy evaluations killed for exceeding the time limit"
+        )
+        self._memory_errors = REGISTRY.counter(
+            "lexi_calc_memory_errors_total", "SymPy evaluations that hit the memory limit"
+        )
+        self._worker_starts = REGISTRY.counter(
+            "lexi_calc_worker_starts_total", "Calculator worker processes started"
+        )
+        self._latency = REGISTRY.histogram(
+            "lexi_calc_sympy_seconds", "Time spent in one SymPy evaluation"
+        )
+
+        atexit.register(self.close)
+
+    def evaluate(self, expression: str) -> tuple:
+        """
+        Evaluate with SymPy under the sandbox limits.
+
+        Args:
+            expression: Math expression
+
+        Returns:
+            tuple: An evaluate_outcome() tuple; ("limit", message) when the
+            time or memory limit was hit
+        """
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return evaluate_outcome(expression)
+            return self._evaluate_in_worker(expression)
+        finally:
+            self._latency.observe(time.perf_counter() - start)
+
+    def _evaluate_in_worker(self, expression: str) -> tuple:
+        worker = self._acquire()
+        try:
+            worker.conn.send(expression)
+            if not worker.conn.poll(self.timeout):
+                self._discard(worker)
+                self._timeouts.inc()
+                return ("limit", f"evaluation exceeded the {self.timeout:g}s time limit")
+            outcome = worker.conn.recv()
+        except (EOFError, OSError):
+            # The worker died mid-evaluation, e.g. killed by the memory cap
+            self._discard(worker)
+            self._memory_errors.inc()
+            return ("limit", "evaluation ran out of memory")
+
+        if outcome[0] == "limit":
+            self._memory_errors.inc()
+        self._idle.put(worker)
+        return outcome
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, start one if under the cap, else wait."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                spawn = self._started < self.workers
+                if spawn:
+                    self._started += 1
+            if spawn:
+                break
+
+            # Re-check now and then: a busy worker may be killed, not returned
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        try:
+            worker = _Worker(self._context, self.memory_mb, self.startup_timeout)
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+        self._worker_starts.inc()
+        return worker
+
+    def _discard(self, worker: _Worker):
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    def close(self):
+        """Stop all idle workers (registered with atexit)."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        """Worker, timeout and latency figures."""
+        return {
+            "workers": self._started,
+            "worker_starts": int(self._worker_starts.value),
+            "timeouts": int(self._timeouts.value),
+            "memory_errors": int(self._memory_errors.value),
+            "sympy_p50_s": self._latency.quantile(0.5),
+            "sympy_p99_s": self._latency.quantile(0.99),
+        }
@@ -0,0 +1,461 @@
+"""
+Concurrency Module for Lexi
+Fair, bounded admission for agent runs and outbound model calls across
+chat sessions.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from agents.models.interface import Model
+
+from core.metrics import REGISTRY
+
+# Session the current model call belongs to (set by LexiAgent per message)
+CURRENT_SESSION: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "lexi_session", default="default"
+)
+
+
+class ModelOverloadedError(Exception):
+    """Raised when the model-call queue is full or a caller waited too long."""
+
+
+class SchedulerBusyError(Exception):
+    """Raised when the run queue is full or a run waited too long to start."""
+
+
+# ============================================================
+# 🚦 FAIR LIMITER
+# ============================================================
+
+
+class FairLimiter:
+    """
+    Concurrency limit with a bounded, per-session round-robin queue.
+
+    At most max_concurrent holders run at once. Further callers wait in a
+    FIFO per session, and freed slots rotate across sessions, so one busy
+    session cannot starve the others. Once max_queue callers are waiting,
+    new ones are rejected immediately (backpressure) instead of piling up.
+
+    Meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 200,
+        queue_timeout: Optional[float] = 30.0,
+        name: str = "model",
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrent: Slots that may be held at the same time
+            max_queue: Waiting callers allowed before rejecting new ones
+            queue_timeout: Longest a caller waits for a slot (None waits forever)
+            name: Label used for this limiter's metrics
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+        self._in_flight = REGISTRY.gauge("lexi_limiter_in_flight", "Slots currently held", limiter=name)
+        self._depth = REGISTRY.gauge("lexi_limiter_queue_depth", "Callers waiting for a slot", limiter=name)
+        self._wait = REGISTRY.histogram("lexi_limiter_wait_seconds", "Time spent waiting for a slot", limiter=name)
+        self._rejected = REGISTRY.counter(
+            "lexi_limiter_rejected_total", "Callers turned away (queue full or wait timed out)", limiter=name
+        )
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self, key: str = "default"):
+        """
+        Wait for a slot on behalf of a session.
+
+        Raises:
+            ModelOverloadedError: If the queue is full or the wait timed out
+        """
+        if self._active < self.max_concurrent and not self._queued:
+            self._grant()
+            self._wait.observe(0.0)
+            return
+
+        if self._queued >= self.max_queue:
+            self._rejected.inc()
+            raise ModelOverloadedError(f"Model queue is full ({self._queued} waiting)")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(waiter)
+        self._set_queued(self._queued + 1)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._forget(key, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._rejected.inc()
+                raise ModelOverloadedError(
+                    f"Waited more than {self.queue_timeout:g}s for a model slot"
+                ) from None
+            raise
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+
+    def release(self):
+        """Free a slot, handing it to the next session in rotation."""
+        self._active -= 1
+        while self._waiters:
+            key, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            self._set_queued(self._queued - 1)
+            if not waiter.done():
+                self._grant()
+                waiter.set_result(None)
+                return
+        self._in_flight.set(self._active)
+
+    @asynccontextmanager
+    async def slot(self, key: str = "default") -> AsyncIterator[None]:
+        """async with limiter.slot(session): ... holds one slot."""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _grant(self):
+        self._active += 1
+        self._in_flight.set(self._active)
+
+    def _set_queued(self, value: int):
+        self._queued = value
+        self._depth.set(value)
+
+    def _forget(self, key: str, waiter: asyncio.Future):
+        """Drop a waiter that gave up before being served."""
+        waiters = self._waiters.get(key)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del self._waiters[key]
+        self._set_queued(self._queued - 1)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "waiting_sessions": len(self._waiters),
+            "rejected": int(self._rejected.value),
+            "wait_p95_s": self._wait.quantile(0.95),
+        }
+
+
+# ============================================================
+# 🧯 THROTTLED MODEL
+# ============================================================
+
+
+class ThrottledModel(Model):
+    """
+    Model wrapper that admits every call through a FairLimiter.
+
+    Calls are queued under the session in CURRENT_SESSION; a streamed
+    response holds its slot until the stream ends.
+    """
+
+    def __init__(self, wrapped: Model, limiter: FairLimiter):
+        self.wrapped = wrapped
+        self.limiter = limiter
+
+    async def get_response(self, *args, **kwargs):
+        async with self.limiter.slot(CURRENT_SESSION.get()):
+            return await self.wrapped.get_response(*args, **kwargs)
+
+    async def stream_response(self, *args, **kwargs):
+        async with self.limiter.slot(CURRENT_SESSION.get()):
+            async for event in self.wrapped.stream_response(*args, **kwargs):
+                yield event
+
+
+# ============================================================
+# 🗓️ RUN SCHEDULER
+# ============================================================
+
+
+class _Waiter:
+    """One run waiting for its slot."""
+
+    __slots__ = ("eligible", "started")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.eligible = loop.create_future()  # first in its session's line, nothing running
+        self.started = loop.create_future()   # holds a run slot
+
+
+class _SessionRuns:
+    """Scheduler state for one session."""
+
+    __slots__ = ("waiters", "running", "weight", "pass_", "ready")
+
+    def __init__(self, weight: float, pass_: float = 0.0):
+        self.waiters: Deque[_Waiter] = deque()
+        self.running = False
+        self.weight = weight
+        self.pass_ = pass_   # stride-scheduling virtual time
+        self.ready = False   # queued in the scheduler's ready heap
+
+
+class RunScheduler:
+    """
+    Admission control for whole agent runs (one user message each).
+
+    - At most max_concurrent runs execute at once.
+    - Runs of one session execute one at a time, in arrival order, so a
+      rapid double-send cannot race on that session's history.
+    - Free slots go to waiting sessions by stride scheduling: each run
+      advances its session's virtual time by 1/weight, and the session
+      furthest behind goes next, so a weight-2 session gets twice the
+      turns of a weight-1 session while both are contended. The global
+      virtual time advances by 1/(total weight in contention) per run.
+      A session going idle between messages (a chat user rarely has two
+      in flight) keeps its offset from the global virtual time and
+      resumes at that offset, so weights still apply to one-at-a-time
+      users while idle time itself earns no credit. Offsets of at most
+      max_idle_sessions idle sessions are kept, least recently idle
+      dropped first (and drop() forgets one, e.g. on eviction).
+    - Once max_queue runs are waiting, or a run has waited busy_after
+      seconds, it is shed with SchedulerBusyError. The wait is counted
+      from when the run is first in its session's line with nothing of
+      that session running: waiting behind the same user's previous
+      message (say a long tool call) is not overload.
+
+    Meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 500,
+        busy_after: Optional[float] = 20.0,
+        max_idle_sessions: int = 10_000,
+        name: str = "runs",
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Runs that may execute at the same time
+            max_queue: Waiting runs allowed before shedding new ones
+            busy_after: Longest a run waits to start once its session's
+                previous run has finished (None waits forever)
+            max_idle_sessions: Idle sessions whose virtual-time offset is kept
+            name: Label used for this scheduler's metrics
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.busy_after = busy_after
+        self.max_idle_sessions = max_idle_sessions
+        self._active = 0
+        self._queued = 0
+        self._virtual = 0.0
+        self._sessions: Dict[str, _SessionRuns] = {}
+        self._idle_offsets: "OrderedDict[str, float]" = OrderedDict()  # oldest first
+        self._ready: List[Tuple[float, int, str]] = []
+        self._order = itertools.count()
+
+        self._in_flight = REGISTRY.gauge("lexi_runs_in_flight", "Agent runs executing", scheduler=name)
+        self._depth = REGISTRY.gauge("lexi_run_queue_depth", "Agent runs waiting to start", scheduler=name)
+        self._wait = REGISTRY.histogram(
+            "lexi_run_queue_seconds", "Time agent runs waited to start", scheduler=name
+        )
+        self._shed_full = REGISTRY.counter(
+            "lexi_runs_shed_total", "Agent runs turned away", scheduler=name, reason="queue_full"
+        )
+        self._shed_wait = REGISTRY.counter(
+            "lexi_runs_shed_total", "Agent runs turned away", scheduler=name, reason="wait_timeout"
+        )
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self, key: str = "default", weight: float = 1.0):
+        """
+        Wait until this session's run may start.
+
+        Args:
+            key: Session the run belongs to
+            weight: Share of the capacity this session gets when contended
+
+        Raises:
+            SchedulerBusyError: If the queue is full or the wait timed out
+        """
+        if self._queued >= self.max_queue:
+            self._shed_full.inc()
+            raise SchedulerBusyError(f"Run queue is full ({self._queued} waiting)")
+
+        session = self._sessions.get(key)
+        if session is None:
+            offset = self._idle_offsets.pop(key, 0.0)
+            session = self._sessions[key] = _SessionRuns(weight, self._virtual + offset)
+        session.weight = weight
+
+        waiter = _Waiter(asyncio.get_running_loop())
+        session.waiters.append(waiter)
+        self._set_queued(self._queued + 1)
+        self._make_ready(key, session)
+        self._dispatch()
+
+        start = time.perf_counter()
+        try:
+            # Behind this session's own earlier run: not shed, it is being served
+            await asyncio.shield(waiter.eligible)
+            await asyncio.wait_for(asyncio.shield(waiter.started), self.busy_after)
+        except BaseException as e:
+            if waiter.started.done():
+                # Started just as we gave up: finish the run slot properly
+                self.release(key)
+            else:
+                waiter.started.cancel()
+                self._forget(key, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed_wait.inc()
+                raise SchedulerBusyError(
+                    f"Waited more than {self.busy_after:g}s for a run slot"
+                ) from None
+            raise
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+
+    def release(self, key: str = "default"):
+        """Finish a run, starting the next one in line."""
+        self._active -= 1
+        session = self._sessions.get(key)
+        if session is not None:
+            session.running = False
+            if session.waiters:
+                self._make_ready(key, session)
+            else:
+                self._retire(key, session)
+        self._dispatch()
+
+    def drop(self, key: str):
+        """Forget an idle session's virtual-time offset (e.g. when its session is evicted)."""
+        self._idle_offsets.pop(key, None)
+
+    @asynccontextmanager
+    async def slot(self, key: str = "default", weight: float = 1.0) -> AsyncIterator[None]:
+        """async with scheduler.slot(session): ... runs one agent turn."""
+        await self.acquire(key, weight)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    def _make_ready(self, key: str, session: _SessionRuns):
+        """Queue a session for a slot if it has work and nothing running."""
+        if session.running or not session.waiters:
+            return
+        head = session.waiters[0]
+        if not head.eligible.done():
+            head.eligible.set_result(None)  # its busy_after wait starts now
+        if session.ready:
+            return
+        session.ready = True
+        heapq.heappush(self._ready, (session.pass_, next(self._order), key))
+
+    def _dispatch(self):
+        """Start waiting runs while slots are free, lowest virtual time first."""
+        while self._active < self.max_concurrent and self._ready:
+            pass_, _, key = heapq.heappop(self._ready)
+            session = self._sessions.get(key)
+            if session is None or not session.ready:
+                continue
+            session.ready = False
+            if session.running or not session.waiters:
+                continue
+
+            waiter = session.waiters.popleft()
+            self._set_queued(self._queued - 1)
+            if waiter.started.done():
+                self._make_ready(key, session)
+                continue
+            session.pass_ = pass_ + 1.0 / max(session.weight, 1e-6)
+            total_weight = sum(other.weight for other in self._sessions.values())
+            self._virtual += 1.0 / max(total_weight, 1e-6)
+            session.running = True
+            self._active += 1
+            if not waiter.eligible.done():
+                waiter.eligible.set_result(None)
+            waiter.started.set_result(None)
+        self._in_flight.set(self._active)
+
+    def _set_queued(self, value: int):
+        self._queued = value
+        self._depth.set(value)
+
+    def _forget(self, key: str, waiter: _Waiter):
+        """Drop a run that gave up before starting."""
+        session = self._sessions.get(key)
+        if session is None or waiter not in session.waiters:
+            return
+        session.waiters.remove(waiter)
+        self._set_queued(self._queued - 1)
+        if session.waiters:
+            self._make_ready(key, session)  # the next run may now be first in line
+        elif not session.running:
+            self._retire(key, session)
+
+    def _retire(self, key: str, session: _SessionRuns):
+        """Drop an idle session, keeping its offset from the global virtual time."""
+        del self._sessions[key]
+        # Credit (a negative offset) is capped at one run, so a session
+        # starved long ago cannot jump the queue for many turns
+        offset = max(session.pass_ - self._virtual, -1.0 / max(session.weight, 1e-6))
+        idle = self._idle_offsets
+        idle.pop(key, None)
+        if offset:
+            idle[key] = offset
+            while len(idle) > self.max_idle_sessions:
+                idle.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "waiting_sessions": sum(1 for session in self._sessions.values() if session.waiters),
+            "shed": int(self._shed_full.value + self._shed_wait.value),
+            "wait_p95_s": self._wait.quantile(0.95),
+        }
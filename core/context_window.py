@@ -0,0 +1,304 @@
+"""
+Context Window Module for Lexi
+Builds the history prompt under a token budget: recent turns verbatim,
+older turns folded into a rolling summary.
+"""
+
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+from core.retrieval import TurnIndex
+
+# ============================================================
+# 📏 TOKEN ESTIMATION
+# ============================================================
+
+# Rough chars-per-token ratio for English text on Gemini/OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+CONTEXT_HEADER = "\n\n📜 CONVERSATION HISTORY (Read this before responding):\n" + "="*60 + "\n"
+CONTEXT_FOOTER = "="*60 + "\nEND OF HISTORY - Now respond to the new message below.\n\n"
+SUMMARY_HEADER = "\n[Summary of earlier messages]\n"
+RECALL_HEADER = "\n[Earlier messages relevant to the current one]\n"
+RECENT_HEADER = "\n[Most recent messages]\n"
+SUMMARY_FOOTER = "[End of summary - the message itself follows]\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting (no tokenizer needed)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def render_turn(number: int, turn: dict) -> str:
+    """Render one exchange the way it appears in the context prompt."""
+    return f"\n[Message {number}]\nUser: {turn['user']}\nYou: {turn['assistant']}\n"
+
+
+# ============================================================
+# 🗜️ ROLLING SUMMARY
+# ============================================================
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def summarize_turns(previous: str, turns: List[dict], token_budget: int) -> str:
+    """
+    Fold newly evicted turns into the rolling summary.
+
+    Extractive and local: each turn becomes one clipped line, and the
+    oldest lines are dropped once the summary exceeds its budget.
+
+    Args:
+        previous: Summary produced by the previous slide ("" if none)
+        turns: Turns that just left the verbatim window, oldest first
+        token_budget: Maximum size of the summary in tokens
+
+    Returns:
+        str: Updated summary
+    """
+    lines = previous.splitlines() if previous else []
+    for turn in turns:
+        lines.append(f"- User: {_clip(turn['user'], 120)} | You: {_clip(turn['assistant'], 120)}")
+
+    # Keep the newest lines that fit in the budget
+    kept = deque()
+    used = 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        kept.appendleft(line)
+        used += cost
+
+    return "\n".join(kept)
+
+
+# ============================================================
+# 🪟 CONTEXT WINDOW
+# ============================================================
+
+class ContextWindow:
+    """
+    Incrementally maintained, token-budgeted history prompt.
+
+    Each turn's size is estimated once. When the verbatim window exceeds the
+    budget it slides forward until it is back under slide_ratio of the
+    budget, so the (lazily produced, cached) summary is regenerated only
+    every few turns rather than on each one. Prompt size stays O(budget)
+    regardless of session length.
+
+    Turns that leave the verbatim window are added to a TurnIndex; when
+    build() is given the current message, the recall_top_k best-matching
+    of them are put back verbatim, so facts from long ago (the user's
+    name, say) survive the summary.
+
+    reserved_tokens is taken off the verbatim budget for other context
+    sent alongside the window (LexiAgent reserves the known-facts header).
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = 4000,
+        summary_token_budget: int = 400,
+        summarizer: Optional[Callable[[str, List[dict], int], str]] = None,
+        slide_ratio: float = 0.75,
+        recall_top_k: int = 3,
+        recall_token_budget: int = 800,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            token_budget: Budget for verbatim turns (None keeps every turn)
+            summary_token_budget: Budget for the rolling summary
+            summarizer: Callable(previous, turns, budget) -> summary
+            slide_ratio: Fraction of the budget to shrink to when sliding
+            recall_top_k: Older turns recalled per message (0 disables recall)
+            recall_token_budget: Budget for the recalled turns
+        """
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.summarizer = summarizer or summarize_turns
+        self.slide_ratio = slide_ratio
+        self.recall_top_k = recall_top_k
+        self.recall_token_budget = recall_token_budget
+        self.reserved_tokens = 0
+        self.index = TurnIndex()
+        self.reset()
+
+    def reset(self):
+        """Forget everything rendered; the next build starts from scratch."""
+        self._tokens = deque()
+        self._window_tokens = 0
+        self._start = 0          # index of the first verbatim turn
+        self._rendered = 0       # number of turns accounted for so far
+        self._summarized = 0     # turns folded into the summary
+        self._summary = ""
+        self._prompt = ""
+        self._prompt_key = None  # (turns, window start) _prompt was built for
+        self._split = 0          # where recalled turns go in _prompt
+        self._messages = []      # build_messages() output for turns from _messages_start
+        self._messages_start = 0
+        self.index.clear()
+        self.summary_regenerations = 0
+
+    @property
+    def verbatim_budget(self) -> Optional[int]:
+        """Token budget left for verbatim turns after reserved_tokens."""
+        if self.token_budget is None:
+            return None
+        # Never squeeze the recent turns below a quarter of the budget
+        return max(self.token_budget - self.reserved_tokens, self.token_budget // 4)
+
+    @property
+    def window_start(self) -> int:
+        """Index of the oldest turn still included verbatim."""
+        return self._start
+
+    def build(self, history: List[dict], query: Optional[str] = None) -> str:
+        """
+        Return the context prompt for the given history as one string.
+
+        LexiAgent sends build_messages() to the model; this rendering is
+        kept for inspection and comparison, and is only assembled here.
+
+        Args:
+            history: Full conversation history, oldest first
+            query: Current user message, used to recall relevant older turns
+
+        Returns:
+            str: Formatted history block ("" when there is no history)
+        """
+        if not history:
+            return ""
+
+        total = self._advance(history)
+        if self._prompt_key != (total, self._start):
+            parts = [CONTEXT_HEADER]
+            if self._summary:
+                parts.append(SUMMARY_HEADER)
+                parts.append(self._summary + "\n")
+            self._split = sum(len(part) for part in parts)
+            if self._start:
+                parts.append(RECENT_HEADER)
+            parts.extend(
+                render_turn(history[i].get("message_number", i + 1), history[i])
+                for i in range(self._start, total)
+            )
+            parts.append(CONTEXT_FOOTER)
+            self._prompt = "".join(parts)
+            self._prompt_key = (total, self._start)
+
+        recalled = self._recall(history, query)
+        if not recalled:
+            return self._prompt
+        return self._prompt[:self._split] + recalled + self._prompt[self._split:]
+
+    def build_messages(self, history: List[dict], query: Optional[str] = None) -> Tuple[List[dict], str]:
+        """
+        Return the history as model input messages.
+
+        Turns are discrete user/assistant messages, so consecutive calls
+        share a byte-identical prefix until the window slides (which
+        happens only every few turns); a provider prefix cache can reuse
+        it. The rolling summary is folded, clearly labelled, into the
+        first verbatim user message so roles keep alternating. Only the
+        recalled turns vary per message, so they are returned separately
+        for the caller to put in the new message. The turn messages are
+        cached like build()'s prompt; each call converts only the turns
+        added since the last one.
+
+        Args:
+            history: Full conversation history, oldest first
+            query: Current user message, used to recall relevant older turns
+
+        Returns:
+            tuple: (one user and one assistant message per verbatim turn,
+                recalled turns block or "")
+        """
+        if not history:
+            return [], ""
+
+        total = self._advance(history)
+        if self._messages_start != self._start:
+            # The window slid: drop the turns that left it
+            del self._messages[:2 * (self._start - self._messages_start)]
+            self._messages_start = self._start
+        for i in range(self._start + len(self._messages) // 2, total):
+            turn = history[i]
+            self._messages.append({"role": "user", "content": turn["user"]})
+            self._messages.append({"role": "assistant", "content": turn["assistant"]})
+
+        # The caller appends the new turn, so hand out a copy of the cache
+        messages = list(self._messages)
+        if self._summary:
+            messages[0] = {
+                "role": "user",
+                "content": f"{SUMMARY_HEADER.lstrip()}{self._summary}\n{SUMMARY_FOOTER}{messages[0]['content']}",
+            }
+
+        return messages, self._recall(history, query)
+
+    def _advance(self, history: List[dict]) -> int:
+        """Account for new turns, slide the window and update the summary."""
+        total = len(history)
+        if self._rendered > total:
+            # History was replaced or truncated behind our back
+            self.reset()
+
+        for i in range(self._rendered, total):
+            turn = history[i]
+            tokens = estimate_tokens(render_turn(turn.get("message_number", i + 1), turn))
+            self._tokens.append(tokens)
+            self._window_tokens += tokens
+        self._rendered = total
+
+        budget = self.verbatim_budget
+        if budget is not None and self._window_tokens > budget:
+            self._slide(int(budget * self.slide_ratio))
+
+        if self._start > self._summarized:
+            self._summary = self.summarizer(
+                self._summary, history[self._summarized:self._start], self.summary_token_budget
+            )
+            self._summarized = self._start
+            self.summary_regenerations += 1
+
+        return total
+
+    def _recall(self, history: List[dict], query: Optional[str]) -> str:
+        """Render the older turns that best match query ("" if none)."""
+        if not query or self.recall_top_k <= 0 or not self._start:
+            return ""
+
+        # Index turns that left the verbatim window since the last call
+        for i in range(len(self.index), self._start):
+            self.index.add(history[i])
+
+        hits = self.index.search(query, self.recall_top_k)
+        if not hits:
+            return ""
+
+        chosen = []
+        used = 0
+        for i, _ in hits:
+            chunk = render_turn(history[i].get("message_number", i + 1), history[i])
+            tokens = estimate_tokens(chunk)
+            if used + tokens > self.recall_token_budget:
+                continue
+            chosen.append((i, chunk))
+            used += tokens
+        if not chosen:
+            return ""
+
+        chosen.sort()
+        return RECALL_HEADER + "".join(chunk for _, chunk in chosen)
+
+    def _slide(self, target: int):
+        """Drop the oldest verbatim turns until the window fits target."""
+        # Always keep the most recent exchange verbatim
+        while self._window_tokens > target and len(self._tokens) > 1:
+            self._window_tokens -= self._tokens.popleft()
+            self._start += 1
@@ -0,0 +1,150 @@
+"""
+Disk Cache Module for Lexi
+SQLite-backed key/value cache shared by every worker process on a host.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from core.metrics import REGISTRY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+"""
+
+# ============================================================
+# 💽 DISK CACHE
+# ============================================================
+
+
+class DiskCache:
+    """
+    Bounded, LRU-evicting cache in a SQLite database (WAL mode).
+
+    WAL lets any number of processes read concurrently while one writes,
+    so a freshly started worker immediately sees what the others fetched.
+    Entries expire after their TTL; expired entries can still be served
+    on request (allow_stale) for up to max_stale seconds, e.g. when the
+    upstream service is failing. Values must be JSON-serializable.
+    """
+
+    # Size is checked every this many writes, not on each one
+    EVICT_CHECK_EVERY = 32
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 50_000,
+        max_stale: float = 7 * 24 * 3600,
+        name: str = "disk",
+    ):
+        """
+        Initialize the cache (the database is created if missing).
+
+        Args:
+            path: SQLite database file
+            max_entries: Entries kept before least recently used ones are evicted
+            max_stale: Seconds past expiry an entry may still be served stale
+            name: Label used for this cache's metrics
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._hits = REGISTRY.counter("lexi_cache_hits_total", "Cache lookups that hit", cache=name)
+        self._misses = REGISTRY.counter("lexi_cache_misses_total", "Cache lookups that missed", cache=name)
+        self._evictions = REGISTRY.counter(
+            "lexi_cache_evictions_total", "Entries dropped for space or expiry", cache=name
+        )
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Tuple[Any, float]]:
+        """
+        Look a key up.
+
+        Args:
+            key: Cache key
+            allow_stale: Also return entries expired less than max_stale ago
+
+        Returns:
+            tuple: (value, seconds until expiry; negative if stale) or None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (row[1] <= now and not (allow_stale and row[1] + self.max_stale > now)):
+                self._misses.inc()
+                return None
+
+            # Refresh recency at most once a minute to keep reads mostly read-only
+            if now - row[2] > 60:
+                with self._conn:
+                    self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+
+        self._hits.inc()
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a value for ttl seconds."""
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, now, now + ttl, now),
+                )
+            self._writes += 1
+            if self._writes % self.EVICT_CHECK_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop dead entries, then least recently used ones over the cap (lock held)."""
+        with self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE expires_at + ? <= ?", (self.max_stale, now)
+            ).rowcount
+
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > self.max_entries:
+                # Trim 10% below the cap so this does not run on every write
+                excess = count - int(self.max_entries * 0.9)
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                ).rowcount
+
+        if removed > 0:
+            self._evictions.inc(removed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,205 @@
+"""
+Facts Module for Lexi
+Long-term facts about the user, extracted from each message as it
+arrives and sent with every prompt as a compact header.
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Longest value kept for one fact, and items kept per list fact
+MAX_VALUE_CHARS = 60
+MAX_ITEMS = 10
+
+# A value runs until punctuation or a following clause
+_VALUE = r"([^.,!?;:\n]+?)(?=\s+(?:and|but|so|because)\b|[.,!?;:\n]|$)"
+_NAME = r"([A-Za-z][\w'-]*(?: [A-Z][\w'-]*)?)"
+_CAPITALIZED_NAME = r"([A-Z][\w'-]*(?: [A-Z][\w'-]*)?)"
+
+# (fact, pattern) for facts with a single current value; later mentions win.
+# Names need an explicit introduction: "my name is ada", "call me Ada"
+# ("call me maybe" is not one, so call me needs a capitalized name).
+SINGLE_FACTS: List[Tuple[str, "re.Pattern"]] = [
+    ("name", re.compile(r"(?i:\bmy name is)\s+" + _NAME)),
+    ("name", re.compile(r"(?i:\bcall me)\s+" + _CAPITALIZED_NAME + r"(?=\s*(?:[.,!?]|$))")),
+    ("location", re.compile(r"(?i)\bi (?:live|am based|'m based) in\s+" + _VALUE)),
+    ("from", re.compile(r"(?i)\bi(?:'m| am) (?:originally )?from\s+" + _VALUE)),
+    ("age", re.compile(r"(?i)\bi(?:'m| am)\s+(\d{1,3})\s+years?\s+old\b")),
+    ("job", re.compile(r"(?i)\bi work (?:as (?:an? )?|at |for )" + _VALUE)),
+]
+
+# "I'd like to know...", "I prefer not to say" state no preference
+_NOT_AN_OBJECT = r"(?!(?:to|not|it|that|this)\b)"
+
+# (fact, pattern) for facts that accumulate items
+LIST_FACTS: List[Tuple[str, "re.Pattern"]] = [
+    ("likes", re.compile(r"(?i)\bi (?:really )?(?:like|love|enjoy|prefer)\s+" + _NOT_AN_OBJECT + _VALUE)),
+    ("dislikes", re.compile(
+        r"(?i)\bi (?:really )?(?:hate|dislike|don't like|do not like)\s+" + _NOT_AN_OBJECT + _VALUE
+    )),
+    ("notes", re.compile(r"(?i)\bremember that\s+" + _VALUE)),
+]
+
+# Adding an item to one of these removes it from the other
+OPPOSITES = {"likes": "dislikes", "dislikes": "likes"}
+
+# "My name is not important" is not an introduction
+NOT_NAMES = frozenset("""
+not none nothing secret unknown irrelevant private
+""".split())
+
+# Trailing words that are not part of the value ("I like tea too")
+_FILLER = re.compile(r"(?i)\s+(?:now|too|also|originally|a lot|very much|so much)$")
+
+FACTS_HEADER = "\n🧠 KNOWN FACTS ABOUT THE USER (from earlier in this conversation):\n"
+
+
+def _clean(value: str) -> str:
+    value = _FILLER.sub("", " ".join(value.split()).strip(" '\""))
+    return value[:MAX_VALUE_CHARS]
+
+
+# ============================================================
+# 🧠 FACT STORE
+# ============================================================
+
+
+class FactStore:
+    """
+    Key facts about the user, keyed for O(1) lookup.
+
+    observe() runs a handful of regexes over each user message and
+    updates the store in place; nothing is re-read from the transcript.
+    version increases on every change, so callers can tell when the
+    store needs saving.
+
+    The store is changed from the event loop only. Each change also
+    publishes an immutable (version, facts) snapshot, which the
+    write-behind thread reads instead of the live dicts.
+    """
+
+    def __init__(self, facts: Optional[Mapping] = None):
+        """
+        Initialize the store.
+
+        Args:
+            facts: Previously saved facts (see to_dict)
+        """
+        self._single: Dict[str, str] = {}
+        self._lists: Dict[str, Dict[str, str]] = {}
+        self.version = 0
+        self._header = ""
+        self._header_version = 0
+        self._snapshot: Tuple[int, dict] = (0, {})
+        if facts:
+            self.load(facts)
+
+    def __len__(self) -> int:
+        return len(self._single) + sum(len(items) for items in self._lists.values())
+
+    def get(self, fact: str, default=None):
+        """Current value of a fact (a list for accumulating facts)."""
+        if fact in self._single:
+            return self._single[fact]
+        if fact in self._lists:
+            return list(self._lists[fact].values())
+        return default
+
+    def observe(self, message: str) -> bool:
+        """
+        Extract facts from one user message.
+
+        Returns:
+            bool: True if the store changed
+        """
+        changed = False
+        for fact, pattern in SINGLE_FACTS:
+            match = pattern.search(message)
+            if match:
+                value = _clean(match.group(1))
+                if fact == "name":
+                    if value.lower() in NOT_NAMES:
+                        continue
+                    value = value.title() if value.islower() else value
+                if value and self._single.get(fact) != value:
+                    self._single[fact] = value
+                    changed = True
+
+        for fact, pattern in LIST_FACTS:
+            for match in pattern.finditer(message):
+                value = _clean(match.group(1))
+                if value:
+                    changed |= self._add_item(fact, value)
+
+        if changed:
+            self._changed()
+        return changed
+
+    def observe_all(self, turns: Iterable[Mapping]) -> bool:
+        """Extract facts from stored turns, oldest first."""
+        changed = False
+        for turn in turns:
+            changed |= self.observe(turn["user"])
+        return changed
+
+    def _add_item(self, fact: str, value: str) -> bool:
+        key = value.lower()
+        opposite = self._lists.get(OPPOSITES.get(fact, ""), {})
+        opposite.pop(key, None)
+
+        items = self._lists.setdefault(fact, {})
+        if items.get(key) == value:
+            return False
+        items.pop(key, None)  # re-mentioned items move to the end
+        items[key] = value
+        while len(items) > MAX_ITEMS:
+            del items[next(iter(items))]
+        return True
+
+    def clear(self):
+        self._single.clear()
+        self._lists.clear()
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot = (self.version, self.to_dict())
+
+    # ---------- prompt ----------
+
+    def render(self) -> str:
+        """Compact header for the prompt ("" when nothing is known)."""
+        if self._header_version == self.version:
+            return self._header
+
+        lines = [f"- {fact}: {value}" for fact, value in self._single.items()]
+        lines.extend(
+            f"- {fact}: {'; '.join(items.values())}" for fact, items in self._lists.items() if items
+        )
+        self._header = FACTS_HEADER + "\n".join(lines) + "\n" if lines else ""
+        self._header_version = self.version
+        return self._header
+
+    # ---------- persistence ----------
+
+    def snapshot(self) -> Tuple[int, dict]:
+        """(version, facts) as of the last change; safe to read from any thread."""
+        return self._snapshot
+
+    def to_dict(self) -> dict:
+        facts = dict(self._single)
+        for fact, items in list(self._lists.items()):
+            if items:
+                facts[fact] = list(items.values())
+        return facts
+
+    def load(self, facts: Mapping):
+        """Replace the store's contents with saved facts."""
+        self._single.clear()
+        self._lists.clear()
+        for fact, value in facts.items():
+            if isinstance(value, list):
+                self._lists[fact] = {str(item).lower(): str(item) for item in value}
+            else:
+                self._single[fact] = str(value)
+        self._changed()
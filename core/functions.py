@@ -9,8 +9,7 @@
 # """
 
 # import datetime
-# from sympy import sympify, SympifyError
-# import wikipedia
+# # import wikipedia
 
 # # Configure Wikipedia API
 # wikipedia.set_rate_limiting(True)  # Prevents rate limit issues
@@ -227,13 +226,23 @@ Core Functions Module for Lexi Agent
 Implements the actual logic for all agent tools.
 """
 
+import asyncio
 import datetime
-from sympy import sympify, SympifyError
-import wikipedia
+import os
+import threading
+from typing import Optional
 
-# Configure Wikipedia API
-wikipedia.set_rate_limiting(True)
-wikipedia.set_lang("en")
+from core.cache import AsyncSingleFlight, SingleFlight, TTLCache
+from core.calculator import SympySandbox, fast_evaluate
+from core.disk_cache import DiskCache
+from core.telemetry import get_logger
+from core.wiki_client import AsyncWikipediaClient
+
+logger = get_logger("functions")
+
+# Heavy tool backends (SymPy, the wikipedia package with requests and
+# BeautifulSoup) are imported on first use, not at startup: SymPy inside
+# the calculator sandbox, wikipedia through _wikipedia() below.
 
 # ============================================================
 # 🕐 TIME FUNCTION
@@ -244,10 +253,10 @@ def get_current_time() -> str:
     try:
         now = datetime.datetime.now()
         formatted_time = now.strftime("%I:%M %p on %B %d, %Y")
-        print(f"[TIME] Retrieved: {formatted_time}")
+        logger.debug("[TIME] Retrieved: %s", formatted_time)
         return f"It's currently {formatted_time}."
     except Exception as e:
-        print(f"[TIME] Error: {str(e)}")
+        logger.error("[TIME] Error: %s", e)
         raise Exception(f"Could not retrieve current time: {str(e)}")
 
 
@@ -255,73 +264,289 @@ def get_current_time() -> str:
 # 🧮 CALCULATION FUNCTION
 # ============================================================
 
+# SymPy results (and errors) by normalized expression; evaluation is
+# deterministic, but limit hits are kept briefly in case the host was busy.
+# Fast-path answers are cheaper to recompute than to look up.
+CALC_MEMO = TTLCache(max_entries=4096, ttl=24 * 3600, name="calculator")
+CALC_LIMIT_TTL = 300
+
+# SymPy runs in worker processes so pathological input is killed, not awaited
+CALC_SANDBOX = SympySandbox(
+    workers=int(os.getenv("LEXI_CALC_WORKERS", "2")),
+    timeout=float(os.getenv("LEXI_CALC_TIMEOUT", "5")),
+    memory_mb=int(os.getenv("LEXI_CALC_MEMORY_MB", "512")),
+)
+
+
+def _normalize_expression(expression: str) -> str:
+    """Memo key: same meaning, insignificant whitespace and ^/** spelling ignored."""
+    return " ".join(expression.split()).replace("^", "**")
+
+
+def _evaluate_expression(expression: str) -> tuple:
+    """
+    Evaluate through the fast path, else the memo, else SymPy in the sandbox.
+
+    Returns:
+        tuple: ("ok", value), ("invalid", message), ("limit", message) or ("error", message)
+    """
+    value = fast_evaluate(expression)
+    if value is not None:
+        return ("ok", value)
+    
+    key = _normalize_expression(expression)
+    outcome = CALC_MEMO.get(key)
+    if outcome is None:
+        outcome = CALC_SANDBOX.evaluate(expression)
+        CALC_MEMO.set(key, outcome, ttl=CALC_LIMIT_TTL if outcome[0] == "limit" else None)
+    return outcome
+
+
 def calculate_expression(expression: str) -> str:
-    """Safely evaluates a mathematical expression using SymPy."""
+    """Safely evaluates a mathematical expression (memoized, time/memory bounded)."""
     if not expression or not isinstance(expression, str):
         raise ValueError("Expression must be a non-empty string")
     
-    try:
-        result = sympify(expression, evaluate=True)
-        
-        if not isinstance(result, (int, float)) and not result.is_number:
-            print(f"[CALC] Invalid result type for '{expression}': {type(result)}")
-            raise ValueError("Expression must evaluate to a number")
-        
-        numeric_result = float(result)
-        
-        if numeric_result.is_integer():
-            formatted_result = int(numeric_result)
-        else:
-            formatted_result = round(numeric_result, 6)
-        
-        print(f"[CALC] '{expression}' = {formatted_result}")
-        return f"{expression} equals {formatted_result}."
-    
-    except (SympifyError, ValueError, TypeError) as e:
-        print(f"[CALC] Error for '{expression}': {str(e)}")
+    outcome = _evaluate_expression(expression)
+    kind, payload = outcome
+    if kind == "invalid":
+        logger.warning("[CALC] Error for '%s': %s", expression, payload)
         raise ValueError(f"Could not calculate '{expression}': Invalid expression")
-    except Exception as e:
-        print(f"[CALC] Unexpected error for '{expression}': {str(e)}")
-        raise Exception(f"Calculation error: {str(e)}")
+    if kind != "ok":
+        logger.error("[CALC] Unexpected error for '%s': %s", expression, payload)
+        raise Exception(f"Calculation error: {payload}")
+    
+    numeric_result = payload
+    if numeric_result.is_integer():
+        formatted_result = int(numeric_result)
+    else:
+        formatted_result = round(numeric_result, 6)
+    
+    logger.debug("[CALC] '%s' = %s", expression, formatted_result)
+    return f"{expression} equals {formatted_result}."
+
+
+def calculation_stats() -> dict:
+    """Memo hit rate plus sandbox worker, timeout and latency figures."""
+    return {"memo": CALC_MEMO.stats(), "sandbox": CALC_SANDBOX.stats()}
 
 
 # ============================================================
 # 📚 WIKIPEDIA SEARCH FUNCTION
 # ============================================================
 
-def search_wikipedia(query: str) -> str:
-    """Searches Wikipedia and returns a concise summary."""
-    if not query or not isinstance(query, str):
-        raise ValueError("Query must be a non-empty string")
+# Summaries are cached for an hour; "ambiguous" and "not found" outcomes
+# for five minutes so new pages and fixes show up reasonably soon
+WIKI_CACHE = TTLCache(max_entries=2048, ttl=3600, name="wikipedia")
+WIKI_NEGATIVE_TTL = 300
+_wiki_flight = SingleFlight()
+_wiki_async_flight = AsyncSingleFlight()
+
+# Shared by all sessions: pooled connections, bounded concurrency, rate limit
+WIKI_CLIENT = AsyncWikipediaClient()
+
+# Second tier shared by all worker processes ("" disables it)
+WIKI_DISK_CACHE_PATH = os.getenv("LEXI_WIKI_CACHE_PATH", "data/cache/wikipedia.sqlite3")
+_wiki_disk_cache = None
+_wiki_disk_lock = threading.Lock()
+
+
+def _disk_cache() -> Optional[DiskCache]:
+    """Open the shared on-disk Wikipedia cache on first use."""
+    global _wiki_disk_cache, WIKI_DISK_CACHE_PATH
+    if _wiki_disk_cache is None and WIKI_DISK_CACHE_PATH:
+        with _wiki_disk_lock:
+            if _wiki_disk_cache is None:
+                try:
+                    _wiki_disk_cache = DiskCache(WIKI_DISK_CACHE_PATH, name="wikipedia_disk")
+                except Exception as e:
+                    logger.warning("[WIKI] Disk cache unavailable, using memory only: %s", e)
+                    WIKI_DISK_CACHE_PATH = ""
+    return _wiki_disk_cache
+
+
+def _normalize_query(query: str) -> str:
+    """Cache key for a query: case- and whitespace-insensitive."""
+    return " ".join(query.split()).casefold()
+
+
+_wikipedia_module = None
+
+
+def _wikipedia():
+    """Import and configure the wikipedia package on first use."""
+    global _wikipedia_module
+    if _wikipedia_module is None:
+        import wikipedia
+        
+        # Configure Wikipedia API
+        wikipedia.set_rate_limiting(True)
+        wikipedia.set_lang("en")
+        _wikipedia_module = wikipedia
+    return _wikipedia_module
+
+
+def _fetch_wikipedia(query: str) -> tuple:
+    """
+    Look a query up on Wikipedia.
+    
+    Returns:
+        tuple: ("summary", text), ("disambiguation", options) or ("not_found", None)
+    """
+    wikipedia = _wikipedia()
+    try:
+        return ("summary", wikipedia.summary(query, sentences=2, auto_suggest=True))
+    except wikipedia.exceptions.DisambiguationError as e:
+        return ("disambiguation", list(e.options[:5]))
+    except wikipedia.exceptions.PageError:
+        return ("not_found", None)
+
+
+def _cached_outcome(key: str) -> Optional[tuple]:
+    """Outcome from the memory cache, else the disk cache (refilling memory)."""
+    outcome = WIKI_CACHE.get(key)
+    if outcome is not None:
+        return outcome
+    
+    disk = _disk_cache()
+    if disk is not None:
+        cached = disk.get(key)
+        if cached is not None:
+            value, remaining = cached
+            outcome = tuple(value)
+            WIKI_CACHE.set(key, outcome, ttl=remaining)
+            return outcome
+    return None
+
+
+def _store_outcome(key: str, outcome: tuple):
+    """Cache a fresh outcome in both tiers (negative outcomes briefly)."""
+    ttl = WIKI_CACHE.ttl if outcome[0] == "summary" else WIKI_NEGATIVE_TTL
+    WIKI_CACHE.set(key, outcome, ttl=ttl)
+    disk = _disk_cache()
+    if disk is not None:
+        disk.set(key, list(outcome), ttl=ttl)
+
+
+def _stale_outcome(key: str, query: str, error: Exception) -> tuple:
+    """Expired disk entry to serve when the network fails, else re-raise."""
+    disk = _disk_cache()
+    stale = disk.get(key, allow_stale=True) if disk is not None else None
+    if stale is None:
+        raise error
+    logger.warning("[WIKI] Lookup failed, serving stale result for '%s'", query)
+    return tuple(stale[0])
+
+
+def _lookup_wikipedia(query: str) -> tuple:
+    """
+    Wikipedia lookup through memory cache, disk cache, then the network.
+    
+    Concurrent identical misses share one request. Errors are not cached;
+    if the network fails, a stale disk entry is served when available.
+    """
+    key = _normalize_query(query)
+    outcome = WIKI_CACHE.get(key)
+    if outcome is not None:
+        return outcome
+    
+    def fetch_and_cache():
+        cached = _cached_outcome(key)
+        if cached is not None:
+            return cached
+        try:
+            result = _fetch_wikipedia(query)
+        except Exception as e:
+            return _stale_outcome(key, query, e)
+        _store_outcome(key, result)
+        return result
     
-    query = query.strip()
+    return _wiki_flight.do(key, fetch_and_cache)
+
+
+async def _alookup_wikipedia(query: str) -> tuple:
+    """
+    Async _lookup_wikipedia over the pooled AsyncWikipediaClient.
+    
+    Only the memory cache is checked on the event loop; the SQLite disk
+    tier (opening it, reads, writes, stale fallback) runs in a worker
+    thread so a slow disk never stalls other sessions.
+    """
+    key = _normalize_query(query)
+    outcome = WIKI_CACHE.get(key)
+    if outcome is not None:
+        return outcome
+    
+    async def fetch_and_cache():
+        cached = await asyncio.to_thread(_cached_outcome, key)
+        if cached is not None:
+            return cached
+        try:
+            result = await WIKI_CLIENT.lookup(query, sentences=2)
+        except Exception as e:
+            return await asyncio.to_thread(_stale_outcome, key, query, e)
+        await asyncio.to_thread(_store_outcome, key, result)
+        return result
     
-    try:
-        summary = wikipedia.summary(query, sentences=2, auto_suggest=True)
-        print(f"[WIKI] Found summary for '{query}': {summary[:80]}...")
-        return f"According to Wikipedia, {summary}"
+    return await _wiki_async_flight.do(key, fetch_and_cache)
+
+
+def _format_wikipedia(query: str, outcome: tuple) -> str:
+    """Turn a lookup outcome into the tool's reply text."""
+    kind, payload = outcome
     
-    except wikipedia.exceptions.DisambiguationError as e:
-        options = e.options[:5]
-        options_str = ", ".join(options)
-        print(f"[WIKI] Disambiguation for '{query}': {options}")
+    if kind == "summary":
+        logger.debug("[WIKI] Found summary for '%s': %.80s...", query, payload)
+        return f"According to Wikipedia, {payload}"
+    
+    if kind == "disambiguation":
+        options_str = ", ".join(payload)
+        logger.debug("[WIKI] Disambiguation for '%s': %s", query, options_str)
         return (
             f"Your query '{query}' could refer to multiple topics. "
             f"Please be more specific. Did you mean: {options_str}?"
         )
     
-    except wikipedia.exceptions.PageError:
-        print(f"[WIKI] Page not found for '{query}'")
-        return (
-            f"I couldn't find a Wikipedia page for '{query}'. "
-            f"Please check the spelling or try a different search term."
-        )
+    logger.debug("[WIKI] Page not found for '%s'", query)
+    return (
+        f"I couldn't find a Wikipedia page for '{query}'. "
+        f"Please check the spelling or try a different search term."
+    )
+
+
+def search_wikipedia(query: str) -> str:
+    """Searches Wikipedia and returns a concise summary (cached)."""
+    if not query or not isinstance(query, str):
+        raise ValueError("Query must be a non-empty string")
+    
+    query = query.strip()
+    
+    try:
+        return _format_wikipedia(query, _lookup_wikipedia(query))
+    except Exception as e:
+        logger.error("[WIKI] Error searching for '%s': %s", query, e)
+        raise Exception(f"Wikipedia search failed: {str(e)}")
+
+
+async def asearch_wikipedia(query: str) -> str:
+    """Async search_wikipedia: same replies, without blocking the event loop."""
+    if not query or not isinstance(query, str):
+        raise ValueError("Query must be a non-empty string")
     
+    query = query.strip()
+    
+    try:
+        return _format_wikipedia(query, await _alookup_wikipedia(query))
     except Exception as e:
-        print(f"[WIKI] Error searching for '{query}': {str(e)}")
+        logger.error("[WIKI] Error searching for '%s': %s", query, e)
         raise Exception(f"Wikipedia search failed: {str(e)}")
 
 
+def wikipedia_cache_stats() -> dict:
+    """Hit/miss statistics for the Wikipedia result cache."""
+    return WIKI_CACHE.stats()
+
+
 # ============================================================
 # 🧪 TESTING
 # ============================================================
@@ -0,0 +1,560 @@
+"""
+History Store Module for Lexi
+Pluggable persistence backends for conversation history:
+- JournalHistoryStore: JSON snapshot plus append-only JSONL journal
+- SQLiteHistoryStore: shared SQLite database (WAL) keyed by session id
+Plus retention helpers that delete histories of long-idle sessions.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Tuple
+
+# ============================================================
+# 🔌 STORE INTERFACE
+# ============================================================
+
+
+class HistoryStore(ABC):
+    """
+    Interface between LexiAgent and where its history lives.
+
+    Metadata returned by load() has "session_start" and "message_count".
+    """
+
+    @property
+    @abstractmethod
+    def location(self) -> str:
+        """Human-readable description of where history is stored."""
+
+    @abstractmethod
+    def load(self, limit: Optional[int] = None) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Load stored history.
+
+        Args:
+            limit: Only return the most recent `limit` turns
+
+        Returns:
+            tuple: (metadata or None if nothing is stored, turns oldest first)
+        """
+
+    @abstractmethod
+    def append(self, turns: List[dict]):
+        """Persist turns added since the previous call, oldest first."""
+
+    @abstractmethod
+    def replace(self, session_start: str, message_count: int, turns: List[dict]):
+        """Overwrite stored history with exactly these turns."""
+
+    def reset(self, session_start: str):
+        """Replace stored history with an empty session."""
+        self.replace(session_start, 0, [])
+
+    def maybe_compact(self):
+        """Hook for backends that periodically reorganize their storage."""
+
+    def load_facts(self) -> dict:
+        """Saved user facts (see core.facts); {} if none are stored."""
+        return {}
+
+    def save_facts(self, facts: dict):
+        """Persist user facts, replacing any saved before."""
+
+
+def _last_n(turns: List[dict], limit: Optional[int]) -> List[dict]:
+    return turns[-limit:] if limit else turns
+
+
+# ============================================================
+# 📓 JOURNALED HISTORY STORE
+# ============================================================
+
+
+class JournalHistoryStore(HistoryStore):
+    """
+    Append-only JSONL journal with periodic compaction into a snapshot.
+
+    Layout for a history path like "data/history.json":
+    - data/history.json   snapshot in the original save format
+    - data/history.jsonl  one JSON record per turn appended since then
+    - data/history.facts.json  extracted user facts
+
+    Each save appends only the new turns (O(1) bytes per turn). Records
+    are written as whole lines and fsynced in batches; a torn last line
+    left by a crash is dropped on replay. Once the journal holds
+    compact_every records it is folded into a fresh snapshot, written to a
+    temporary file and atomically renamed into place.
+
+    Every snapshot has a generation number, one higher than the one it
+    replaces, and journal records carry the generation they extend.
+    Replay skips records older than the snapshot, so a crash between
+    writing a snapshot and truncating the journal never brings back
+    turns that were compacted or reset away.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync_every: int = 8,
+        fsync_interval: float = 1.0,
+        compact_every: int = 200,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: Snapshot path; the journal lives next to it as .jsonl
+            fsync_every: Fsync after this many unsynced records
+            fsync_interval: Fsync if this many seconds passed since the last one
+            compact_every: Journal records that trigger compaction
+        """
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".jsonl"
+        self.facts_path = os.path.splitext(path)[0] + ".facts.json"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._generation: Optional[int] = None  # read from the snapshot on first use
+
+    @property
+    def location(self) -> str:
+        return self.path
+
+    def _current_generation(self) -> int:
+        """Generation of the snapshot on disk (0 if none, or saved without one)."""
+        if self._generation is None:
+            self._generation = 0
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._generation = json.load(f).get("generation", 0)
+        return self._generation
+
+    # ------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------
+
+    def load(self, limit: Optional[int] = None) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Replay the snapshot plus journal tail.
+
+        Args:
+            limit: Only return the most recent `limit` turns
+
+        Returns:
+            tuple: (snapshot metadata or None if nothing is stored, turns)
+        """
+        meta, turns = self._replay()
+        return meta, _last_n(turns, limit)
+
+    def _replay(self) -> Tuple[Optional[dict], List[dict]]:
+        """Read the snapshot and every valid journal record."""
+        meta = None
+        turns: List[dict] = []
+        generation = 0
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            turns = data.get("conversation", [])
+            generation = data.get("generation", 0)
+            meta = {
+                "session_start": data.get("session_start"),
+                "message_count": data.get("message_count", len(turns)),
+            }
+
+        self._generation = generation
+        last_number = turns[-1].get("message_number", 0) if turns else 0
+        self._journal_records = 0
+
+        if os.path.exists(self.journal_path):
+            good_bytes = 0
+            torn = False
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        turn = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash: keep everything before it
+                        torn = True
+                        break
+                    good_bytes += len(line)
+                    self._journal_records += 1
+
+                    # Written before the snapshot was (the journal's truncation was interrupted)
+                    if turn.pop("generation", 0) < generation:
+                        continue
+                    # Journals from before generations: skip turns the snapshot already has
+                    if turn.get("message_number", last_number + 1) <= last_number:
+                        continue
+                    turns.append(turn)
+                    last_number = turn.get("message_number", last_number + 1)
+
+            if torn:
+                # Drop the partial record so new appends start on a clean line
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_bytes)
+
+            if meta is None:
+                meta = {"session_start": None, "message_count": len(turns)}
+            # The snapshot's count predates the journaled turns
+            meta["message_count"] = max(meta["message_count"], last_number)
+
+        return meta, turns
+
+    # ------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------
+
+    def append(self, turns: List[dict]):
+        """
+        Append turns to the journal, one line each.
+
+        Args:
+            turns: New turns, oldest first
+        """
+        if not turns:
+            return
+
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        generation = self._current_generation()
+        payload = "".join(
+            json.dumps({**turn, "generation": generation}, ensure_ascii=False) + "\n" for turn in turns
+        )
+
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+
+            self._journal_records += len(turns)
+            self._unsynced += len(turns)
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_fsync >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._unsynced = 0
+                self._last_fsync = now
+
+    def maybe_compact(self):
+        """Fold the journal into the snapshot once it holds compact_every records."""
+        if self._journal_records < self.compact_every:
+            return
+
+        # Rebuilt from disk so turns not resident in memory are kept; the
+        # count comes from the replayed turns, not the previous snapshot
+        meta, turns = self._replay()
+        meta = meta or {}
+        message_count = meta.get("message_count", 0)
+        if turns:
+            message_count = max(message_count, turns[-1].get("message_number", len(turns)))
+        self.replace(meta.get("session_start"), message_count, turns)
+
+    def replace(self, session_start: str, message_count: int, turns: List[dict]):
+        """
+        Write a full snapshot atomically and truncate the journal.
+
+        Args:
+            session_start: Session start timestamp
+            message_count: Messages processed in the session
+            turns: Complete conversation history
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        generation = self._current_generation() + 1
+        save_data = {
+            "session_start": session_start,
+            "message_count": message_count,
+            "generation": generation,
+            "conversation": [dict(turn) for turn in turns],
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(save_data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._generation = generation
+
+        # A crash before this point leaves older-generation records that load() skips
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    # ------------------------------------------------------------
+    # Facts
+    # ------------------------------------------------------------
+
+    def load_facts(self) -> dict:
+        if not os.path.exists(self.facts_path):
+            return {}
+        try:
+            with open(self.facts_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def save_facts(self, facts: dict):
+        directory = os.path.dirname(self.facts_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.facts_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(facts, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.facts_path)
+
+
+# ============================================================
+# 🗄️ SQLITE HISTORY STORE
+# ============================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id    TEXT PRIMARY KEY,
+    session_start TEXT
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id     TEXT    NOT NULL,
+    message_number INTEGER NOT NULL,
+    timestamp      TEXT    NOT NULL,
+    user           TEXT    NOT NULL,
+    assistant      TEXT    NOT NULL,
+    PRIMARY KEY (session_id, message_number)
+);
+CREATE INDEX IF NOT EXISTS idx_turns_session_time ON turns (session_id, timestamp);
+CREATE TABLE IF NOT EXISTS facts (
+    session_id TEXT PRIMARY KEY,
+    facts      TEXT NOT NULL
+);
+"""
+
+# One connection per database file, shared by every session in the process
+_connections: Dict[str, Tuple[sqlite3.Connection, threading.Lock]] = {}
+_connections_lock = threading.Lock()
+
+
+def _shared_connection(db_path: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    """Open (once) a WAL-mode connection to db_path."""
+    key = os.path.abspath(db_path)
+    with _connections_lock:
+        if key not in _connections:
+            directory = os.path.dirname(key)
+            os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(key, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            _connections[key] = (conn, threading.Lock())
+        return _connections[key]
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    History for one session inside a shared SQLite database.
+
+    WAL mode lets many sessions (and worker processes) write without
+    contending on a single file rewrite; the (session_id, message_number)
+    primary key serves "last N turns" lookups straight from the index, and
+    each save inserts its turns in one batched transaction.
+    """
+
+    def __init__(self, db_path: str, session_id: str):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: SQLite database file shared by all sessions
+            session_id: Session whose turns this store reads and writes
+        """
+        self.db_path = db_path
+        self.session_id = session_id
+        self._conn, self._lock = _shared_connection(db_path)
+
+    @property
+    def location(self) -> str:
+        return f"{self.db_path}#{self.session_id}"
+
+    def load(self, limit: Optional[int] = None) -> Tuple[Optional[dict], List[dict]]:
+        with self._lock:
+            session = self._conn.execute(
+                "SELECT session_start FROM sessions WHERE session_id = ?",
+                (self.session_id,),
+            ).fetchone()
+            count = self._conn.execute(
+                "SELECT COALESCE(MAX(message_number), 0) FROM turns WHERE session_id = ?",
+                (self.session_id,),
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT timestamp, message_number, user, assistant FROM turns "
+                "WHERE session_id = ? ORDER BY message_number DESC LIMIT ?",
+                (self.session_id, limit if limit else -1),
+            ).fetchall()
+
+        if session is None and not rows:
+            return None, []
+
+        turns = [
+            {"timestamp": ts, "message_number": number, "user": user, "assistant": assistant}
+            for ts, number, user, assistant in reversed(rows)
+        ]
+        meta = {"session_start": session[0] if session else None, "message_count": count}
+        return meta, turns
+
+    def append(self, turns: List[dict]):
+        if not turns:
+            return
+
+        with self._lock, self._conn:
+            self._insert(turns)
+
+    def replace(self, session_start: str, message_count: int, turns: List[dict]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM turns WHERE session_id = ?", (self.session_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, session_start) VALUES (?, ?)",
+                (self.session_id, session_start),
+            )
+            self._insert(turns)
+
+    def load_facts(self) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT facts FROM facts WHERE session_id = ?", (self.session_id,)
+            ).fetchone()
+        try:
+            return json.loads(row[0]) if row else {}
+        except ValueError:
+            return {}
+
+    def save_facts(self, facts: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO facts (session_id, facts) VALUES (?, ?)",
+                (self.session_id, json.dumps(facts, ensure_ascii=False)),
+            )
+
+    def _insert(self, turns: List[dict]):
+        """Batch-insert turns; caller holds the lock and the transaction."""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO sessions (session_id, session_start) VALUES (?, NULL)",
+            (self.session_id,),
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO turns (session_id, message_number, timestamp, user, assistant) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (self.session_id, turn["message_number"], turn["timestamp"], turn["user"], turn["assistant"])
+                for turn in turns
+            ],
+        )
+
+
+# ============================================================
+# 🧹 RETENTION
+# ============================================================
+
+# Files a JournalHistoryStore keeps per session, longest suffix first
+_JOURNAL_SUFFIXES = (".facts.json.tmp", ".facts.json", ".json.tmp", ".jsonl", ".json")
+
+
+def prune_journal_histories(directory: str, max_age: float, keep: Collection[str] = ()) -> int:
+    """
+    Delete per-session journal histories not written to for max_age seconds.
+
+    Args:
+        directory: Directory holding the per-session history files
+        max_age: Seconds since a session's newest file was modified
+        keep: Snapshot paths of sessions to keep regardless of age
+
+    Returns:
+        int: Number of sessions removed
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+
+    keep_stems = {os.path.splitext(os.path.abspath(path))[0] for path in keep}
+    sessions: Dict[str, List[str]] = {}
+    for name in names:
+        suffix = next((suffix for suffix in _JOURNAL_SUFFIXES if name.endswith(suffix)), None)
+        if suffix is None:
+            continue
+        stem = os.path.abspath(os.path.join(directory, name[:-len(suffix)]))
+        sessions.setdefault(stem, []).append(os.path.join(directory, name))
+
+    cutoff = time.time() - max_age
+    removed = 0
+    for stem, paths in sessions.items():
+        if stem in keep_stems:
+            continue
+        try:
+            if max(os.path.getmtime(path) for path in paths) >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue  # Being rewritten right now, so not stale
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+
+def prune_sqlite_histories(db_path: str, max_age: float, keep: Collection[str] = ()) -> int:
+    """
+    Delete sessions whose newest turn is older than max_age seconds.
+
+    Sessions without turns are aged by their session_start.
+
+    Args:
+        db_path: SQLite database file shared by all sessions
+        max_age: Seconds since a session's newest turn
+        keep: Session ids to keep regardless of age
+
+    Returns:
+        int: Number of sessions removed
+    """
+    if not os.path.exists(db_path):
+        return 0
+
+    # Turn timestamps are local-time ISO strings, which sort chronologically
+    cutoff = datetime.fromtimestamp(time.time() - max_age).isoformat()
+    conn, lock = _shared_connection(db_path)
+    with lock, conn:
+        stale = [
+            (session_id,)
+            for (session_id,) in conn.execute(
+                "SELECT s.session_id FROM sessions s LEFT JOIN turns t ON t.session_id = s.session_id "
+                "GROUP BY s.session_id HAVING COALESCE(MAX(t.timestamp), s.session_start, '') < ?",
+                (cutoff,),
+            ).fetchall()
+            if session_id not in keep
+        ]
+        for table in ("turns", "facts", "sessions"):
+            conn.executemany(f"DELETE FROM {table} WHERE session_id = ?", stale)
+    return len(stale)
@@ -0,0 +1,269 @@
+"""
+Metrics Module for Lexi
+Lightweight in-process counters, gauges and histograms.
+"""
+
+import bisect
+import math
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Latency buckets in seconds (upper bounds), Prometheus style
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ============================================================
+# 📈 METRIC TYPES
+# ============================================================
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    Bucketed distribution of observations.
+
+    Keeps cumulative bucket counts plus a bounded window of recent samples
+    so callers can ask for live percentiles.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+            self._recent.append(value)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def bucket_counts(self) -> list:
+        """Cumulative counts per bucket, ending with +Inf."""
+        with self._lock:
+            counts = list(self._counts)
+        total = 0
+        cumulative = []
+        for c in counts:
+            total += c
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantile (0-1) over recent samples, or None without data."""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[index]
+
+
+class _NullMetric:
+    """Stand-in returned by a disabled registry; every update is a no-op."""
+
+    value = 0.0
+    count = 0
+    sum = 0.0
+
+    def inc(self, amount: float = 1.0):
+        pass
+
+    def dec(self, amount: float = 1.0):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+    def bucket_counts(self) -> list:
+        return []
+
+    def quantile(self, q: float) -> Optional[float]:
+        return None
+
+
+_NULL_METRIC = _NullMetric()
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Prometheus label set, e.g. {cache="wikipedia",le="0.5"}."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+# ============================================================
+# 🗃️ REGISTRY
+# ============================================================
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Named metrics, optionally split by labels.
+
+    Asking for the same name and labels twice returns the same metric,
+    so modules can look metrics up on the hot path without holding refs.
+    A disabled registry hands out no-op metrics and records nothing.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[Tuple[str, LabelKey], object] = {}
+        self._kinds: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help: str, labels: Dict[str, str], factory):
+        if not self.enabled:
+            return _NULL_METRIC
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is not None:
+            return metric
+
+        with self._lock:
+            registered = self._kinds.setdefault(name, kind)
+            if registered != kind:
+                raise ValueError(f"Metric '{name}' already registered as a {registered}")
+            if help:
+                self._help.setdefault(name, help)
+            return self._metrics.setdefault(key, factory())
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._get("counter", name, help, labels, Counter)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._get("gauge", name, help, labels, Gauge)
+
+    def histogram(self, name: str, help: str = "", **labels) -> Histogram:
+        return self._get("histogram", name, help, labels, Histogram)
+
+    def snapshot(self) -> dict:
+        """
+        Plain-dict view of every metric.
+
+        Returns:
+            dict: {name: [{"labels": {...}, ...values}]}
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+
+        result: Dict[str, list] = {}
+        for (name, label_key), metric in sorted(items, key=lambda item: item[0]):
+            entry = {"labels": dict(label_key)}
+            if isinstance(metric, Histogram):
+                entry.update(
+                    count=metric.count,
+                    sum=metric.sum,
+                    p50=metric.quantile(0.5),
+                    p95=metric.quantile(0.95),
+                    p99=metric.quantile(0.99),
+                )
+            else:
+                entry["value"] = metric.value
+            result.setdefault(name, []).append(entry)
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Body for a /metrics endpoint
+        """
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+            kinds = dict(self._kinds)
+            helps = dict(self._help)
+
+        lines = []
+        current = None
+        for (name, label_key), metric in items:
+            if name != current:
+                current = name
+                if name in helps:
+                    lines.append(f"# HELP {name} {helps[name]}")
+                lines.append(f"# TYPE {name} {kinds[name]}")
+
+            labels = dict(label_key)
+            if isinstance(metric, Histogram):
+                bounds = metric.buckets + (math.inf,)
+                for bound, count in zip(bounds, metric.bucket_counts()):
+                    bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                    lines.append(f"{name}_bucket{bucket_labels} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# Process-wide registry used by every Lexi module (LEXI_METRICS=0 turns it off)
+REGISTRY = MetricsRegistry(enabled=os.getenv("LEXI_METRICS", "1") != "0")
@@ -0,0 +1,168 @@
+"""
+Persistence Module for Lexi
+Write-behind queue that moves history saves off the request path.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from core.metrics import REGISTRY
+from core.telemetry import get_logger
+
+logger = get_logger("persistence")
+
+# ============================================================
+# 💾 WRITE-BEHIND QUEUE
+# ============================================================
+
+
+class WriteBehindQueue:
+    """
+    Background writer that coalesces pending saves per key.
+
+    submit() only records "key needs saving" and returns immediately; a
+    dedicated thread runs the save later. Submitting again for a key that
+    is still waiting replaces the earlier request, so a burst of messages
+    in one session costs a single write. Pending saves are flushed on
+    flush()/aflush() and at interpreter exit.
+    """
+
+    def __init__(self, name: str = "history"):
+        """
+        Initialize the queue (the worker thread starts on first submit).
+
+        Args:
+            name: Label used for this queue's metrics
+        """
+        self.name = name
+        self._pending: "OrderedDict[str, Callable[[], object]]" = OrderedDict()
+        self._inflight: Optional[str] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self._depth = REGISTRY.gauge(
+            "lexi_persistence_queue_depth", "Saves waiting in the write-behind queue", queue=name
+        )
+        self._flushes = REGISTRY.counter(
+            "lexi_persistence_flushes_total", "Saves written by the write-behind queue", queue=name
+        )
+        self._coalesced = REGISTRY.counter(
+            "lexi_persistence_coalesced_total", "Saves merged into an already pending one", queue=name
+        )
+        self._errors = REGISTRY.counter(
+            "lexi_persistence_errors_total", "Saves that raised", queue=name
+        )
+        self._latency = REGISTRY.histogram(
+            "lexi_persistence_flush_seconds", "Time spent writing one save", queue=name
+        )
+
+        atexit.register(self.shutdown)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, key: str, save: Callable[[], object]):
+        """
+        Schedule save() to run in the background for key.
+
+        Args:
+            key: Coalescing key (the session id)
+            save: Zero-argument callable that performs the write
+        """
+        with self._cond:
+            if self._stopping:
+                # Too late for the worker; write synchronously instead
+                save()
+                return
+
+            if key in self._pending:
+                self._coalesced.inc()
+            self._pending[key] = save
+            self._depth.set(len(self._pending))
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def flush(self, key: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until key's pending save (or every pending save) is written.
+
+        Args:
+            key: Session to flush, or None for all
+            timeout: Maximum seconds to wait
+
+        Returns:
+            bool: True if nothing relevant is left pending
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while self._is_pending(key):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    async def aflush(self, key: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Async flush() that waits in a worker thread, not on the event loop."""
+        return await asyncio.to_thread(self.flush, key, timeout)
+
+    def shutdown(self, timeout: Optional[float] = 10.0):
+        """Flush everything and stop the worker (registered with atexit)."""
+        self.flush(timeout=timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def _is_pending(self, key: Optional[str]) -> bool:
+        if key is None:
+            return bool(self._pending) or self._inflight is not None
+        return key in self._pending or self._inflight == key
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=f"lexi-write-behind-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                key, save = self._pending.popitem(last=False)
+                self._inflight = key
+                self._depth.set(len(self._pending))
+
+            start = time.perf_counter()
+            try:
+                save()
+                self._flushes.inc()
+            except Exception as e:
+                self._errors.inc()
+                logger.error("❌ Background save failed for %s: %s", key, e)
+            finally:
+                self._latency.observe(time.perf_counter() - start)
+                with self._cond:
+                    self._inflight = None
+                    self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Queue depth, flush count and flush latency percentiles."""
+        return {
+            "queue_depth": len(self._pending),
+            "flushes": int(self._flushes.value),
+            "coalesced": int(self._coalesced.value),
+            "errors": int(self._errors.value),
+            "flush_p50_s": self._latency.quantile(0.5),
+            "flush_p99_s": self._latency.quantile(0.99),
+        }
@@ -0,0 +1,341 @@
+"""
+Resilience Module for Lexi
+Retries with backoff, hedged requests and a circuit breaker around the model.
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import openai
+from agents.models.interface import Model
+
+from core.metrics import REGISTRY
+from core.telemetry import get_logger
+
+logger = get_logger("resilience")
+
+# Statuses worth retrying: rate limited, request timeout, provider errors
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed model call is the provider's fault (and worth retrying)."""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)  # includes timeouts
+
+
+def is_client_error(error: BaseException) -> bool:
+    """Whether the provider answered, rejecting the request itself (a 4xx)."""
+    return isinstance(error, openai.APIStatusError) and 400 <= error.status_code < 500
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms), if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================
+# 🔌 CIRCUIT BREAKER
+# ============================================================
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls go through. After failure_threshold provider failures in
+    a row it opens: calls fail fast with CircuitOpenError. After
+    reset_timeout one probe call is let through (half-open); its success
+    closes the circuit, its failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "model"):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before probing
+            name: Label used for this breaker's metrics
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+        self._state_gauge = REGISTRY.gauge(
+            "lexi_circuit_open", "1 while the circuit breaker sheds calls", breaker=name
+        )
+        self._rejections = REGISTRY.counter(
+            "lexi_circuit_rejections_total", "Calls shed by the open circuit", breaker=name
+        )
+        self._trips = REGISTRY.counter("lexi_circuit_trips_total", "Times the circuit opened", breaker=name)
+
+    def before_call(self):
+        """
+        Admit a call or shed it.
+
+        Raises:
+            CircuitOpenError: While open, or half-open with a probe in flight
+        """
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self._rejections.inc()
+        raise CircuitOpenError("Model provider is unavailable (circuit open), try again shortly")
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("🔌 Model circuit closed")
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+        self._state_gauge.set(0)
+
+    def abandon_probe(self):
+        """A half-open probe was cancelled: let the next call probe instead."""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self._trips.inc()
+                logger.warning("🔌 Model circuit opened after %d failures", self._failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+            self._state_gauge.set(1)
+
+
+# ============================================================
+# 🛡️ RESILIENT MODEL
+# ============================================================
+
+
+class ResilientModel(Model):
+    """
+    Model wrapper that retries provider failures and sheds load when down.
+
+    - 429/5xx/connection errors are retried with full-jitter exponential
+      backoff; a Retry-After header overrides the computed delay.
+    - With hedging on, a non-streamed call still running after the recent
+      p95 latency gets one duplicate request; the first answer wins.
+    - A CircuitBreaker fails calls fast while the provider keeps failing.
+
+    Streamed responses are only retried before their first event.
+    The wrapped client should not retry on its own (max_retries=0).
+    """
+
+    def __init__(
+        self,
+        wrapped: Model,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_retry_after: float = 30.0,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        name: str = "model",
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            wrapped: Model that makes the actual calls
+            max_attempts: Tries per call, including the first
+            base_delay: Backoff cap for the first retry (doubles per retry)
+            max_delay: Largest computed backoff
+            max_retry_after: Give up instead of honoring a longer Retry-After
+            hedge: Send a duplicate request once p95 latency is exceeded
+            hedge_min_samples: Latency samples needed before hedging starts
+            breaker: Circuit breaker (a default one is created if omitted)
+            name: Label used for this wrapper's metrics
+        """
+        self.wrapped = wrapped
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker(name=name)
+        self._latencies = deque(maxlen=256)
+
+        self._retries = REGISTRY.counter("lexi_model_retries_total", "Model calls retried", model=name)
+        self._failures = REGISTRY.counter(
+            "lexi_model_failures_total", "Model calls that failed after all retries", model=name
+        )
+        self._hedges = REGISTRY.counter("lexi_model_hedges_total", "Hedged duplicate requests sent", model=name)
+        self._hedge_wins = REGISTRY.counter(
+            "lexi_model_hedge_wins_total", "Hedged requests that answered first", model=name
+        )
+
+    # ---------- policy ----------
+
+    def backoff(self, attempt: int, error: BaseException) -> Optional[float]:
+        """
+        Delay before retry number `attempt` (1-based), or None to give up.
+
+        Retry-After wins over the computed full-jitter delay.
+        """
+        requested = retry_after(error)
+        if requested is not None:
+            return requested if requested <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Recent p95 latency, once there are enough samples to trust it."""
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        samples = sorted(self._latencies)
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def _record_non_retryable(self, error: BaseException):
+        """
+        A 4xx means the provider is up (the request was bad) and counts as
+        a success. Anything else (e.g. ModelOverloadedError raised by our
+        own limiter) never reached the provider, so the breaker only gives
+        up a half-open probe slot.
+        """
+        if is_client_error(error):
+            self.breaker.record_success()
+        else:
+            self.breaker.abandon_probe()
+
+    async def _retry_wait(self, attempt: int, error: BaseException):
+        """Count the failure, then sleep before the next attempt or re-raise."""
+        if not is_retryable(error):
+            self._record_non_retryable(error)
+            raise error
+        self.breaker.record_failure()
+        delay = self.backoff(attempt, error) if attempt < self.max_attempts else None
+        if delay is None or self.breaker.state == CircuitBreaker.OPEN:
+            self._failures.inc()
+            raise error
+
+        self._retries.inc()
+        logger.warning("🔁 Model call failed (%s), retry %d in %.2fs", error, attempt, delay)
+        await asyncio.sleep(delay)
+        self.breaker.before_call()
+
+    # ---------- calls ----------
+
+    async def _hedged(self, call: Callable[[], Awaitable]):
+        """Run call(); if it outlives the hedge delay, race a second copy."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await call()
+
+        tasks = [asyncio.ensure_future(call())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+
+            self._hedges.inc()
+            tasks.append(asyncio.ensure_future(call()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self._hedge_wins.inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def get_response(self, *args, **kwargs):
+        self.breaker.before_call()
+        attempt = 1
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    response = await self._hedged(lambda: self.wrapped.get_response(*args, **kwargs))
+                except Exception as e:
+                    await self._retry_wait(attempt, e)
+                    attempt += 1
+                    continue
+                self._latencies.append(time.perf_counter() - start)
+                self.breaker.record_success()
+                return response
+        except asyncio.CancelledError:
+            self.breaker.abandon_probe()
+            raise
+
+    async def stream_response(self, *args, **kwargs):
+        self.breaker.before_call()
+        attempt = 1
+        try:
+            while True:
+                started = False
+                try:
+                    async for event in self.wrapped.stream_response(*args, **kwargs):
+                        started = True
+                        yield event
+                except Exception as e:
+                    if started:
+                        # Events already reached the caller; a retry would duplicate them
+                        if is_retryable(e):
+                            self.breaker.record_failure()
+                        else:
+                            self._record_non_retryable(e)
+                        raise
+                    await self._retry_wait(attempt, e)
+                    attempt += 1
+                    continue
+                self.breaker.record_success()
+                return
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.abandon_probe()
+            raise
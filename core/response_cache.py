@@ -0,0 +1,105 @@
+"""
+Response Cache Module for Lexi
+Optional cache of whole agent replies, so exact repeats skip the model call.
+"""
+
+import hashlib
+import json
+from typing import Iterable, List, Optional, Union
+
+from core.cache import TTLCache
+from core.metrics import REGISTRY
+
+# Tools whose output depends on when they run; replies using them are never cached
+TIME_SENSITIVE_TOOLS = frozenset({"get_current_time"})
+
+# ============================================================
+# 💬 RESPONSE CACHE
+# ============================================================
+
+
+class ResponseCache:
+    """
+    TTL cache of agent replies keyed on everything the model sees.
+
+    The key is a SHA-256 of the instructions, the compacted history
+    context and the user message, so a hit means the model would receive
+    byte-identical input. Replies whose run called a time-sensitive tool
+    are not stored, and callers can bypass the cache per message.
+
+    Because the history is part of the key, hits in practice are limited
+    to identical opening messages (no history yet) across sessions, or a
+    session retried from the same state. Later turns almost never repeat
+    their whole input; keying on the message alone would be unsafe, since
+    replies like "what did I just ask?" depend on the history.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 3600.0,
+        uncacheable_tools: Iterable[str] = TIME_SENSITIVE_TOOLS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Replies kept before least recently used ones are evicted
+            ttl: Seconds a reply stays valid
+            uncacheable_tools: Tool names that make a reply uncacheable
+        """
+        self.uncacheable_tools = frozenset(uncacheable_tools)
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl, name="responses")
+        self._skipped = REGISTRY.counter(
+            "lexi_response_cache_skipped_total", "Replies not stored because a time-sensitive tool ran"
+        )
+        self._bypassed = REGISTRY.counter(
+            "lexi_response_cache_bypassed_total", "Messages that explicitly bypassed the response cache"
+        )
+
+    @staticmethod
+    def key(instructions: str, full_input: Union[str, List[dict]]) -> str:
+        """
+        Cache key for one model input (a prompt string or input messages).
+
+        The whole input is hashed, history included, so only a session
+        with identical history and message (usually a first message)
+        hits; see the class docstring.
+        """
+        if not isinstance(full_input, str):
+            full_input = json.dumps(full_input, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha256()
+        digest.update(instructions.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(full_input.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def store(self, key: str, response: str, tools_used: Iterable[str]) -> bool:
+        """
+        Cache a reply unless its run used an uncacheable tool.
+
+        Returns:
+            bool: Whether the reply was stored
+        """
+        if self.uncacheable_tools.intersection(tools_used):
+            self._skipped.inc()
+            return False
+        self._cache.set(key, response)
+        return True
+
+    def note_bypass(self):
+        self._bypassed.inc()
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Hit rate and size, plus how often caching was skipped or bypassed."""
+        return {
+            **self._cache.stats(),
+            "skipped_time_sensitive": int(self._skipped.value),
+            "bypassed": int(self._bypassed.value),
+        }
@@ -0,0 +1,132 @@
+"""
+Retrieval Module for Lexi
+Incremental lexical index over past turns, used to pull the exchanges
+relevant to the current message back into the context prompt.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from typing import Dict, List, Mapping, Tuple
+
+# ============================================================
+# 🔤 TOKENIZATION
+# ============================================================
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about am an and any are as at be been but by can could did do does for from
+had has have he her him his how i i'm if in into is it it's its me my of on or
+our please she so than that the their them then there these they this to us
+was we were what when where which who why will with would you your you're
+anything else tell know can't don't
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased content words (stopwords and 1-char tokens dropped)."""
+    return [word for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in STOPWORDS]
+
+
+# ============================================================
+# 🔎 TURN INDEX
+# ============================================================
+
+
+class TurnIndex:
+    """
+    Append-only BM25 (TF-IDF family) inverted index over turns.
+
+    Each added turn costs one tokenization; postings are compact arrays
+    per term, and document frequencies and average length update in
+    place, so nothing is rebuilt as the session grows. A query only
+    touches the postings of its own terms. Once the index holds
+    min_docs_for_max_df turns, it also skips terms found in more than
+    max_df of them: their idf is near zero, so they barely move the
+    ranking, but their postings grow with the session. Smaller indexes
+    score every term, so a short history or a repeated question is
+    still recalled.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_df: float = 0.5,
+                 min_docs_for_max_df: int = 20):
+        """
+        Initialize the index.
+
+        Args:
+            k1: Term-frequency saturation
+            b: Document-length normalization strength
+            max_df: Fraction of turns above which a query term is ignored
+            min_docs_for_max_df: Turns indexed before max_df applies
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_df = max_df
+        self.min_docs_for_max_df = min_docs_for_max_df
+        self.clear()
+
+    def clear(self):
+        self._docs: Dict[str, array] = {}
+        self._freqs: Dict[str, array] = {}
+        self._lengths = array("I")
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, turn: Mapping) -> int:
+        """
+        Index one turn (user message and reply together).
+
+        Returns:
+            int: Position of the turn in the index
+        """
+        doc = len(self._lengths)
+        words = tokenize(f"{turn['user']} {turn['assistant']}")
+        counts: Dict[str, int] = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+
+        for word, count in counts.items():
+            docs = self._docs.get(word)
+            if docs is None:
+                docs = self._docs[word] = array("I")
+                self._freqs[word] = array("H")
+            docs.append(doc)
+            self._freqs[word].append(min(count, 0xFFFF))
+
+        self._lengths.append(len(words))
+        self._total_length += len(words)
+        return doc
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Best-matching turns for a query.
+
+        Args:
+            query: Text to match (usually the current user message)
+            k: Number of results
+
+        Returns:
+            list: (position, score) pairs, best first; only positive scores
+        """
+        if k <= 0 or not self._lengths:
+            return []
+
+        total = len(self._lengths)
+        average = self._total_length / total or 1.0
+        max_docs = self.max_df * total if total >= self.min_docs_for_max_df else total
+        scores: Dict[int, float] = {}
+        for word in set(tokenize(query)):
+            docs = self._docs.get(word)
+            if docs is None or len(docs) > max_docs:
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            freqs = self._freqs[word]
+            for doc, tf in zip(docs, freqs):
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / average)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
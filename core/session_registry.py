@@ -0,0 +1,228 @@
+"""
+Session Registry Module for Lexi
+Keeps one isolated LexiAgent per chat session with bounded memory.
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from core.agent_state import LexiAgent
+from core.cache import AsyncSingleFlight
+from core.persistence import WriteBehindQueue
+
+# ============================================================
+# 📁 SESSION STORAGE PATHS
+# ============================================================
+
+SESSIONS_DIR = "data/sessions"
+
+
+def session_history_path(session_id: str, base_dir: str = SESSIONS_DIR) -> str:
+    """
+    Map a session id to its history file.
+
+    Args:
+        session_id: Chat session identifier
+        base_dir: Directory holding per-session history files
+
+    Returns:
+        str: Path like "data/sessions/<session_id>.json"
+    """
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+    return os.path.join(base_dir, f"{safe_id}.json")
+
+
+# ============================================================
+# 🗂️ SESSION REGISTRY
+# ============================================================
+
+class SessionRegistry:
+    """
+    Session-keyed map of resident LexiAgent instances.
+
+    Sessions are kept in least-recently-used order. Idle sessions expire
+    after idle_ttl seconds, and the least recently used ones are evicted
+    whenever the session or total-turn caps are exceeded. Evicted agents
+    are saved first (through the write-behind queue when one is given)
+    and rehydrated lazily from storage on their next message. An agent
+    with a run queued or in progress (LexiAgent.busy) is never evicted;
+    caps may be exceeded until its run ends.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], LexiAgent],
+        max_sessions: int = 500,
+        idle_ttl: float = 1800.0,
+        max_resident_turns: Optional[int] = None,
+        write_behind: Optional[WriteBehindQueue] = None,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            factory: Creates a fresh agent for a session id
+            max_sessions: Maximum number of resident agents
+            idle_ttl: Seconds of inactivity before an agent is evicted
+            max_resident_turns: Cap on history turns held across all agents
+            write_behind: Queue for eviction saves (saves inline if None)
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_resident_turns = max_resident_turns
+        self.write_behind = write_behind
+
+        # session_id -> (agent, last_access); oldest access first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._loads = AsyncSingleFlight()
+        self.evictions = 0
+        self.rehydrations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def session_ids(self) -> List[str]:
+        """Ids of the resident sessions, least recently used first."""
+        return list(self._sessions)
+
+    def get(self, session_id: str) -> LexiAgent:
+        """
+        Return the agent for a session, rehydrating it if not resident.
+
+        Rehydrating reads storage on the calling thread; async callers
+        should use aget instead.
+
+        Args:
+            session_id: Chat session identifier
+
+        Returns:
+            LexiAgent: The session's agent
+        """
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        entry = self._sessions.get(session_id)
+        agent = entry[0] if entry else self._rehydrate(session_id)
+        return self._touch(session_id, agent, now)
+
+    async def aget(self, session_id: str) -> LexiAgent:
+        """
+        Async version of get for use on the event loop.
+
+        A non-resident session is flushed and loaded in a worker thread,
+        so reading its history never blocks other sessions; concurrent
+        calls for the same session share one load.
+
+        Args:
+            session_id: Chat session identifier
+
+        Returns:
+            LexiAgent: The session's agent
+        """
+        self._evict_expired(time.monotonic())
+
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            agent = await self._loads.do(
+                session_id, lambda: asyncio.to_thread(self._rehydrate, session_id)
+            )
+            # get() may have loaded it while this load was running
+            entry = self._sessions.get(session_id)
+        if entry is not None:
+            agent = entry[0]
+        return self._touch(session_id, agent, time.monotonic())
+
+    def _rehydrate(self, session_id: str) -> LexiAgent:
+        """Create a session's agent and load its stored history."""
+        if self.write_behind is not None:
+            # An eviction save may still be queued; load what it writes
+            self.write_behind.flush(session_id)
+        agent = self.factory(session_id)
+        agent.load_history()
+        self.rehydrations += 1
+        return agent
+
+    def _touch(self, session_id: str, agent: LexiAgent, now: float) -> LexiAgent:
+        """Mark a session most recently used, then enforce the caps."""
+        self._sessions.pop(session_id, None)
+        self._sessions[session_id] = (agent, now)
+        self._enforce_caps(keep=session_id)
+        return agent
+
+    def peek(self, session_id: str) -> Optional[LexiAgent]:
+        """Return a resident agent without touching or creating it."""
+        entry = self._sessions.get(session_id)
+        return entry[0] if entry else None
+
+    def evict(self, session_id: str, save: bool = True) -> bool:
+        """
+        Drop a session from memory, saving its history first.
+
+        Args:
+            session_id: Chat session identifier
+            save: Whether to persist the history before dropping it
+
+        Returns:
+            bool: True if the session was evicted (False if it was not
+                resident or has a run in flight)
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0].busy:
+            return False
+        del self._sessions[session_id]
+        agent = entry[0]
+        if agent.scheduler is not None:
+            agent.scheduler.drop(agent.session_id)
+
+        if save:
+            if self.write_behind is not None:
+                self.write_behind.submit(session_id, agent.save_history)
+            else:
+                agent.save_history()
+        self.evictions += 1
+        return True
+
+    def resident_turns(self) -> int:
+        """Total history turns held by resident agents."""
+        return sum(len(agent.conversation_history) for agent, _ in self._sessions.values())
+
+    def _evictable(self, keep: str) -> List[str]:
+        """Idle sessions other than keep, least recently used first."""
+        return [
+            session_id for session_id, (agent, _) in self._sessions.items()
+            if session_id != keep and not agent.busy
+        ]
+
+    def _evict_expired(self, now: float):
+        """Evict idle sessions unused for longer than idle_ttl (oldest first)."""
+        for session_id, (_, last_access) in list(self._sessions.items()):
+            if now - last_access < self.idle_ttl:
+                break
+            self.evict(session_id)
+
+    def _enforce_caps(self, keep: str):
+        """Evict least recently used idle sessions until both caps are met."""
+        excess = len(self._sessions) - self.max_sessions
+        if excess > 0:
+            for session_id in self._evictable(keep)[:excess]:
+                self.evict(session_id)
+
+        if self.max_resident_turns is None:
+            return
+
+        total = self.resident_turns()
+        if total <= self.max_resident_turns:
+            return
+        for session_id in self._evictable(keep):
+            total -= len(self._sessions[session_id][0].conversation_history)
+            self.evict(session_id)
+            if total <= self.max_resident_turns:
+                break
@@ -0,0 +1,124 @@
+"""
+Telemetry Module for Lexi
+Leveled logging through a background queue, and per-stage timers.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from core.metrics import REGISTRY
+
+# DEBUG, INFO, WARNING, ERROR or OFF
+LOG_LEVEL = os.getenv("LEXI_LOG_LEVEL", "INFO").upper()
+
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# ============================================================
+# 📝 LOGGING
+# ============================================================
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler renders the message before enqueueing it; here the
+    record is passed on as-is, so the request path only pays for the
+    level check and a queue put. Log arguments must therefore not be
+    mutated after the call (pass values, not live containers).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL) -> logging.Logger:
+    """
+    Configure the "lexi" logger once (later calls are no-ops).
+
+    Records are queued and written to stdout by a listener thread, which
+    is stopped (and drained) at interpreter exit.
+
+    Args:
+        level: Minimum level name, or "OFF" to drop every record
+
+    Returns:
+        logging.Logger: The "lexi" root logger
+    """
+    global _listener
+    root = logging.getLogger("lexi")
+    with _setup_lock:
+        if root.handlers:
+            return root
+
+        root.propagate = False
+        if level == "OFF":
+            root.addHandler(logging.NullHandler())
+            root.setLevel(logging.CRITICAL + 1)
+            return root
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        root.setLevel(level)
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for one Lexi module (e.g. get_logger("agent") -> "lexi.agent")."""
+    setup_logging()
+    return logging.getLogger(f"lexi.{name}")
+
+
+# ============================================================
+# ⏱️ STAGE TIMERS
+# ============================================================
+
+
+@contextmanager
+def timed(metric: str, help: str = "", **labels):
+    """
+    Observe the wall time of a block in a histogram.
+
+    Does nothing when metrics are switched off (LEXI_METRICS=0).
+    """
+    if not REGISTRY.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.histogram(metric, help, **labels).observe(time.perf_counter() - start)
+
+
+def stage(name: str):
+    """
+    Time one stage of message handling in lexi_stage_seconds{stage=name}.
+
+    Stages: context_build, model_call, persistence (tools are timed in
+    lexi_tool_seconds).
+    """
+    return timed("lexi_stage_seconds", "Wall time of each message-handling stage", stage=name)
+
+
+def observe_stage(name: str, seconds: float):
+    """Record a stage duration measured elsewhere (e.g. across run hooks)."""
+    if REGISTRY.enabled:
+        REGISTRY.histogram(
+            "lexi_stage_seconds", "Wall time of each message-handling stage", stage=name
+        ).observe(seconds)
@@ -0,0 +1,163 @@
+"""
+Turns Module for Lexi
+Compact in-memory record for one conversation exchange.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Iterator, List, Union
+
+# Short prompts ("hi", "what's my name?") repeat across turns and sessions,
+# so user messages up to SHARE_MAX_CHARS go through a bounded LRU table and
+# repeats share one string. Not sys.intern: interned strings are immortal
+# on Python 3.12+, so every distinct message would live until exit.
+SHARE_MAX_CHARS = 64
+SHARE_MAX_ENTRIES = 4096
+
+FIELDS = ("timestamp", "message_number", "user", "assistant")
+
+_shared: "OrderedDict[str, str]" = OrderedDict()
+_shared_lock = threading.Lock()  # turns are also built on loader threads
+
+
+def _share(text: str) -> str:
+    """The table's copy of a short message (added, evicting the oldest, if new)."""
+    if type(text) is not str or len(text) > SHARE_MAX_CHARS:
+        return text
+    with _shared_lock:
+        shared = _shared.get(text)
+        if shared is not None:
+            _shared.move_to_end(text)
+            return shared
+        _shared[text] = text
+        if len(_shared) > SHARE_MAX_ENTRIES:
+            _shared.popitem(last=False)
+    return text
+
+
+def _to_epoch(timestamp) -> Union[float, str]:
+    """ISO timestamp -> epoch seconds (unparseable values are kept as-is)."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return timestamp
+
+
+# ============================================================
+# 🧱 TURN RECORD
+# ============================================================
+
+
+class Turn(Mapping):
+    """
+    One user/assistant exchange, stored in __slots__.
+
+    A dict turn costs a hash table plus a 26-char ISO timestamp string; a
+    Turn is four slots and a float. It is still a read-only Mapping with
+    the original keys (timestamp, message_number, user, assistant), so
+    turn["user"], turn.get(...) and dict(turn) keep working. The
+    timestamp is rendered back to local-time ISO format on access.
+    """
+
+    __slots__ = ("created", "number", "user", "assistant")
+
+    def __init__(self, created: float, number: int, user: str, assistant: str):
+        """
+        Initialize the turn.
+
+        Args:
+            created: Epoch seconds the exchange completed
+            number: Message number within the session
+            user: User message
+            assistant: Lexi's reply
+        """
+        self.created = created
+        self.number = number
+        self.user = _share(user)
+        self.assistant = assistant
+
+    @classmethod
+    def from_dict(cls, turn: Mapping) -> "Turn":
+        """Build a Turn from a stored dict (Turns are returned unchanged)."""
+        if isinstance(turn, cls):
+            return turn
+        return cls(
+            _to_epoch(turn.get("timestamp")),
+            turn.get("message_number"),
+            turn.get("user", ""),
+            turn.get("assistant", ""),
+        )
+
+    @property
+    def timestamp(self) -> str:
+        if isinstance(self.created, float):
+            return datetime.fromtimestamp(self.created).isoformat()
+        return self.created
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "message_number": self.number,
+            "user": self.user,
+            "assistant": self.assistant,
+        }
+
+    # ---------- Mapping interface ----------
+
+    def __getitem__(self, key: str):
+        if key == "user":
+            return self.user
+        if key == "assistant":
+            return self.assistant
+        if key == "message_number":
+            return self.number
+        if key == "timestamp":
+            return self.timestamp
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Turn({self.to_dict()!r})"
+
+
+def to_turns(turns) -> List[Turn]:
+    """Convert stored turns (dicts or Turns) to Turn records."""
+    return [Turn.from_dict(turn) for turn in turns]
+
+
+class HistoryView(Sequence):
+    """
+    Read-only list-like view of a history that yields plain dicts.
+
+    Dicts are built on access, so returning a view costs nothing for a
+    caller that only needs len() or the last few turns.
+    """
+
+    __slots__ = ("_turns",)
+
+    def __init__(self, turns: List[Turn]):
+        self._turns = turns
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [dict(turn) for turn in self._turns[index]]
+        return dict(self._turns[index])
+
+    def __iter__(self) -> Iterator[dict]:
+        for turn in self._turns:
+            yield dict(turn)
+
+    def __repr__(self) -> str:
+        return f"HistoryView({len(self._turns)} turns)"
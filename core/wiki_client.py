@@ -0,0 +1,263 @@
+"""
+Async Wikipedia Client for Lexi
+Non-blocking MediaWiki lookups over a pooled keep-alive HTTP client.
+
+Mirrors what wikipedia.summary(query, sentences=2, auto_suggest=True)
+does, returning the same outcome shapes used by core.functions:
+("summary", text), ("disambiguation", options) or ("not_found", None).
+"""
+
+import asyncio
+import os
+import time
+from html.parser import HTMLParser
+from typing import List, Optional
+
+import httpx
+
+from core.telemetry import get_logger
+
+logger = get_logger("wiki")
+
+WIKI_API_URL = os.getenv("LEXI_WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+USER_AGENT = "Lexi/0.1 (https://github.com/Uzair-Waseem-390/lexi)"
+
+
+class WikipediaAPIError(Exception):
+    """The MediaWiki API returned an error payload or an unusable response."""
+
+
+# ============================================================
+# 🪣 RATE LIMITER
+# ============================================================
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter for coroutines.
+
+    Allows bursts of up to `capacity` requests, refilled at `rate` tokens
+    per second. Waiters sleep instead of blocking the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ============================================================
+# 🔗 DISAMBIGUATION PARSING
+# ============================================================
+
+
+class _DisambiguationParser(HTMLParser):
+    """Collect the first link text of every <li>, like the wikipedia package does."""
+
+    def __init__(self):
+        super().__init__()
+        self.options: List[Optional[str]] = []
+        self._open: List[dict] = []     # <li> elements currently open
+        self._capturing: List[dict] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "li":
+            classes = dict(attrs).get("class") or ""
+            entry = {"slot": len(self.options), "skip": "tocsection" in classes, "text": None}
+            self.options.append(None)
+            self._open.append(entry)
+        elif tag == "a":
+            for entry in self._open:
+                if entry["text"] is None:
+                    entry["text"] = []
+                    self._capturing.append(entry)
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._capturing = []
+        elif tag == "li" and self._open:
+            entry = self._open.pop()
+            if not entry["skip"] and entry["text"] is not None:
+                self.options[entry["slot"]] = "".join(entry["text"])
+
+    def handle_data(self, data):
+        for entry in self._capturing:
+            entry["text"].append(data)
+
+
+def parse_disambiguation_options(html: str) -> List[str]:
+    """Titles a disambiguation page links to, in document order."""
+    parser = _DisambiguationParser()
+    parser.feed(html)
+    parser.close()
+    return [option for option in parser.options if option is not None]
+
+
+# ============================================================
+# 📡 CLIENT
+# ============================================================
+
+
+class AsyncWikipediaClient:
+    """
+    Pooled, rate-limited async MediaWiki client.
+
+    One instance is meant to be shared by every session: it keeps a
+    keep-alive connection pool, caps in-flight requests with a semaphore
+    and spaces requests with a shared token bucket.
+    """
+
+    def __init__(
+        self,
+        api_url: str = WIKI_API_URL,
+        max_connections: int = 10,
+        max_concurrency: int = 4,
+        rate: float = 10.0,
+        burst: float = 10.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize the client (connections are opened lazily).
+
+        Args:
+            api_url: MediaWiki api.php endpoint (point at a stub server to test)
+            max_connections: Size of the keep-alive connection pool
+            max_concurrency: Requests allowed in flight at once
+            rate: Sustained requests per second across all sessions
+            burst: Requests allowed back to back before rate applies
+            timeout: Per-request timeout in seconds
+        """
+        self.api_url = api_url
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _bind(self):
+        """(Re)create loop-bound resources for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._http is not None:
+            return
+
+        stale, stale_loop = self._http, self._loop
+        self._loop = loop
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = AsyncTokenBucket(self.rate, self.burst)
+        if stale is not None:
+            await self._close_stale(stale, stale_loop)
+
+    @staticmethod
+    async def _close_stale(http: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        """
+        Close a client left behind by an earlier event loop.
+
+        Its connections belong to that loop, so the close runs there: now
+        if it is running in another thread, else the next time it runs
+        (Runner.run_sync reuses one idle loop). A closed loop cannot run
+        it; the client is still marked closed and its sockets left to GC.
+        """
+        try:
+            if loop is not None and not loop.is_closed():
+                future = asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+                if loop.is_running():
+                    await asyncio.wrap_future(future)
+            else:
+                await http.aclose()
+        except Exception as e:
+            logger.debug("[WIKI] Could not close client from previous event loop: %s", e)
+
+    async def _request(self, params: dict) -> dict:
+        await self._bind()
+        params = {**params, "format": "json"}
+        params.setdefault("action", "query")
+
+        await self._bucket.acquire()
+        async with self._semaphore:
+            response = await self._http.get(self.api_url, params=params)
+        response.raise_for_status()
+
+        data = response.json()
+        if "error" in data:
+            raise WikipediaAPIError(data["error"].get("info", "unknown error"))
+        return data
+
+    async def lookup(self, query: str, sentences: int = 2) -> tuple:
+        """
+        Resolve a query to a summary, disambiguation options or not-found.
+
+        Args:
+            query: Search text
+            sentences: Sentences of summary to return
+
+        Returns:
+            tuple: ("summary", text), ("disambiguation", options[:5]) or ("not_found", None)
+        """
+        # Auto-suggest: take the search suggestion, else the top result
+        search = await self._request({
+            "list": "search",
+            "srprop": "",
+            "srlimit": 1,
+            "srsearch": query,
+            "srinfo": "suggestion",
+        })
+        results = search["query"]["search"]
+        suggestion = search["query"].get("searchinfo", {}).get("suggestion")
+        title = suggestion or (results[0]["title"] if results else None)
+        if not title:
+            return ("not_found", None)
+
+        info = await self._request({
+            "prop": "info|pageprops",
+            "ppprop": "disambiguation",
+            "redirects": "",
+            "titles": title,
+        })
+        page = next(iter(info["query"]["pages"].values()))
+        if "missing" in page:
+            return ("not_found", None)
+
+        title = page["title"]
+        if "pageprops" in page:
+            parsed = await self._request({"action": "parse", "page": title, "prop": "text"})
+            html = parsed["parse"]["text"]["*"]
+            return ("disambiguation", parse_disambiguation_options(html)[:5])
+
+        extract = await self._request({
+            "prop": "extracts",
+            "explaintext": "",
+            "exsentences": sentences,
+            "titles": title,
+        })
+        page = next(iter(extract["query"]["pages"].values()))
+        return ("summary", page.get("extract", ""))
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None